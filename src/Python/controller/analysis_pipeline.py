@@ -0,0 +1,184 @@
+import threading
+from collections import deque
+import numpy as np
+from .voicing_gate import PitchReading
+
+QUEUE_SIZE = 64        # Leituras por janela guardadas na fila (com drenagem ativa) até o consumidor drenar
+MAX_LATENCY = 0.1      # Atraso máximo (s) entre o fim da janela e a captura antes de contar como atrasada
+POLL_TIMEOUT = 0.05    # Espera máxima (s) do worker por novos blocos de áudio
+CONFIDENCE_WINDOWS = 10  # Janelas recentes cuja confiança é média na leitura estabilizada
+
+
+class AnalysisPipeline:
+    """Executa a estimativa de altura em uma thread própria, longe do laço de eventos da interface.
+
+    O callback da fonte de áudio enche o buffer circular do reconhecedor; a thread de análise
+    acorda a cada bloco, processa as janelas pendentes e publica o resultado de duas formas:
+
+    - um slot com a leitura estabilizada mais recente (a saída do filtro de suavização do canal
+      no reconhecedor), que a interface consulta sem nunca bloquear;
+    - só para os canais em que um consumidor ativou a drenagem (`enable_drain`), uma fila limitada
+      com a leitura de cada janela, que descarta a mais antiga quando cheia.
+
+    Com um reconhecedor multicanal, cada canal tem sua fila, seu slot e seus assinantes, de modo
+    que várias sessões de jogo compartilham a mesma captura e o mesmo lote de análise.
+    O reconhecedor passa a pertencer à thread de análise enquanto o pipeline estiver rodando.
+
+    Attributes:
+        recognizer (NoteRecognizer): Reconhecedor em modo streaming.
+        channels (int): Número de canais analisados.
+        produced (int): Leituras por janela produzidas pela thread.
+        dropped (int): Leituras descartadas das filas com drenagem ativa por falta de consumo.
+        late (int): Leituras publicadas com atraso maior que `max_latency`.
+    """
+
+    def __init__(self, recognizer, maxsize=QUEUE_SIZE, max_latency=MAX_LATENCY):
+        """Inicializa o pipeline.
+
+        Args:
+            recognizer (NoteRecognizer): Reconhecedor criado com `streaming=True`.
+            maxsize (int): Capacidade da fila de leituras por janela.
+            max_latency (float): Atraso, em segundos, a partir do qual uma leitura conta como atrasada.
+        """
+        if not recognizer.streaming:
+            raise ValueError("O pipeline de análise precisa de um reconhecedor em modo streaming")
+        self.recognizer = recognizer
+        self.max_latency = max_latency
+        self.produced = 0
+        self.dropped = 0
+        self.late = 0
+        self.channels = recognizer.channels
+        self._readings = [deque(maxlen=maxsize) for _ in range(self.channels)]
+        self._draining = [False] * self.channels
+        self._latest = [PitchReading(0.0, False, 0.0)] * self.channels
+        self._subscribers = [[] for _ in range(self.channels)]
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Inicia a thread de análise (sem efeito se já estiver rodando)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="analysis-pipeline", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Para a thread de análise e espera ela terminar."""
+        self._running.clear()
+        self.recognizer.data_ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self):
+        """Indica se a thread de análise está ativa."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """Laço da thread: espera áudio novo, analisa as janelas pendentes e publica as leituras."""
+        recognizer = self.recognizer
+        while self._running.is_set():
+            recognizer.data_ready.wait(POLL_TIMEOUT)
+            recognizer.data_ready.clear()
+            results = recognizer.analyze_pending()
+            if results:
+                self._publish(results)
+
+    def _publish(self, results):
+        """Atualiza o slot da leitura estabilizada de cada canal e enfileira as leituras dos canais drenados."""
+        rate = self.recognizer.rate
+        captured = self.recognizer.audio_buffer.total_written
+        late = sum(captured - end > self.max_latency * rate for end, _ in results)
+        times = [end / rate for end, _ in results]
+
+        for channel in range(self.channels):
+            readings = list(zip(times, (channel_readings[channel] for _, channel_readings in results)))
+            frequency = self.recognizer.smoothers[channel].value
+            confidence = float(np.mean([reading.confidence for _, reading in readings[-CONFIDENCE_WINDOWS:]]))
+            latest = PitchReading(frequency, frequency > 0, confidence)
+
+            with self._lock:
+                if self._draining[channel]:
+                    queue = self._readings[channel]
+                    self.dropped += max(0, len(queue) + len(readings) - queue.maxlen)
+                    queue.extend(readings)
+                self._latest[channel] = latest
+                subscribers = list(self._subscribers[channel])
+            for callback in subscribers:
+                callback(readings)
+
+        with self._lock:
+            self.produced += len(results) * self.channels
+            self.late += late * self.channels
+
+    def subscribe(self, callback, channel=0):
+        """Registra uma função chamada com as leituras de cada lote de um canal.
+
+        A função recebe a lista de pares (tempo em segundos de stream, PitchReading) e roda na
+        thread de análise, então deve ser rápida; para atualizar a interface prefira `latest`.
+        """
+        with self._lock:
+            self._subscribers[channel].append(callback)
+
+    def unsubscribe(self, callback, channel=0):
+        """Remove uma função registrada com `subscribe`."""
+        with self._lock:
+            self._subscribers[channel].remove(callback)
+
+    def latest(self, channel=0):
+        """Leitura estabilizada mais recente do canal; nunca bloqueia.
+
+        Returns:
+            PitchReading: Frequência suavizada (0.0 sem voz), decisão de vozeamento e confiança média
+            das janelas recentes.
+        """
+        with self._lock:
+            return self._latest[channel]
+
+    def enable_drain(self, channel=0):
+        """Passa a guardar na fila do canal a leitura de cada janela, para um consumidor de `drain`.
+
+        Sem isso, `latest` é o único canal de saída e nenhuma leitura conta como descartada.
+        """
+        with self._lock:
+            self._draining[channel] = True
+
+    def disable_drain(self, channel=0):
+        """Para de guardar as leituras do canal e esvazia a sua fila."""
+        with self._lock:
+            self._draining[channel] = False
+            self._readings[channel].clear()
+
+    def drain(self, channel=0):
+        """Remove e retorna todas as leituras por janela acumuladas na fila do canal.
+
+        Returns:
+            list: Pares (tempo do fim da janela em segundos de stream, PitchReading), em ordem.
+
+        Raises:
+            ValueError: Se a drenagem do canal não tiver sido ativada com `enable_drain`.
+        """
+        with self._lock:
+            if not self._draining[channel]:
+                raise ValueError(f"A drenagem do canal {channel} não foi ativada (use enable_drain)")
+            queue = self._readings[channel]
+            readings = list(queue)
+            queue.clear()
+        return readings
+
+    def stats(self):
+        """Contadores do pipeline.
+
+        Returns:
+            dict: Leituras produzidas, descartadas das filas drenadas, atrasadas e janelas puladas na captura.
+        """
+        with self._lock:
+            return {
+                "produced": self.produced,
+                "dropped": self.dropped,
+                "late": self.late,
+                "skipped": self.recognizer.skipped_windows,
+            }
@@ -13,7 +13,8 @@ sys.path.append(base_dir)
 
 from views.game_view import GameInterface
 from services.melody_recorder import MelodyRecorder
-from controller.frequency_state import get_current_frequency
+from controller.melody_repository import default_repository
+from controller.frequency_state import get_current_frequency, get_pitch_history
 
 
 
@@ -21,8 +22,8 @@ class ArduinoCommunication:
     def __init__(self, game_interface):
         self.serial_receiver = serial.Serial('COM22', 9600, timeout=10)  
         self.serial_sender = serial.Serial('COM21', 115200, timeout=10)
-        self.melodies_file = os.path.join(os.path.dirname(base_dir), "melodies.json")
-        print(f"Caminho do arquivo de melodias: {self.melodies_file}")
+        self.repository = default_repository()
+        print(f"Banco de melodias: {self.repository.path}")
         self.game_interface = game_interface
         self.difficulty = None
         
@@ -39,16 +40,6 @@ class ArduinoCommunication:
             3: 15
         }
 
-        self.alturas = {
-            "dó": 3,
-            "ré": 4,
-            "mi": 5,
-            "fá": 6,
-            "sol": 7,
-            "lá": 8,
-            "si": 9
-        }
-
         self.is_sending_frequency = False
         self.frequency_thread = None
         self.is_monitoring = False
@@ -58,7 +49,13 @@ class ArduinoCommunication:
             while True:
                 if self.is_monitoring: 
                     #print(f"Frequência atual: {get_current_frequency()}")
-                    frequency = get_current_frequency()
+                    # Mediana do último envio para cá, sem copiar o histórico; sem voz, o ventilador não reage
+                    history = get_pitch_history()
+                    if history is not None:
+                        stats = history.stats(0.5)
+                        frequency = stats.median if stats.voiced_fraction >= 0.5 else 0
+                    else:
+                        frequency = get_current_frequency()
                     mapped_frequency = int(self.map(frequency, 200, 1100, 0, 200))
                     #print(f"Frequência mapeada enviada: {mapped_frequency}")
                     
@@ -103,8 +100,11 @@ class ArduinoCommunication:
             elif command.strip().lower() == "próxima nota":
                 print("proxima nota")
                 if self.game_interface:
-                    self.current_note = self.game_interface.melody_data[self.game_interface.current_note_index]
-                    comando = f"altura meta {self.alturas[self.current_note[1]]}\n"
+                    self.current_note = self.game_interface.current_note
+                    if self.current_note is None or self.current_note.fan_height is None:
+                        print("Nota atual sem altura-alvo; nada enviado")
+                        return
+                    comando = f"altura meta {self.current_note.fan_height}\n"
                     self.serial_sender.write(comando.encode("utf-8"))
                     print(comando)
 
@@ -120,8 +120,8 @@ class ArduinoCommunication:
                 self.difficulty = self.difficulty_map[difficulty_name]
                 print(f"Iniciando jogo com dificuldade {difficulty_name} e melodia {melody_number + 1}")
                 
-                #self.game_interface = GameInterface(melody_number, self.difficulty, self.melodies_file)
-                self.current_note = self.game_interface.melody_data[self.game_interface.current_note_index]
+                #self.game_interface = GameInterface(melody_number, self.difficulty, self.repository)
+                self.current_note = self.game_interface.current_note
                 self.start_frequency_monitoring()
                 
                 self.serial_sender.write("conectei".encode("utf-8"))
@@ -152,7 +152,7 @@ class ArduinoCommunication:
         return (x - in_min) * (out_max - out_min) / (in_max - in_min) + out_min
 
 if __name__ == "__main__":
-    game_interface = GameInterface(1, 1, os.path.join(os.path.dirname(base_dir), "melodies.json"))
+    game_interface = GameInterface(1, 1)
     arduino = ArduinoCommunication(game_interface)
     threading.Thread(target=arduino.read_serial, daemon=True).start()
     game_interface.start_game()
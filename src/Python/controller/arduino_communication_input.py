@@ -1,7 +1,6 @@
 import serial
 import sys
 import os
-import json
 
 sys.stdout.reconfigure(encoding='utf-8')
 
@@ -11,12 +10,18 @@ sys.path.append(base_dir)
 from services.melody_recorder import MelodyRecorder
 from services.melody_preview import MelodyPreview
 from views.game_view import GameInterface
+from controller.melody_repository import default_repository
+from controller.melody_catalog import catalog_for
+from controller.melody_search import search_index
+from controller.note_recognizer import NoteRecognizer
+from controller.audio_recorder import MelodyRecorder as HummingRecorder
 
 class ArduinoCommunication:
     def __init__(self):
         self.commands = {
            "record": "record_melody",
            "preview": "preview_melody",
+           "search": "search_melody",
            "select_difficulty": "select_difficulty",
            "start_game": "start_game",
            "stop_melody": "stop_melody",
@@ -26,8 +31,11 @@ class ArduinoCommunication:
         self.selected_melody = 1
         self.difficulty = 1
 
-        self.melodies_file = os.path.join(os.path.dirname(base_dir), "melodies.json")
-        print(f"Caminho do arquivo de melodias: {self.melodies_file}")  
+        self.repository = default_repository()
+        self.catalog = catalog_for(self.repository)
+        search_index(self.catalog)  # Começa a indexar a biblioteca para a busca, em segundo plano
+        self.melody_preview = MelodyPreview()
+        print(f"Banco de melodias: {self.repository.path}")
 
     def send_command(self):
         while True:
@@ -44,12 +52,18 @@ class ArduinoCommunication:
         elif command == "preview":
             self.preview_melody()
 
+        elif command == "search":
+            self.search_melody()
+
         elif command == "select_difficulty":
             self.select_difficulty()
         
         elif command == "start_game":
             self.start_game()
 
+        elif command == "stop_melody":
+            self.stop_melody()
+
         elif command == "clear_melody":
             self.clear_melody()
 
@@ -59,42 +73,66 @@ class ArduinoCommunication:
         melody_recorder.record_melody()
 
     def preview_melody(self):
-        if not os.path.exists(self.melodies_file):
-            print("Arquivo de melodias não encontrado.")
+        melodias = self.catalog.names()
+        if not melodias:
+            print("Nenhuma melodia encontrada no banco.")
             return
 
+        print("\nMelodias disponíveis:")
+        for i, (_, nome_melodia) in enumerate(melodias, 1):
+            print(f"{i}. {nome_melodia}")
+
         try:
-            with open(self.melodies_file, 'r', encoding='utf-8') as f:
-                melodias = json.load(f)
-            
-            if not melodias:
-                print("Nenhuma melodia encontrada no arquivo.")
-                return
+            self.selected_melody = int(input("\nEscolha o número da melodia que deseja tocar: ")) - 1
 
-            print("\nMelodias disponíveis:")
-            for i, nome_melodia in enumerate(melodias.keys(), 1):
-                print(f"{i}. {nome_melodia}")
+            if 0 <= self.selected_melody < len(melodias):
+                melodia = self.catalog.get(melodias[self.selected_melody][0])
+                print(f"Tocando melodia: {melodia.name} (\"stop_melody\" interrompe)")
+                self.melody_preview.preview_melody(melodia)
+            else:
+                print("Número inválido. Por favor, escolha um número válido da lista.")
+        except ValueError:
+            print("Entrada inválida. Por favor, digite um número.")
+
+    def stop_melody(self):
+        position = self.melody_preview.engine.position()
+        if position.melody is None:
+            print("Nenhuma melodia tocando.")
+            return
+        self.melody_preview.stop()
+        print(f"Melodia interrompida em {position.seconds:.1f}s")
 
+    def search_melody(self):
+        # Grava o trecho cantarolado com a segmentação contínua e procura as melodias parecidas
+        recognizer = NoteRecognizer(streaming=True)
+        try:
+            recorder = HummingRecorder(recognizer)
+            input("Pressione Enter e cantarole um trecho da melodia; Enter de novo para buscar.")
+            recorder.start_continuous()
             try:
-                self.selected_melody = int(input("\nEscolha o número da melodia que deseja tocar: ")) - 1
-                nomes_melodias = list(melodias.keys())
-                
-                if 0 <= self.selected_melody < len(nomes_melodias):
-                    melodia_selecionada = nomes_melodias[self.selected_melody]
-                    dados_melodia = melodias[melodia_selecionada]
-                    print(f"Tocando melodia: {melodia_selecionada}")
-                    
-                    melody_preview = MelodyPreview()
-                    melody_preview.preview_melody(dados_melodia)
-                else:
-                    print("Número inválido. Por favor, escolha um número válido da lista.")
-            except ValueError:
-                print("Entrada inválida. Por favor, digite um número.")
-                
-        except json.JSONDecodeError:
-            print("Erro ao ler o arquivo de melodias. Formato JSON inválido.")
-        except Exception as e:
-            print(f"Erro ao processar melodias: {str(e)}")
+                input()
+            finally:
+                recorder.stop_continuous()
+        finally:
+            # Fecha o stream de entrada e a thread de captura desta busca
+            recognizer.close()
+
+        try:
+            results = search_index(self.catalog).search(recorder.melody)
+        except ValueError as e:
+            print(str(e))
+            return
+        if not results:
+            print("Nenhuma melodia parecida encontrada.")
+            return
+
+        print("\nMelodias mais parecidas:")
+        for i, result in enumerate(results, 1):
+            print(f"{i}. {result.name} (distância {result.distance:.2f})")
+        # A melhor é selecionada para o jogo, pela posição na lista de melodias
+        ids = [melody_id for melody_id, _ in self.catalog.names()]
+        self.selected_melody = ids.index(results[0].melody_id)
+        print(f"Melodia selecionada: {results[0].name}")
 
     def select_difficulty(self):
         print("Select difficulty")
@@ -105,7 +143,7 @@ class ArduinoCommunication:
     
     def start_game(self):
         print("Starting game")
-        game_interface = GameInterface(self.selected_melody, self.difficulty, self.melodies_file)
+        game_interface = GameInterface(self.selected_melody, self.difficulty, self.repository)
         game_interface.start_game()
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+import threading
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Buffer circular pré-alocado para amostras de áudio.
+
+    O callback do stream de áudio escreve blocos de amostras e a análise lê
+    janelas pelo índice absoluto da amostra, sem nunca esperar pelo dispositivo.
+
+    Com mais de um canal, os blocos intercalados (quadros, canais) são guardados por canal,
+    de modo que a janela de todos os canais sai em uma única cópia já no formato (canais, amostras).
+
+    Attributes:
+        capacity (int): Número máximo de amostras (quadros) mantidas no buffer.
+        channels (int): Número de canais.
+        total_written (int): Total de quadros escritos desde a criação.
+    """
+
+    def __init__(self, capacity, dtype=np.float32, channels=1):
+        """Inicializa o buffer.
+
+        Args:
+            capacity (int): Número máximo de quadros armazenados.
+            dtype (numpy.dtype): Tipo das amostras armazenadas.
+            channels (int): Número de canais.
+        """
+        self.capacity = int(capacity)
+        self.channels = int(channels)
+        self.total_written = 0
+        self._data = np.zeros((self.channels, self.capacity), dtype=dtype)
+        self._lock = threading.Lock()
+
+    def write(self, samples):
+        """Escreve um bloco de amostras, sobrescrevendo as mais antigas.
+
+        Args:
+            samples (numpy.ndarray): Amostras (quadros,) de um canal ou (quadros, canais) intercaladas.
+        """
+        samples = np.asarray(samples)
+        if samples.ndim == 1:
+            samples = samples[:, np.newaxis]
+        n = len(samples)
+        with self._lock:
+            # Se o bloco for maior que o buffer, só as últimas amostras importam
+            if n > self.capacity:
+                self.total_written += n - self.capacity
+                samples = samples[-self.capacity:]
+                n = self.capacity
+
+            start = self.total_written % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[:, start:start + first] = samples[:first].T
+            self._data[:, :n - first] = samples[first:].T
+            self.total_written += n
+
+    def available(self, end):
+        """Indica se a janela que termina em `end` ainda está no buffer.
+
+        Args:
+            end (int): Índice absoluto (exclusivo) do fim da janela.
+
+        Returns:
+            bool: True se todas as amostras até `end` já foram escritas.
+        """
+        return end <= self.total_written
+
+    def read(self, end, size, out=None):
+        """Copia a janela de `size` amostras que termina na amostra `end`.
+
+        Args:
+            end (int): Índice absoluto (exclusivo) do fim da janela.
+            size (int): Número de amostras da janela.
+            out (numpy.ndarray, optional): Array de destino já alocado.
+
+        Returns:
+            numpy.ndarray: As amostras da janela, (size,) com um canal ou (canais, size) com mais.
+
+        Raises:
+            ValueError: Se a janela ainda não foi escrita ou já foi sobrescrita.
+        """
+        if out is None:
+            shape = (size,) if self.channels == 1 else (self.channels, size)
+            out = np.empty(shape, dtype=self._data.dtype)
+        target = out.reshape(self.channels, size)
+
+        with self._lock:
+            if end > self.total_written or end - size < self.total_written - self.capacity:
+                raise ValueError(f"Janela [{end - size}, {end}) fora do buffer")
+
+            start = (end - size) % self.capacity
+            first = min(size, self.capacity - start)
+            target[:, :first] = self._data[:, start:start + first]
+            target[:, first:] = self._data[:, :size - first]
+        return out
+
+    def latest(self, size, out=None):
+        """Copia as `size` amostras mais recentes.
+
+        Args:
+            size (int): Número de amostras.
+            out (numpy.ndarray, optional): Array de destino já alocado.
+
+        Returns:
+            numpy.ndarray: As amostras mais recentes.
+        """
+        return self.read(self.total_written, size, out)
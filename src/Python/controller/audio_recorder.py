@@ -1,120 +1,136 @@
-import sounddevice as sd
-import numpy as np
-import time
-import json
 from .note_recognizer import NoteRecognizer
-
-FIXED_DURATION = 0.5  
+from .analysis_pipeline import AnalysisPipeline
+from .note_segmenter import NoteSegmenter
+from .wav_writer import WavStreamWriter
+from .melody_repository import default_repository
+from .melody_catalog import catalog_for
+from .synthesizer import default_synthesizer
+from .playback_engine import default_engine
 
 class MelodyRecorder:
-    def __init__(self, recognizer):
+    def __init__(self, recognizer, pipeline=None, repository=None):
         self.recognizer = recognizer
+        self.pipeline = pipeline
+        self.owns_pipeline = pipeline is None
+        self.repository = repository  # Se None, usa o repositório compartilhado ao salvar
         self.melody = []
+        self.melody_id = None  # Identificador da melodia atual no repositório, depois de salva
         self.is_recording = False
-        self.start_time = None
-        self.recorded_samples = []  # Para armazenar as amostras durante a gravação
-
-    def start_stop_recording(self):
-        """Inicia ou para a gravação e retorna os resultados."""
-        if not self.is_recording:
-            # Inicia gravação
-            self.is_recording = True
-            self.start_time = time.time()
-            self.recorded_samples = []
-            return None, None, 0, True  # O último True indica que começou a gravar
-        else:
-            # Para gravação
-            self.is_recording = False
-            duration = time.time() - self.start_time
-            frequency, note = self.recognizer.get_note_from_frequency()
-            self.melody.append((frequency, note, duration))
-            return frequency, note, duration, False  # O False indica que parou de gravar
-
-    def record_note(self):
-        """Captura e grava uma única nota com sua frequência.
+        self.wav_writer = None  # Grava o áudio bruto durante a gravação contínua, se pedido
+        self.segmenter = None
+        self._listener = None
+
+    def start_continuous(self, wav_path=None):
+        """Inicia a gravação contínua: as notas são segmentadas automaticamente enquanto o usuário canta.
+
+        A análise roda na thread do pipeline (criado aqui se nenhum foi passado) e cada nota
+        concluída entra na melodia com duração medida em amostras do stream.
+
+        Args:
+            wav_path (str, optional): Se informado, o áudio bruto do microfone é gravado nesse
+                arquivo WAV enquanto a gravação durar, para ser reanalisado depois.
+        """
+        if not self.recognizer.streaming:
+            raise ValueError("A gravação contínua exige um reconhecedor em modo streaming")
+        if self.pipeline is None:
+            self.pipeline = AnalysisPipeline(self.recognizer)
+        self.segmenter = NoteSegmenter(self.recognizer.rate, self.recognizer.hop_size,
+                                       self.recognizer.window_size)
+        self._listener = self.segmenter.listener()
+        # A gravação começa agora: o áudio anterior ao botão não entra na melodia nem no WAV
+        self.recognizer.reset_cursor()
+        self.recognizer.add_listener(self._listener)
+        if wav_path is not None:
+            source = self.recognizer.source
+            self.wav_writer = WavStreamWriter(wav_path, source.rate, source.channels)
+            self.recognizer.add_raw_listener(self.wav_writer.write)
+        self.pipeline.start()
+        self.is_recording = True
+
+    def poll_notes(self):
+        """Move para a melodia as notas concluídas desde a última chamada, sem bloquear.
 
         Returns:
-            tuple: Frequência e nota identificada.
+            list: As novas entradas (frequência, nota, duração).
         """
-        frequency, note = self.recognizer.get_note_from_frequency()
-        self.melody.append((frequency, note))
-        return frequency, note
-
-    def save_melody_to_file(self, filename="melodies.json"):
-        """Salva a sequência de notas em um arquivo .json com identificadores de melodia."""
-        try:
-            with open(filename, 'r', encoding='utf-8') as file:
-                melodies = json.load(file)
-        except FileNotFoundError:
-            melodies = {}
-
-        # Determina o próximo identificador de melodia
-        melody_id = f"melodia {len(melodies) + 1}"
-
-        # Adiciona a nova melodia ao dicionário de melodias
-        melodies[melody_id] = self.melody
-
-        with open(filename, 'w', encoding='utf-8') as file:
-            json.dump(melodies, file, ensure_ascii=False, indent=4)
-        
-        return filename
-
-    def clear_melody(self):
-        """Limpa a melodia atual e remove do arquivo JSON."""
-        self.melody.clear()
+        if self.segmenter is None:
+            return []
+        notes = [(segment.frequency, segment.note, segment.duration) for segment in self.segmenter.pop_notes()]
+        self.melody.extend(notes)
+        return notes
+
+    def stop_continuous(self):
+        """Para a gravação contínua, fechando a nota em andamento.
+
+        Returns:
+            list: As entradas (frequência, nota, duração) ainda não consumidas por `poll_notes`.
+        """
+        if self.segmenter is None:
+            return []
+        if self.owns_pipeline:
+            self.pipeline.stop()
+        self.recognizer.remove_listener(self._listener)
+        if self.wav_writer is not None:
+            self.recognizer.remove_raw_listener(self.wav_writer.write)
+            self.wav_writer.close()
+            self.wav_writer = None
+        self.segmenter.flush(self.recognizer.next_window_end - self.recognizer.hop_size)
+        notes = self.poll_notes()
+        self.segmenter = None
+        self._listener = None
+        self.is_recording = False
+        return notes
 
-        try:
-            with open("melodies.json", 'r', encoding='utf-8') as file:
-                melodies = json.load(file)
-        except FileNotFoundError:
-            melodies = {}
+    def _repository(self):
+        return self.repository if self.repository is not None else default_repository()
 
-        # Determina o identificador da última melodia
-        if melodies:
-            last_melody_id = f"melodia {len(melodies)}"
-            if last_melody_id in melodies:
-                del melodies[last_melody_id]
+    def save_melody(self):
+        """Salva a melodia atual no repositório de melodias.
 
-        with open("melodies.json", 'w', encoding='utf-8') as file:
-            json.dump(melodies, file, ensure_ascii=False, indent=4)
+        Returns:
+            int: O identificador da melodia salva.
+        """
+        self.melody_id = self._repository().add(self.melody)
+        return self.melody_id
+
+    def clear_melody(self, delete_saved=True):
+        """Limpa a melodia atual e, se ela já tiver sido salva, a remove do repositório.
+
+        Args:
+            delete_saved (bool): Se False, só descarta a gravação em memória.
+        """
+        self.melody.clear()
+        if delete_saved and self.melody_id is not None:
+            self._repository().delete(self.melody_id)
+        self.melody_id = None
 
 class MelodyPlayer:
-    def __init__(self):
-        self.sample_rate = 44100  # Adiciona o sample_rate no init
+    def __init__(self, repository=None):
+        self.synthesizer = default_synthesizer()
+        self.engine = default_engine()
+        self.sample_rate = self.synthesizer.rate
+        self.repository = repository  # Se None, usa o repositório compartilhado
 
     def play_note(self, frequency, duration):
         """Reproduz uma nota com a frequência e duração especificadas."""
-        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
-        note = np.sin(2 * np.pi * frequency * t)
-        
-        # Aplica um envelope ADSR simples para suavizar o som
-        envelope = np.ones_like(note)
-        attack = int(0.1 * len(note))
-        decay = int(0.1 * len(note))
-        envelope[:attack] = np.linspace(0, 1, attack)
-        envelope[-decay:] = np.linspace(1, 0, decay)
-        
-        # Aplica o envelope e normaliza
-        note = note * envelope * 0.5
-        
-        # Reproduz a nota
-        sd.play(note, self.sample_rate)
-        sd.wait()  # Espera a nota terminar de tocar
-
-    def play_melody(self, melody_id, filename="melodies.json"):
-        """Reproduz uma sequência de notas identificada por melody_id."""
-        try:
-            with open(filename, 'r', encoding='utf-8') as file:
-                melodies = json.load(file)
-        except FileNotFoundError:
-            print("Arquivo de melodias não encontrado.")
-            return
-
-        melody = melodies.get(melody_id)
+        self.synthesizer.play_note(frequency, duration)
+
+    def play_melody(self, melody_id):
+        """Começa a reproduzir a melodia com o identificador (ou nome) dado, sem esperar o fim.
+
+        Returns:
+            Melody | None: A melodia que começou a tocar, ou None se ela não existir.
+        """
+        catalog = catalog_for(self.repository)
+        melody = catalog.find(melody_id) if isinstance(melody_id, str) else catalog.get(melody_id)
         if not melody:
             print(f"Melodia {melody_id} não encontrada.")
-            return
+            return None
+
+        # A melodia inteira, com as pausas entre notas, sai de um único buffer no motor de reprodução
+        self.engine.play(melody)
+        return melody
 
-        for frequency, note, duration in melody:
-            self.play_note(frequency, duration)
-            time.sleep(0.1)  # Pequena pausa entre notas
+    def stop_melody(self):
+        """Interrompe a melodia em reprodução."""
+        self.engine.stop()
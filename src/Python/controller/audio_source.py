@@ -0,0 +1,360 @@
+import os
+import struct
+import threading
+import time
+import numpy as np
+
+DEFAULT_RATE = 44100
+DEFAULT_BLOCK_SIZE = 512
+
+# Formatos de amostra do chunk 'fmt ' (código de formato, bits) -> dtype NumPy
+_WAV_DTYPES = {
+    (1, 8): np.dtype("u1"),
+    (1, 16): np.dtype("<i2"),
+    (1, 32): np.dtype("<i4"),
+    (3, 32): np.dtype("<f4"),
+}
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def open_wav(path):
+    """Mapeia em memória as amostras de um arquivo WAV, sem carregá-lo.
+
+    Args:
+        path (str): Caminho do arquivo WAV (PCM de 8, 16 ou 32 bits, ou float de 32 bits).
+
+    Returns:
+        tuple: (numpy.memmap de forma (quadros, canais), taxa de amostragem).
+
+    Raises:
+        ValueError: Se o arquivo não for um WAV em um formato suportado.
+    """
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path} não é um arquivo WAV")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} não tem chunk 'data'")
+            chunk_id, size = struct.unpack("<4sI", header)
+
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                fmt = struct.unpack("<HHIIHH", body[:16])
+                if fmt[0] == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    # O formato real fica nos dois primeiros bytes do GUID do subformato
+                    fmt = (struct.unpack("<H", body[24:26])[0],) + fmt[1:]
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"{path} tem chunk 'data' antes de 'fmt '")
+                offset = f.tell()
+                break
+            else:
+                # Chunks têm tamanho par; pula o byte de preenchimento se houver
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+    format_code, channels, rate, _, _, bits = fmt
+    dtype = _WAV_DTYPES.get((format_code, bits))
+    if dtype is None:
+        raise ValueError(f"Formato WAV não suportado: código {format_code}, {bits} bits")
+
+    frame_bytes = dtype.itemsize * channels
+    available = (os.path.getsize(path) - offset) // frame_bytes
+    num_frames = min(size // frame_bytes, available)
+    samples = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(num_frames, channels))
+    return samples, rate
+
+
+def to_int16(samples):
+    """Converte amostras de qualquer formato PCM/float para int16 (a escala do microfone)."""
+    if samples.dtype == np.int16:
+        return np.asarray(samples)
+    if samples.dtype == np.uint8:
+        return ((samples.astype(np.int16) - 128) << 8)
+    if samples.dtype.kind == "f":
+        return np.clip(samples * 32767, -32768, 32767).astype(np.int16)
+    if samples.dtype.kind == "i" and samples.dtype.itemsize == 4:
+        return (samples >> 16).astype(np.int16)
+    return samples.astype(np.int16)
+
+
+class AudioSource:
+    """Interface comum das fontes de áudio.
+
+    Todas as fontes entregam blocos int16 de forma (quadros, canais), seja por callback
+    (modo push, `open(callback)`) ou por leitura bloqueante (modo pull, `open()` e `read`).
+    O callback pode ser chamado de outra thread e não deve guardar o bloco sem copiá-lo.
+
+    Attributes:
+        name (str): Nome da fonte, usado para selecioná-la em `create_source`.
+        rate (int): Taxa de amostragem em Hz.
+        channels (int): Número de canais.
+        block_size (int): Quadros por bloco entregue ao callback.
+        device_name (str): Descrição do dispositivo ou arquivo de origem.
+    """
+
+    name = None
+
+    def __init__(self, rate=DEFAULT_RATE, channels=1, block_size=DEFAULT_BLOCK_SIZE):
+        self.rate = rate
+        self.channels = channels
+        self.block_size = block_size
+        self.device_name = self.name
+
+    def open(self, callback=None):
+        """Abre a fonte.
+
+        Args:
+            callback (callable, optional): Função chamada com cada bloco capturado. Se omitida,
+                a fonte fica em modo pull e os dados são obtidos com `read`.
+        """
+        raise NotImplementedError
+
+    def read(self, num_frames):
+        """Lê `num_frames` quadros no modo pull.
+
+        Returns:
+            numpy.ndarray: Array int16 (num_frames, channels).
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Para a captura e libera os recursos."""
+
+
+class PyAudioSource(AudioSource):
+    """Microfone via PyAudio."""
+
+    name = "pyaudio"
+
+    def __init__(self, rate=DEFAULT_RATE, channels=1, block_size=DEFAULT_BLOCK_SIZE, device=None):
+        super().__init__(rate, channels, block_size)
+        import pyaudio
+        self._pyaudio = pyaudio
+        self.device = device
+        self.p = pyaudio.PyAudio()
+        self.stream = None
+        if device is None:
+            info = self.p.get_default_input_device_info()
+        else:
+            info = self.p.get_device_info_by_index(device)
+        self.device_name = info["name"]
+
+    def open(self, callback=None):
+        options = {}
+        if callback is not None:
+            def stream_callback(in_data, frame_count, time_info, status):
+                callback(np.frombuffer(in_data, dtype=np.int16).reshape(-1, self.channels))
+                return (None, self._pyaudio.paContinue)
+            options["stream_callback"] = stream_callback
+
+        self.stream = self.p.open(format=self._pyaudio.paInt16, channels=self.channels, rate=self.rate,
+                                  input=True, frames_per_buffer=self.block_size,
+                                  input_device_index=self.device, **options)
+
+    def read(self, num_frames):
+        data = self.stream.read(num_frames, exception_on_overflow=False)
+        return np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+        self.p.terminate()
+
+
+class SoundDeviceSource(AudioSource):
+    """Microfone via sounddevice (PortAudio), com latência configurável."""
+
+    name = "sounddevice"
+
+    def __init__(self, rate=DEFAULT_RATE, channels=1, block_size=DEFAULT_BLOCK_SIZE, device=None,
+                 latency="low"):
+        super().__init__(rate, channels, block_size)
+        import sounddevice as sd
+        self._sd = sd
+        self.device = device
+        self.latency = latency
+        self.stream = None
+        self.device_name = sd.query_devices(device, "input")["name"]
+
+    def open(self, callback=None):
+        options = {}
+        if callback is not None:
+            def stream_callback(indata, frames, time_info, status):
+                callback(indata)
+            options["callback"] = stream_callback
+
+        self.stream = self._sd.InputStream(samplerate=self.rate, channels=self.channels, dtype="int16",
+                                           blocksize=self.block_size, device=self.device,
+                                           latency=self.latency, **options)
+        self.stream.start()
+
+    def read(self, num_frames):
+        data, _ = self.stream.read(num_frames)
+        return data
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+
+
+class GeneratedSource(AudioSource):
+    """Base das fontes sem placa de som: os blocos são produzidos por `_generate`.
+
+    No modo pull, `read` devolve os dados imediatamente, sem esperar. No modo push, uma
+    thread entrega os blocos ao callback, no ritmo do tempo real se `realtime` for True
+    ou o mais rápido possível caso contrário.
+
+    Attributes:
+        realtime (bool): Se o modo push respeita o ritmo do tempo real.
+        finished (bool): Indica que a fonte chegou ao fim (só fontes finitas).
+        position (int): Quadros já entregues.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, channels=1, block_size=DEFAULT_BLOCK_SIZE, realtime=True):
+        super().__init__(rate, channels, block_size)
+        self.realtime = realtime
+        self.finished = False
+        self.position = 0
+        self._thread = None
+        self._running = False
+
+    def _generate(self, num_frames):
+        """Produz os próximos `num_frames` quadros em int16 (quadros, canais)."""
+        raise NotImplementedError
+
+    def open(self, callback=None):
+        if callback is None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._push, args=(callback,), daemon=True)
+        self._thread.start()
+
+    def _push(self, callback):
+        start = time.perf_counter()
+        while self._running and not self.finished:
+            callback(self.read(self.block_size))
+            if self.realtime:
+                delay = start + self.position / self.rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def read(self, num_frames):
+        block = self._generate(num_frames)
+        self.position += num_frames
+        return block
+
+    def close(self):
+        self._running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+
+
+class WavFileSource(GeneratedSource):
+    """Arquivo WAV mapeado em memória, tocado como se fosse um microfone.
+
+    Depois do fim do arquivo, `read` devolve silêncio e `finished` fica True (a menos que `loop`).
+    """
+
+    name = "wav"
+
+    def __init__(self, path, block_size=DEFAULT_BLOCK_SIZE, realtime=True, loop=False):
+        samples, rate = open_wav(path)
+        super().__init__(rate, samples.shape[1], block_size, realtime)
+        self.samples = samples
+        self.loop = loop
+        self.device_name = os.path.basename(path)
+
+    def _generate(self, num_frames):
+        block = np.zeros((num_frames, self.channels), dtype=np.int16)
+        total = len(self.samples)
+        filled = 0
+        while filled < num_frames and total:
+            start = (self.position + filled) % total if self.loop else self.position + filled
+            if start >= total:
+                self.finished = True
+                break
+            count = min(num_frames - filled, total - start)
+            block[filled:filled + count] = to_int16(self.samples[start:start + count])
+            filled += count
+        return block
+
+
+class SyntheticSource(GeneratedSource):
+    """Sinal sintético com harmônicos e ruído, para testes e benchmarks sem microfone.
+
+    A frequência pode ser fixa ou uma sequência de segmentos (frequência, duração) repetida
+    em ciclo; frequência 0 gera silêncio. A fase é contínua entre blocos.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, frequency=440.0, rate=DEFAULT_RATE, channels=1, block_size=DEFAULT_BLOCK_SIZE,
+                 realtime=True, amplitude=8000, harmonics=(1.0, 0.5, 0.25), noise=0.0, seed=None):
+        """Inicializa o gerador.
+
+        Args:
+            frequency (float | list): Frequência em Hz ou lista de (frequência, duração em s).
+            amplitude (float): Amplitude da fundamental na escala int16.
+            harmonics (tuple): Amplitude relativa de cada harmônico, começando pela fundamental.
+            noise (float): Desvio padrão do ruído branco, relativo a `amplitude`.
+            seed (int, optional): Semente do ruído.
+        """
+        super().__init__(rate, channels, block_size, realtime)
+        segments = [(frequency, 1.0)] if np.isscalar(frequency) else list(frequency)
+        self.segment_freqs = np.array([f for f, _ in segments], dtype=np.float64)
+        self.segment_ends = np.cumsum([round(d * rate) for _, d in segments])
+        self.amplitude = amplitude
+        self.harmonics = np.asarray(harmonics, dtype=np.float64)
+        self.noise = noise
+        self.device_name = f"sintético ({len(segments)} segmento(s))"
+        self._phase = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def frequencies_at(self, positions):
+        """Frequência de referência em cada posição (em quadros) do sinal."""
+        positions = np.asarray(positions) % self.segment_ends[-1]
+        return self.segment_freqs[np.searchsorted(self.segment_ends, positions, side="right")]
+
+    def _generate(self, num_frames):
+        freqs = self.frequencies_at(np.arange(self.position, self.position + num_frames))
+        phase = self._phase + np.cumsum(2 * np.pi * freqs / self.rate)
+        self._phase = float(phase[-1] % (2 * np.pi))
+
+        k = np.arange(1, len(self.harmonics) + 1)
+        signal = np.sin(phase[:, np.newaxis] * k) @ self.harmonics * self.amplitude
+        signal[freqs <= 0] = 0.0
+        if self.noise:
+            signal += self._rng.normal(0.0, self.noise * self.amplitude, num_frames)
+
+        block = np.clip(signal, -32768, 32767).astype(np.int16)
+        return np.repeat(block[:, np.newaxis], self.channels, axis=1)
+
+
+SOURCES = {
+    source.name: source
+    for source in (PyAudioSource, SoundDeviceSource, WavFileSource, SyntheticSource)
+}
+
+
+def create_source(backend, **options):
+    """Cria uma fonte de áudio pelo nome.
+
+    Args:
+        backend (str): Um dos nomes em SOURCES ("pyaudio", "sounddevice", "wav", "synthetic").
+        **options: Parâmetros da fonte (por exemplo `path` para "wav").
+
+    Returns:
+        AudioSource: A fonte configurada.
+
+    Raises:
+        ValueError: Se o nome da fonte for desconhecido.
+    """
+    if backend not in SOURCES:
+        raise ValueError(f"Fonte de áudio desconhecida: {backend} (opções: {', '.join(SOURCES)})")
+    return SOURCES[backend](**options)
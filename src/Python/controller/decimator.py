@@ -0,0 +1,83 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+
+TAPS_PER_PHASE = 16   # Coeficientes do filtro por fase polifásica
+CUTOFF = 0.8          # Corte do passa-baixas, como fração da nova frequência de Nyquist
+
+
+class PolyphaseDecimator:
+    """Filtro passa-baixas FIR com decimação, com estado entre blocos.
+
+    Só as amostras que sobrevivem à decimação são calculadas (forma polifásica): cada saída é
+    o produto escalar de uma janela da entrada com o filtro, e as janelas avançam `factor`
+    amostras por vez. As últimas amostras de cada bloco e a fase da decimação são guardadas,
+    de modo que processar o stream em blocos de qualquer tamanho dá o mesmo resultado que
+    processá-lo de uma vez.
+
+    Attributes:
+        factor (int): Fator de decimação.
+        channels (int): Número de canais.
+        taps (numpy.ndarray): Coeficientes do filtro FIR (ganho unitário em DC).
+    """
+
+    def __init__(self, factor, channels=1, taps_per_phase=TAPS_PER_PHASE, cutoff=CUTOFF):
+        """Projeta o filtro e zera o estado.
+
+        Args:
+            factor (int): Fator de decimação (1 desativa o filtro).
+            channels (int): Número de canais dos blocos.
+            taps_per_phase (int): Coeficientes por fase; mais coeficientes dão transição mais estreita.
+            cutoff (float): Corte como fração da nova frequência de Nyquist.
+
+        Raises:
+            ValueError: Se o fator não for um inteiro positivo.
+        """
+        if int(factor) != factor or factor < 1:
+            raise ValueError(f"Fator de decimação inválido: {factor}")
+        self.factor = int(factor)
+        self.channels = channels
+        num_taps = taps_per_phase * self.factor
+        if self.factor == 1:
+            self.taps = np.ones(1, dtype=np.float32)
+        else:
+            self.taps = signal.firwin(num_taps, cutoff / self.factor).astype(np.float32)
+        # Invertido para que cada saída seja um produto escalar direto com a janela
+        self._kernel = np.ascontiguousarray(self.taps[::-1])
+        self.reset()
+
+    def reset(self):
+        """Zera o histórico do filtro e a fase da decimação."""
+        self._state = np.zeros((len(self.taps) - 1, self.channels), dtype=np.float32)
+        self._offset = len(self.taps) - 1
+
+    def process(self, block):
+        """Filtra e decima um bloco, continuando do ponto em que o anterior parou.
+
+        Args:
+            block (numpy.ndarray): Amostras (quadros,) ou (quadros, canais).
+
+        Returns:
+            numpy.ndarray: Amostras decimadas float32, com a mesma forma de canais da entrada.
+        """
+        block = np.asarray(block)
+        if self.factor == 1:
+            return block.astype(np.float32, copy=False)
+
+        mono = block.ndim == 1
+        if mono:
+            block = block[:, np.newaxis]
+        if not len(block):
+            empty = np.empty((0, block.shape[1]), dtype=np.float32)
+            return empty[:, 0] if mono else empty
+        buffer = np.concatenate((self._state, block.astype(np.float32, copy=False)))
+        num_taps = len(self.taps)
+
+        # windows[k] termina na amostra self._offset + k * factor do buffer
+        windows = sliding_window_view(buffer, num_taps, axis=0)[self._offset - num_taps + 1::self.factor]
+        output = windows @ self._kernel
+        count = len(output)
+
+        self._offset += count * self.factor - len(buffer) + num_taps - 1
+        self._state = buffer[len(buffer) - num_taps + 1:].copy()
+        return output[:, 0] if mono else output
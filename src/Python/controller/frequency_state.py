@@ -1,8 +1,16 @@
 current_frequency = 0
+pitch_history = None
 
 def set_current_frequency(frequency):
     global current_frequency
     current_frequency = frequency
 
 def get_current_frequency():
-    return current_frequency
\ No newline at end of file
+    return current_frequency
+
+def set_pitch_history(history):
+    global pitch_history
+    pitch_history = history
+
+def get_pitch_history():
+    return pitch_history
\ No newline at end of file
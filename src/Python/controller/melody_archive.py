@@ -0,0 +1,178 @@
+import argparse
+import json
+import struct
+import numpy as np
+from .note_mapping import NOTE_NAMES
+
+MAGIC = b"MELA"
+VERSION = 1
+NO_NOTE = 255  # Identificador de nota vazia (gravações sem nota reconhecida)
+_HEADER = struct.Struct("<4sHHQQQQ")  # magia, versão, bytes do float, melodias, notas, início e tamanho dos nomes
+HEADER_SIZE = 64
+
+
+def note_dtype(float_dtype=np.float32):
+    """Tipo estruturado de uma nota: frequência, identificador da nota e duração, sem preenchimento."""
+    float_dtype = np.dtype(float_dtype).newbyteorder("<")
+    return np.dtype([("frequency", float_dtype), ("note", np.uint8), ("duration", float_dtype)])
+
+
+def write_archive(path, melodies, float_dtype=np.float32):
+    """Grava melodias no formato binário.
+
+    Layout do arquivo (little-endian):
+    - cabeçalho de HEADER_SIZE bytes;
+    - índice: melodias + 1 posições int64, a melodia i ocupa as notas [índice[i], índice[i+1]);
+    - notas: array estruturado contínuo com o tipo de `note_dtype`;
+    - nomes: JSON em UTF-8 com os nomes das melodias e a tabela de nomes de notas.
+
+    Os nomes de nota de NOTE_NAMES têm identificadores fixos (0 a 11); outros nomes entram na
+    tabela do arquivo. Duração ausente é gravada como NaN.
+
+    Args:
+        path (str): Arquivo de saída.
+        melodies (iterable): Pares (nome, notas), com notas (frequência, nota, duração).
+        float_dtype: np.float32 (compacto; arredonda os valores de melodies.json para precisão
+            simples) ou np.float64 (conversão exata de ida e volta).
+
+    Raises:
+        ValueError: Se o tipo de ponto flutuante não for suportado ou houver nomes de nota demais.
+    """
+    if np.dtype(float_dtype) not in (np.float32, np.float64):
+        raise ValueError(f"Tipo de ponto flutuante não suportado: {float_dtype}")
+    dtype = note_dtype(float_dtype)
+    note_names = list(NOTE_NAMES)
+    note_ids = {name: index for index, name in enumerate(note_names)}
+
+    names, offsets, rows = [], [0], []
+    for name, notes in melodies:
+        names.append(name)
+        for note in notes:
+            note_name = note[1]
+            if note_name is None:
+                note_id = NO_NOTE
+            else:
+                note_id = note_ids.get(note_name)
+                if note_id is None:
+                    if len(note_names) >= NO_NOTE:
+                        raise ValueError("Nomes de nota distintos demais para o identificador de 8 bits")
+                    note_id = note_ids[note_name] = len(note_names)
+                    note_names.append(note_name)
+            duration = note[2] if len(note) > 2 and note[2] is not None else np.nan
+            rows.append((note[0], note_id, duration))
+        offsets.append(len(rows))
+
+    notes = np.array(rows, dtype=dtype)
+    index = np.array(offsets, dtype="<i8")
+    table = json.dumps({"melodies": names, "notes": note_names}, ensure_ascii=False).encode("utf-8")
+    names_offset = HEADER_SIZE + index.nbytes + notes.nbytes
+
+    with open(path, "wb") as file:
+        header = _HEADER.pack(MAGIC, VERSION, dtype["frequency"].itemsize, len(names), len(notes),
+                              names_offset, len(table))
+        file.write(header.ljust(HEADER_SIZE, b"\0"))
+        file.write(index.tobytes())
+        file.write(notes.tobytes())
+        file.write(table)
+
+
+class MelodyArchive:
+    """Leitura de um arquivo de melodias binário mapeado em memória.
+
+    Só o cabeçalho e a tabela de nomes são lidos na abertura; o índice e as notas ficam em
+    `np.memmap`, então ler uma melodia toca apenas os bytes dela.
+
+    Attributes:
+        path (str): Caminho do arquivo.
+        names (list): Nomes das melodias, na ordem do arquivo.
+        note_names (list): Nome de cada identificador de nota.
+        index (numpy.memmap): Posições de início de cada melodia (mais o total no final).
+        notes (numpy.memmap): Todas as notas, com o tipo de `note_dtype`.
+    """
+
+    def __init__(self, path):
+        """Abre o arquivo.
+
+        Raises:
+            ValueError: Se o arquivo não estiver no formato esperado.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            header = file.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise ValueError(f"Arquivo de melodias inválido: {path}")
+            magic, version, float_size, count, note_count, names_offset, names_size = \
+                _HEADER.unpack_from(header)
+            if magic != MAGIC or version != VERSION or float_size not in (4, 8):
+                raise ValueError(f"Arquivo de melodias inválido ou de versão desconhecida: {path}")
+            file.seek(names_offset)
+            table = json.loads(file.read(names_size).decode("utf-8"))
+
+        self.names = table["melodies"]
+        self.note_names = table["notes"]
+        self._ids = {name: position for position, name in enumerate(self.names)}
+        dtype = note_dtype(np.float32 if float_size == 4 else np.float64)
+        self.index = np.memmap(path, dtype="<i8", mode="r", offset=HEADER_SIZE, shape=(count + 1,))
+        if note_count:
+            self.notes = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE + self.index.nbytes,
+                                   shape=(note_count,))
+        else:
+            self.notes = np.empty(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, name):
+        """Posição da melodia com o nome dado, ou None."""
+        return self._ids.get(name)
+
+    def array(self, position):
+        """Notas da melodia na posição dada, como fatia do array estruturado (sem cópia)."""
+        return self.notes[self.index[position]:self.index[position + 1]]
+
+    def melody(self, position):
+        """Notas da melodia na posição dada, como tuplas (frequência, nota, duração) do Python."""
+        notes = self.array(position)
+        note_names = [None if note_id == NO_NOTE else self.note_names[note_id]
+                      for note_id in notes["note"].tolist()]
+        durations = [None if duration != duration else duration for duration in notes["duration"].tolist()]
+        return list(zip(notes["frequency"].tolist(), note_names, durations))
+
+    def __iter__(self):
+        """Pares (nome, notas) de todas as melodias."""
+        for position, name in enumerate(self.names):
+            yield name, self.melody(position)
+
+
+def json_to_archive(json_path, archive_path, float_dtype=np.float32):
+    """Converte um melodies.json para o formato binário."""
+    with open(json_path, 'r', encoding='utf-8') as file:
+        melodies = json.load(file)
+    write_archive(archive_path, melodies.items(), float_dtype)
+
+
+def archive_to_json(archive_path, json_path):
+    """Converte um arquivo binário de volta para o formato de melodies.json."""
+    melodies = {name: [list(note) for note in notes] for name, notes in MelodyArchive(archive_path)}
+    with open(json_path, 'w', encoding='utf-8') as file:
+        json.dump(melodies, file, ensure_ascii=False, indent=4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converte melodias entre JSON e o formato binário.")
+    parser.add_argument("command", choices=["pack", "unpack"], help="pack: JSON -> binário; unpack: binário -> JSON")
+    parser.add_argument("input", help="Arquivo de entrada")
+    parser.add_argument("output", help="Arquivo de saída")
+    parser.add_argument("--exact", action="store_true",
+                        help="Grava frequências e durações em float64 (ida e volta exata)")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        json_to_archive(args.input, args.output, np.float64 if args.exact else np.float32)
+    else:
+        archive_to_json(args.input, args.output)
+    print(f"{len(MelodyArchive(args.output if args.command == 'pack' else args.input))} melodia(s) convertida(s)")
+
+
+if __name__ == "__main__":
+    main()
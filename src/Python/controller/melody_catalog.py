@@ -0,0 +1,145 @@
+import threading
+from .melody_repository import default_repository
+from .melody_model import Melody
+
+
+class MelodyCatalog:
+    """Cache das melodias de um repositório, compartilhado por todo o processo.
+
+    A lista de melodias é lida uma vez; as notas de cada melodia, na primeira vez em que ela é
+    pedida. As melodias entregues são objetos Melody imutáveis, com os valores derivados de cada
+    nota já calculados, e podem ser guardadas sem cópia. Alterações feitas pelo próprio processo chegam pelos avisos do repositório e
+    atualizam só a melodia afetada; alterações de outros processos são percebidas pelo
+    `data_version` do SQLite, uma consulta trivial feita a cada acesso, e fazem o catálogo
+    reler a lista, mantendo as notas já carregadas das melodias que continuam no banco
+    (melodias salvas não mudam, só são apagadas).
+
+    Attributes:
+        repository (MelodyRepository): Repositório de origem.
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+        self._lock = threading.RLock()
+        self._names = {}    # id -> nome, na ordem dos identificadores
+        self._loaded = {}   # id -> Melody com as notas já lidas
+        self._version = None
+        self._revision = 0  # Muda a cada alteração percebida pelo catálogo
+        self._subscribers = []
+        repository.add_listener(self._on_change)
+
+    def _revalidate(self):
+        """Relê a lista se outro processo alterou o banco desde a última consulta."""
+        version = self.repository.data_version()
+        if version != self._version:
+            self._version = version
+            self._reload()
+
+    def _reload(self):
+        self._revision += 1
+        self._names = {melody_id: name for melody_id, name, _ in self.repository.list()}
+        self._loaded = {melody_id: melody for melody_id, melody in self._loaded.items()
+                        if melody_id in self._names}
+
+    def _on_change(self, change, melody_id):
+        with self._lock:
+            self._revision += 1
+            if change == "add":
+                melody = self._load(melody_id)
+                if melody is not None:
+                    self._names[melody_id] = melody.name
+            elif change == "delete":
+                self._names.pop(melody_id, None)
+                self._loaded.pop(melody_id, None)
+            else:
+                self._reload()
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(change, melody_id)
+
+    def _load(self, melody_id):
+        notes = self.repository.get(melody_id)
+        if notes is None:
+            return None
+        name = self._names.get(melody_id) or self.repository.name(melody_id)
+        melody = Melody(melody_id, name, notes)
+        self._loaded[melody_id] = melody
+        return melody
+
+    def get(self, melody_id):
+        """Melodia com o identificador dado, ou None se ela não existir."""
+        with self._lock:
+            self._revalidate()
+            if melody_id not in self._names:
+                return None
+            melody = self._loaded.get(melody_id)
+            return melody if melody is not None else self._load(melody_id)
+
+    def melodies(self):
+        """Todas as melodias, da mais antiga para a mais nova; as que faltam no cache são lidas de uma vez."""
+        with self._lock:
+            self._revalidate()
+            if len(self._loaded) < len(self._names):
+                for melody_id, notes in self.repository.get_all().items():
+                    if melody_id in self._names and melody_id not in self._loaded:
+                        self._loaded[melody_id] = Melody(melody_id, self._names[melody_id], notes)
+            return [self._loaded[melody_id] for melody_id in self._names if melody_id in self._loaded]
+
+    def find(self, name):
+        """Melodia com o nome dado, ou None se ela não existir."""
+        with self._lock:
+            self._revalidate()
+            for melody_id, melody_name in self._names.items():
+                if melody_name == name:
+                    return self.get(melody_id)
+        return None
+
+    def names(self):
+        """Pares (id, nome) das melodias, da mais antiga para a mais nova, sem carregar as notas."""
+        with self._lock:
+            self._revalidate()
+            return list(self._names.items())
+
+    def at(self, index):
+        """Melodia na posição `index` da lista (a ordem usada na seleção do jogo e do Arduino)."""
+        melody_id, _ = self.names()[index]
+        return self.get(melody_id)
+
+    def last(self):
+        """Melodia salva mais recentemente, ou None se o catálogo estiver vazio."""
+        names = self.names()
+        return self.get(names[-1][0]) if names else None
+
+    def __len__(self):
+        return len(self.names())
+
+    def revision(self):
+        """Contador que muda sempre que o conteúdo do catálogo muda, para caches derivados dele."""
+        with self._lock:
+            self._revalidate()
+            return self._revision
+
+    def subscribe(self, callback):
+        """Registra uma função chamada com (alteração, id) quando este processo altera as melodias."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Remove uma função registrada com `subscribe`."""
+        with self._lock:
+            self._subscribers.remove(callback)
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def catalog_for(repository=None):
+    """Catálogo compartilhado de um repositório (o padrão do processo se None)."""
+    if repository is None:
+        repository = default_repository()
+    with _catalogs_lock:
+        catalog = _catalogs.get(repository)
+        if catalog is None:
+            catalog = _catalogs[repository] = MelodyCatalog(repository)
+        return catalog
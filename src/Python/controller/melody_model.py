@@ -0,0 +1,143 @@
+import math
+from .note_mapping import frequency_to_note, NOTE_NAMES, CONCERT_MIDI, CONCERT_PITCH
+
+# Tolerância, em Hz, em torno da frequência esperada em cada nível de dificuldade
+DIFFICULTY_TOLERANCE = {1: 130, 2: 80, 3: 60}
+
+# Altura-alvo do ventilador para cada nota natural (notas com sustenido usam a natural abaixo)
+FAN_HEIGHTS = {
+    "dó": 3,
+    "ré": 4,
+    "mi": 5,
+    "fá": 6,
+    "sol": 7,
+    "lá": 8,
+    "si": 9
+}
+
+
+class _Frozen:
+    """Base dos objetos imutáveis do modelo: atributos só podem ser definidos na construção."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+
+class Note(_Frozen):
+    """Nota de uma melodia, com os valores derivados calculados uma única vez na carga.
+
+    Para compatibilidade com o formato antigo, a nota também se comporta como a tupla
+    (frequência, nome, duração): pode ser desempacotada e indexada.
+
+    Attributes:
+        frequency (float): Frequência esperada em Hz.
+        name (str | None): Nome da nota como foi gravado (por exemplo, "lá").
+        duration (float | None): Duração em segundos (None nas gravações nota a nota).
+        midi (int | None): Número MIDI mais próximo (None sem frequência).
+        semitones (float | None): Altura exata em semitons MIDI, com a fração.
+        octave (int | None): Oitava (lá central = 4).
+        cents (float): Desvio em cents em relação à nota do temperamento igual.
+        fan_height (int | None): Altura-alvo do ventilador para esta nota (None sem frequência).
+        bands (tuple): Faixa (mínima, máxima) aceita em Hz em cada nível de dificuldade.
+    """
+
+    __slots__ = ("frequency", "name", "duration", "midi", "semitones", "octave", "cents",
+                 "fan_height", "bands")
+
+    def __init__(self, frequency, name=None, duration=None):
+        frequency = float(frequency)
+        info = frequency_to_note(frequency)
+        if name is None and info is not None:
+            name = info.name
+        init = object.__setattr__
+        init(self, "frequency", frequency)
+        init(self, "name", name)
+        init(self, "duration", None if duration is None else float(duration))
+        init(self, "midi", info.midi if info else None)
+        init(self, "semitones", CONCERT_MIDI + 12 * math.log2(frequency / CONCERT_PITCH) if info else None)
+        init(self, "octave", info.octave if info else None)
+        init(self, "cents", info.cents if info else 0.0)
+        init(self, "fan_height", _fan_height(name, info))
+        init(self, "bands", tuple((frequency - tolerance, frequency + tolerance)
+                                  for tolerance in DIFFICULTY_TOLERANCE.values()))
+
+    def band(self, difficulty):
+        """Faixa (mínima, máxima) de frequência aceita no nível de dificuldade (1 a 3)."""
+        return self.bands[min(max(int(difficulty), 1), len(self.bands)) - 1]
+
+    def __iter__(self):
+        yield self.frequency
+        yield self.name
+        yield self.duration
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.frequency, self.name, self.duration)[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, Note):
+            return NotImplemented
+        return (self.frequency, self.name, self.duration) == (other.frequency, other.name, other.duration)
+
+    def __hash__(self):
+        return hash((self.frequency, self.name, self.duration))
+
+    def __repr__(self):
+        return f"Note({self.frequency!r}, {self.name!r}, {self.duration!r})"
+
+
+def _fan_height(name, info):
+    """Altura do ventilador pelo nome gravado ou, se ele não for uma nota conhecida, pela frequência."""
+    height = FAN_HEIGHTS.get(name.rstrip("#")) if name else None
+    if height is None and info is not None:
+        height = FAN_HEIGHTS[NOTE_NAMES[info.midi % 12].rstrip("#")]
+    return height
+
+
+class Melody(_Frozen):
+    """Melodia imutável: identificador, nome e a sequência de notas.
+
+    Indexar, iterar e `len` se referem às notas, como na antiga lista de melodies.json.
+
+    Attributes:
+        id (int | None): Identificador no repositório.
+        name (str): Nome da melodia.
+        notes (tuple): Notas (Note) em ordem.
+        duration (float): Soma das durações conhecidas, em segundos.
+    """
+
+    __slots__ = ("id", "name", "notes", "duration")
+
+    def __init__(self, melody_id, name, notes):
+        """Cria a melodia.
+
+        Args:
+            melody_id (int | None): Identificador no repositório.
+            name (str): Nome da melodia.
+            notes (iterable): Note ou tuplas (frequência, nota, duração).
+        """
+        notes = tuple(note if isinstance(note, Note) else Note(*note) for note in notes)
+        init = object.__setattr__
+        init(self, "id", melody_id)
+        init(self, "name", name)
+        init(self, "notes", notes)
+        init(self, "duration", sum(note.duration for note in notes if note.duration is not None))
+
+    def __len__(self):
+        return len(self.notes)
+
+    def __iter__(self):
+        return iter(self.notes)
+
+    def __getitem__(self, index):
+        return self.notes[index]
+
+    def __repr__(self):
+        return f"Melody({self.id!r}, {self.name!r}, {len(self.notes)} notas)"
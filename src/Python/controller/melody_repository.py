@@ -0,0 +1,345 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+MELODIES_FILE = os.path.join(PROJECT_DIR, "melodies.json")  # Formato antigo, importado na primeira abertura
+DATABASE_FILE = os.path.join(PROJECT_DIR, "melodies.db")    # Banco SQLite com as melodias
+BUSY_TIMEOUT = 5.0  # Espera máxima (s) por outro processo que esteja gravando no banco
+NAME_PREFIX = "melodia"  # Nome padrão das melodias: "melodia <id>"
+MIGRATED_VERSION = 1  # PRAGMA user_version depois da migração do JSON (feita ou dispensada)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS melodies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS notes (
+    melody_id INTEGER NOT NULL REFERENCES melodies(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    frequency REAL NOT NULL,
+    note TEXT,
+    duration REAL,
+    PRIMARY KEY (melody_id, position)
+) WITHOUT ROWID;
+"""
+
+
+class MelodyRepository:
+    """Guarda as melodias em um banco SQLite.
+
+    Cada melodia tem um identificador numérico que nunca é reaproveitado (AUTOINCREMENT),
+    mesmo depois de remoções, e um nome único. As notas ficam em uma tabela própria, indexada
+    pela melodia, então salvar ou apagar uma melodia custa o tamanho dela e não o da biblioteca.
+    Cada operação é uma transação, e o modo WAL permite que o gravador e o jogo usem o mesmo
+    banco ao mesmo tempo sem sobrescrever as alterações um do outro.
+
+    As notas são tuplas (frequência, nota, duração), como no antigo melodies.json; a duração
+    é None nas gravações nota a nota, que não a medem.
+
+    Attributes:
+        path (str): Caminho do banco.
+    """
+
+    def __init__(self, path=DATABASE_FILE, json_path=None):
+        """Abre (ou cria) o banco.
+
+        Args:
+            path (str): Caminho do arquivo SQLite (":memory:" para um banco temporário).
+            json_path (str, optional): Arquivo JSON no formato antigo importado na primeira
+                abertura de um banco vazio, para migrar as melodias já gravadas.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                                           isolation_level=None)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(_SCHEMA)
+        self._migrate(json_path)
+
+    def _migrate(self, json_path):
+        """Importa o JSON antigo só na primeira abertura do banco, nunca depois.
+
+        A migração fica registrada em `PRAGMA user_version`, então um banco esvaziado pelo usuário
+        continua vazio nas próximas aberturas em vez de receber o JSON de novo com novos ids.
+        """
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= MIGRATED_VERSION:
+            return
+        if json_path is not None and os.path.exists(json_path) and not len(self):
+            self.import_json(json_path)
+        with self._transaction():
+            self._connection.execute(f"PRAGMA user_version = {MIGRATED_VERSION}")
+
+    def _transaction(self):
+        return _Transaction(self._connection, self._lock)
+
+    def add_listener(self, callback):
+        """Registra uma função chamada depois de cada alteração feita por este repositório.
+
+        A função recebe o tipo da alteração ("add", "delete" ou "import") e o identificador da
+        melodia (None em "import"). Alterações de outros processos não são avisadas; para
+        percebê-las, compare `data_version`.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Remove uma função registrada com `add_listener`."""
+        self._listeners.remove(callback)
+
+    def _notify(self, change, melody_id):
+        for callback in list(self._listeners):
+            callback(change, melody_id)
+
+    def data_version(self):
+        """Contador que muda quando outra conexão (de outro processo, por exemplo) altera o banco."""
+        with self._lock:
+            return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def _insert(self, cursor, notes, name):
+        cursor.execute("INSERT INTO melodies (name) VALUES (?)", (name,))
+        melody_id = cursor.lastrowid
+        if name is None:
+            cursor.execute("UPDATE melodies SET name = ? WHERE id = ?",
+                           (f"{NAME_PREFIX} {melody_id}", melody_id))
+        cursor.executemany(
+            "INSERT INTO notes (melody_id, position, frequency, note, duration) VALUES (?, ?, ?, ?, ?)",
+            ((melody_id, position, float(note[0]), note[1], _duration(note))
+             for position, note in enumerate(notes)),
+        )
+        return melody_id
+
+    def add(self, notes, name=None):
+        """Salva uma melodia.
+
+        Args:
+            notes (list): Tuplas (frequência, nota, duração) ou (frequência, nota).
+            name (str, optional): Nome único; por padrão, "melodia <id>".
+
+        Returns:
+            int: O identificador da nova melodia.
+
+        Raises:
+            ValueError: Se já existir uma melodia com esse nome.
+        """
+        try:
+            with self._transaction() as cursor:
+                melody_id = self._insert(cursor, notes, name)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Já existe uma melodia chamada {name!r}") from None
+        self._notify("add", melody_id)
+        return melody_id
+
+    def add_many(self, melodies):
+        """Salva várias melodias em uma única transação.
+
+        Nomes que já existem (no banco ou no próprio lote) recebem um sufixo " (2)", " (3)"...
+
+        Args:
+            melodies (iterable): Pares (nome, notas); nome None usa o padrão "melodia <id>".
+
+        Returns:
+            list: Identificadores das novas melodias, na ordem recebida.
+        """
+        ids = []
+        with self._transaction() as cursor:
+            for name, notes in melodies:
+                if name is not None:
+                    name = self._unique_name(cursor, name)
+                ids.append(self._insert(cursor, notes, name))
+        if ids:
+            self._notify("import", None)
+        return ids
+
+    @staticmethod
+    def _unique_name(cursor, name):
+        candidate, suffix = name, 1
+        while cursor.execute("SELECT 1 FROM melodies WHERE name = ?", (candidate,)).fetchone() is not None:
+            suffix += 1
+            candidate = f"{name} ({suffix})"
+        return candidate
+
+    def get(self, melody_id):
+        """Notas da melodia com o identificador dado.
+
+        Returns:
+            list | None: Tuplas (frequência, nota, duração) em ordem, ou None se ela não existir.
+        """
+        with self._lock:
+            if self._connection.execute("SELECT 1 FROM melodies WHERE id = ?", (melody_id,)).fetchone() is None:
+                return None
+            return self._connection.execute(
+                "SELECT frequency, note, duration FROM notes WHERE melody_id = ? ORDER BY position",
+                (melody_id,),
+            ).fetchall()
+
+    def get_all(self):
+        """Notas de todas as melodias em uma única consulta.
+
+        Returns:
+            dict: id -> lista de tuplas (frequência, nota, duração), na ordem dos identificadores.
+        """
+        with self._lock:
+            ids = self._connection.execute("SELECT id FROM melodies ORDER BY id")
+            melodies = {melody_id: [] for (melody_id,) in ids}
+            rows = self._connection.execute(
+                "SELECT melody_id, frequency, note, duration FROM notes ORDER BY melody_id, position")
+            for melody_id, frequency, note, duration in rows:
+                melodies[melody_id].append((frequency, note, duration))
+        return melodies
+
+    def find(self, name):
+        """Identificador da melodia com o nome dado, ou None."""
+        with self._lock:
+            row = self._connection.execute("SELECT id FROM melodies WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def name(self, melody_id):
+        """Nome da melodia com o identificador dado, ou None."""
+        with self._lock:
+            row = self._connection.execute("SELECT name FROM melodies WHERE id = ?", (melody_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_by_name(self, name):
+        """Notas da melodia com o nome dado, ou None se ela não existir."""
+        melody_id = self.find(name)
+        return None if melody_id is None else self.get(melody_id)
+
+    def list(self):
+        """Melodias guardadas, da mais antiga para a mais nova.
+
+        Returns:
+            list: Tuplas (id, nome, número de notas).
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT m.id, m.name, COUNT(n.position) FROM melodies m "
+                "LEFT JOIN notes n ON n.melody_id = m.id GROUP BY m.id ORDER BY m.id"
+            ).fetchall()
+
+    def last_id(self):
+        """Identificador da melodia salva mais recentemente, ou None se não houver nenhuma."""
+        with self._lock:
+            return self._connection.execute("SELECT MAX(id) FROM melodies").fetchone()[0]
+
+    def delete(self, melody_id):
+        """Apaga uma melodia e suas notas.
+
+        Returns:
+            bool: False se a melodia não existia.
+        """
+        with self._transaction() as cursor:
+            cursor.execute("DELETE FROM melodies WHERE id = ?", (melody_id,))
+            deleted = cursor.rowcount > 0
+        if deleted:
+            self._notify("delete", melody_id)
+        return deleted
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM melodies").fetchone()[0]
+
+    def import_json(self, path):
+        """Importa as melodias de um arquivo no formato antigo ({nome: [[frequência, nota, duração], ...]}).
+
+        A importação é uma única transação; nomes que já existem no banco são ignorados.
+
+        Returns:
+            int: Quantas melodias foram importadas.
+        """
+        with open(path, 'r', encoding='utf-8') as file:
+            melodies = json.load(file)
+        imported = 0
+        with self._transaction() as cursor:
+            for name, notes in melodies.items():
+                if cursor.execute("SELECT 1 FROM melodies WHERE name = ?", (name,)).fetchone() is None:
+                    self._insert(cursor, notes, name)
+                    imported += 1
+        if imported:
+            self._notify("import", None)
+        return imported
+
+    def export_json(self, path):
+        """Exporta todas as melodias para um arquivo no formato antigo do melodies.json."""
+        notes = self.get_all()
+        melodies = {name: [list(note) for note in notes[melody_id]] for melody_id, name, _ in self.list()}
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(melodies, file, ensure_ascii=False, indent=4)
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Transaction:
+    """Transação explícita (BEGIN IMMEDIATE) que faz commit ao sair ou rollback em caso de erro."""
+
+    def __init__(self, connection, lock):
+        self._connection = connection
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            # IMMEDIATE reserva a escrita já no início, evitando impasses entre processos
+            self._connection.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            self._lock.release()
+            raise
+        return self._connection.cursor()
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            self._connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        finally:
+            self._lock.release()
+
+
+def _duration(note):
+    return float(note[2]) if len(note) > 2 and note[2] is not None else None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_repository():
+    """Repositório compartilhado do processo, em DATABASE_FILE (migrando MELODIES_FILE na criação)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = MelodyRepository(DATABASE_FILE, json_path=MELODIES_FILE)
+        return _default
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lista, importa e exporta o banco de melodias.")
+    parser.add_argument("command", choices=["list", "import", "export"], help="Operação")
+    parser.add_argument("file", nargs="?", default=MELODIES_FILE, help="Arquivo JSON no formato antigo")
+    parser.add_argument("--database", default=DATABASE_FILE, help="Banco SQLite")
+    args = parser.parse_args(argv)
+
+    with MelodyRepository(args.database) as repository:
+        if args.command == "import":
+            print(f"{repository.import_json(args.file)} melodia(s) importada(s) de {args.file}")
+        elif args.command == "export":
+            repository.export_json(args.file)
+            print(f"{len(repository)} melodia(s) exportada(s) para {args.file}")
+        else:
+            for melody_id, name, count in repository.list():
+                print(f"{melody_id:>4}  {name}  ({count} notas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import argparse
+import math
+import threading
+from collections import namedtuple, defaultdict, Counter
+from itertools import product
+from .melody_catalog import catalog_for
+from .melody_model import Note
+from .note_mapping import CONCERT_MIDI, CONCERT_PITCH
+
+NGRAM_SIZE = 3          # Intervalos por chave do índice invertido
+CANDIDATES = 30         # Melodias com mais n-gramas em comum que passam para o alinhamento
+BAND = 3                # Meia largura da faixa em torno da diagonal do alinhamento
+GAP_COST = 1.5          # Custo de uma nota a mais ou a menos no trecho cantado
+INTERVAL_CAP = 3.0      # Erro máximo de intervalo (semitons) contado em uma substituição
+DURATION_WEIGHT = 0.3   # Peso do erro na razão de durações (em oitavas de tempo) no custo
+DURATION_CAP = 2.0      # Erro máximo de razão de durações contado em uma substituição
+AMBIGUOUS_SEMITONES = 0.3  # Intervalos a menos disso de meio semitom buscam os dois arredondamentos
+MAX_INTERVAL = 12       # Intervalos maiores que uma oitava são limitados a ela nas chaves
+COMMON_FRACTION = 0.05  # N-gramas presentes em mais que esta fração das melodias não votam...
+COMMON_MINIMUM = 50     # ...desde que apareçam em mais melodias que isso (bibliotecas pequenas)
+
+SearchResult = namedtuple("SearchResult", ["melody_id", "name", "distance"])
+
+
+def melody_features(notes):
+    """Transforma notas em uma sequência invariante a transposição e andamento.
+
+    Args:
+        notes (iterable): Note ou tuplas (frequência, nota, duração); notas sem voz são ignoradas.
+
+    Returns:
+        tuple: (intervalos em semitons entre notas seguidas, log2 da razão entre suas durações).
+        Durações ausentes contam como razão 1.
+    """
+    pitches, durations = [], []
+    for note in notes:
+        if isinstance(note, Note):
+            semitones, duration = note.semitones, note.duration
+        else:
+            # Tuplas cruas (como as do repositório) não passam pela construção de Note, que é cara
+            frequency, duration = note[0], note[2] if len(note) > 2 else None
+            semitones = (CONCERT_MIDI + 12 * math.log2(frequency / CONCERT_PITCH)
+                         if frequency and frequency > 0 else None)
+        if semitones is not None:
+            pitches.append(semitones)
+            durations.append(duration if duration and duration > 0 else None)
+    intervals = [b - a for a, b in zip(pitches, pitches[1:])]
+    ratios = [math.log2(b / a) if a and b else 0.0 for a, b in zip(durations, durations[1:])]
+    return intervals, ratios
+
+
+def _quantize(interval):
+    return max(-MAX_INTERVAL, min(MAX_INTERVAL, round(interval)))
+
+
+def _roundings(interval):
+    """Arredondamentos plausíveis de um intervalo cantado (os dois vizinhos se estiver na fronteira)."""
+    nearest = _quantize(interval)
+    fraction = interval - math.floor(interval)
+    if abs(fraction - 0.5) < AMBIGUOUS_SEMITONES:
+        return {_quantize(math.floor(interval)), _quantize(math.ceil(interval))}
+    return {nearest}
+
+
+class MelodyIndex:
+    """Busca por cantarolar: encontra as melodias parecidas com um trecho cantado.
+
+    Cada melodia vira a sequência de intervalos entre notas seguidas e de razões entre suas
+    durações, que não muda com a transposição nem com o andamento. Um índice invertido leva
+    cada n-grama de intervalos arredondados às posições em que ele aparece; a busca vota nas
+    diagonais (deslocamento entre o trecho e a melodia) que compartilham n-gramas e só as
+    CANDIDATES melodias mais votadas passam por um alinhamento restrito a uma faixa em torno da
+    melhor diagonal, que tolera notas a mais, a menos e desafinadas.
+
+    Os votos de cada n-grama pesam log(N/df), em que df é o número de melodias que o contêm:
+    n-gramas raros decidem os candidatos e os comuns (notas repetidas, escalas) quase não contam.
+    Os que aparecem em mais de COMMON_FRACTION das melodias nem chegam a votar, o que também
+    evita percorrer listas de ocorrências do tamanho da biblioteca.
+
+    Com um catálogo, o índice acompanha o banco: antes de cada busca, se o catálogo mudou, só as
+    melodias novas são indexadas e as apagadas são removidas. `prepare` faz essa atualização em
+    uma thread de fundo, para que a primeira busca não pague a indexação da biblioteca inteira.
+
+    Attributes:
+        catalog (MelodyCatalog | None): Catálogo acompanhado, se houver.
+    """
+
+    def __init__(self, catalog=None):
+        self.catalog = catalog
+        self._postings = defaultdict(dict)  # chave -> {id: [posições]}
+        self._features = {}                 # id -> (intervalos, razões)
+        self._keys = {}                     # id -> chaves do id no índice
+        self._short = set()                 # Melodias curtas demais para ter um n-grama
+        self._revision = None
+        self._lock = threading.Lock()
+        self._preparing = None  # Thread de fundo que está atualizando o índice, se houver
+        if catalog is not None:
+            catalog.subscribe(self._on_change)
+
+    def __len__(self):
+        return len(self._features)
+
+    def add(self, melody_id, notes):
+        """Indexa (ou reindexa) uma melodia."""
+        with self._lock:
+            self._add(melody_id, notes)
+
+    def _add(self, melody_id, notes):
+        if melody_id in self._features:
+            self._remove(melody_id)
+        intervals, ratios = melody_features(notes)
+        self._features[melody_id] = (intervals, ratios)
+        keys = [tuple(map(_quantize, intervals[i:i + NGRAM_SIZE]))
+                for i in range(len(intervals) - NGRAM_SIZE + 1)]
+        for position, key in enumerate(keys):
+            self._postings[key].setdefault(melody_id, []).append(position)
+        self._keys[melody_id] = set(keys)
+        if not keys:
+            self._short.add(melody_id)
+
+    def remove(self, melody_id):
+        """Remove uma melodia do índice (sem efeito se ela não estiver indexada)."""
+        with self._lock:
+            self._remove(melody_id)
+
+    def _remove(self, melody_id):
+        for key in self._keys.pop(melody_id, ()):
+            postings = self._postings[key]
+            postings.pop(melody_id, None)
+            if not postings:
+                del self._postings[key]
+        self._features.pop(melody_id, None)
+        self._short.discard(melody_id)
+
+    def _sync(self):
+        """Traz o índice para o estado atual do catálogo, indexando só o que mudou."""
+        revision = self.catalog.revision()
+        if revision == self._revision:
+            return
+        current = [melody_id for melody_id, _ in self.catalog.names()]
+        for melody_id in self._features.keys() - set(current):
+            self._remove(melody_id)
+        missing = [melody_id for melody_id in current if melody_id not in self._features]
+        if len(missing) > CANDIDATES:
+            # Na primeira busca (ou depois de uma importação), lê as notas cruas em uma consulta só,
+            # sem montar (nem prender o catálogo para montar) um Melody por melodia
+            melodies = self.catalog.repository.get_all().items()
+        else:
+            melodies = [(melody.id, melody.notes) for melody in map(self.catalog.get, missing)
+                        if melody is not None]
+        for melody_id, notes in melodies:
+            if melody_id not in self._features:
+                self._add(melody_id, notes)
+        self._revision = revision
+
+    def prepare(self):
+        """Atualiza o índice em uma thread de fundo (sem efeito sem catálogo ou se já estiver em curso).
+
+        Returns:
+            threading.Thread | None: A thread da atualização.
+        """
+        if self.catalog is None:
+            return None
+        with self._lock:
+            thread = self._preparing
+            if thread is None or not thread.is_alive():
+                thread = self._preparing = threading.Thread(target=self._prepare, daemon=True)
+                thread.start()
+            return thread
+
+    def _prepare(self):
+        with self._lock:
+            self._sync()
+
+    def _on_change(self, change, melody_id):
+        # Importações trazem muitas melodias de uma vez; elas são indexadas antes da próxima busca
+        if change == "import":
+            self.prepare()
+
+    def _candidates(self, intervals):
+        """Vota nas diagonais (posição na melodia - posição no trecho) com n-gramas em comum.
+
+        Cada n-grama vota com peso log(N/df); os comuns demais (ver COMMON_FRACTION) não votam.
+        """
+        total = len(self._features)
+        common = max(COMMON_FRACTION * total, COMMON_MINIMUM)
+        votes = Counter()
+        for start in range(len(intervals) - NGRAM_SIZE + 1):
+            options = [_roundings(interval) for interval in intervals[start:start + NGRAM_SIZE]]
+            for key in product(*options):
+                postings = self._postings.get(key)
+                if not postings or len(postings) > common:
+                    continue
+                weight = math.log(total / len(postings))
+                if weight <= 0:
+                    continue
+                for melody_id, positions in postings.items():
+                    for position in positions:
+                        votes[melody_id, position - start] += weight
+
+        # Notas a mais ou a menos no trecho deslocam a diagonal; somam-se os votos da faixa vizinha
+        scores = {}
+        for (melody_id, diagonal), count in votes.items():
+            score = count + sum(votes.get((melody_id, diagonal + shift), 0) for shift in (-1, 1))
+            if score > scores.get(melody_id, (0.0, 0))[0]:
+                scores[melody_id] = (score, diagonal)
+        ranked = sorted(scores.items(), key=lambda item: item[1][0], reverse=True)[:CANDIDATES]
+        best = {melody_id: diagonal for melody_id, (_, diagonal) in ranked}
+        for melody_id in self._short:
+            best.setdefault(melody_id, 0)
+        return best
+
+    def search(self, notes, limit=5):
+        """Procura as melodias mais parecidas com um trecho.
+
+        Args:
+            notes (iterable): Notas do trecho, tuplas (frequência, nota, duração), por exemplo
+                as de uma gravação contínua do `MelodyRecorder`.
+            limit (int): Número máximo de resultados.
+
+        Returns:
+            list: SearchResult (id, nome, distância média por nota), do mais parecido ao menos.
+
+        Raises:
+            ValueError: Se o trecho tiver menos de duas notas com voz.
+        """
+        intervals, ratios = melody_features(notes)
+        if not intervals:
+            raise ValueError("O trecho precisa de pelo menos duas notas para a busca")
+        with self._lock:
+            if self.catalog is not None:
+                self._sync()
+            candidates = self._candidates(intervals)
+            scored = []
+            for melody_id, diagonal in candidates.items():
+                melody_intervals, melody_ratios = self._features[melody_id]
+                cost = banded_alignment(intervals, ratios, melody_intervals, melody_ratios, diagonal)
+                scored.append((cost / len(intervals), melody_id))
+        scored.sort()
+
+        results = []
+        for distance, melody_id in scored[:limit]:
+            name = None
+            if self.catalog is not None:
+                melody = self.catalog.get(melody_id)
+                name = melody.name if melody is not None else None
+            results.append(SearchResult(melody_id, name, distance))
+        return results
+
+
+def banded_alignment(query, query_ratios, target, target_ratios, diagonal, band=BAND):
+    """Custo do melhor alinhamento do trecho inteiro com uma parte da melodia.
+
+    Programação dinâmica restrita às células a no máximo `band` posições da diagonal
+    (posição na melodia = posição no trecho + `diagonal`); o alinhamento pode começar e terminar
+    em qualquer ponto da melodia dentro da faixa.
+
+    Returns:
+        float: Custo total (0 para um trecho idêntico a uma parte da melodia).
+    """
+    m, n = len(query), len(target)
+    infinity = float("inf")
+    # previous[j] = custo de alinhar query[:i] terminando em target[:j]
+    previous = {j: 0.0 for j in range(max(0, diagonal - band), min(n, diagonal + band) + 1)}
+    for i in range(1, m + 1):
+        low, high = max(0, i + diagonal - band), min(n, i + diagonal + band)
+        current = {}
+        for j in range(low, high + 1):
+            best = previous.get(j, infinity) + GAP_COST  # nota a mais no trecho
+            if j > 0:
+                diagonal_cost = previous.get(j - 1, infinity)
+                if diagonal_cost < infinity:
+                    substitution = (min(abs(query[i - 1] - target[j - 1]), INTERVAL_CAP)
+                                    + DURATION_WEIGHT * min(abs(query_ratios[i - 1] - target_ratios[j - 1]),
+                                                            DURATION_CAP))
+                    best = min(best, diagonal_cost + substitution)
+                best = min(best, current.get(j - 1, infinity) + GAP_COST)  # nota a menos no trecho
+            current[j] = best
+        previous = current
+    if not previous:
+        return GAP_COST * m
+    return min(previous.values())
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def search_index(catalog=None):
+    """Índice de busca compartilhado de um catálogo (o padrão do processo se None).
+
+    Na criação, o índice começa a ser montado em uma thread de fundo.
+    """
+    if catalog is None:
+        catalog = catalog_for()
+    with _indexes_lock:
+        index = _indexes.get(catalog)
+        if index is None:
+            index = _indexes[catalog] = MelodyIndex(catalog)
+            index.prepare()  # A indexação da biblioteca começa já, fora de quem pediu o índice
+        return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Procura no banco as melodias parecidas com um trecho cantado.")
+    parser.add_argument("input", help="Gravação WAV do trecho cantado")
+    parser.add_argument("--engine", default="yin", help="Motor de estimativa (fft, yin, mpm, hps)")
+    parser.add_argument("--limit", type=int, default=5, help="Número de resultados")
+    args = parser.parse_args(argv)
+
+    from services.offline_analysis import analyze_file, contour_notes
+    contour, rate, _ = analyze_file(args.input, engine=args.engine)
+    notes = contour_notes(contour)
+    print(f"{len(notes)} nota(s) no trecho")
+    for result in search_index().search(notes, args.limit):
+        print(f"{result.distance:6.2f}  {result.name}")
+
+
+if __name__ == "__main__":
+    main()
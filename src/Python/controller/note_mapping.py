@@ -0,0 +1,65 @@
+from collections import namedtuple
+import numpy as np
+
+CONCERT_PITCH = 440.0  # Frequência do lá central (MIDI 69)
+CONCERT_MIDI = 69
+
+NOTE_NAMES = ("dó", "dó#", "ré", "ré#", "mi", "fá", "fá#", "sol", "sol#", "lá", "lá#", "si")
+_NOTE_NAME_ARRAY = np.array(NOTE_NAMES)
+
+NoteInfo = namedtuple("NoteInfo", ["name", "octave", "midi", "cents"])
+NoteArrays = namedtuple("NoteArrays", ["pitch_class", "octave", "midi", "cents"])
+
+
+def frequencies_to_notes(frequencies):
+    """Mapeia frequências para notas do temperamento igual, de forma vetorizada.
+
+    A nota é obtida diretamente por log2, sem percorrer uma tabela de frequências.
+
+    Args:
+        frequencies (numpy.ndarray): Frequências em Hz; valores <= 0 são tratados como silêncio.
+
+    Returns:
+        NoteArrays: Arrays com a classe de altura (0 = dó), a oitava, o número MIDI e o desvio
+        em cents. Para silêncio, `midi` e `pitch_class` valem -1 e `cents` vale 0.
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    voiced = frequencies > 0
+
+    exact = np.zeros_like(frequencies)
+    np.log2(frequencies, out=exact, where=voiced)
+    exact = CONCERT_MIDI + 12 * (exact - np.log2(CONCERT_PITCH))
+
+    midi = np.where(voiced, np.rint(exact), -1).astype(np.int64)
+    cents = np.where(voiced, 100 * (exact - midi), 0.0)
+    pitch_class = np.where(voiced, midi % 12, -1)
+    octave = np.where(voiced, midi // 12 - 1, 0)
+    return NoteArrays(pitch_class, octave, midi, cents)
+
+
+def frequency_to_note(frequency):
+    """Mapeia uma frequência para a nota mais próxima, em O(1).
+
+    Args:
+        frequency (float): Frequência em Hz.
+
+    Returns:
+        NoteInfo: Nome da nota, oitava (lá central = 4), número MIDI e desvio em cents,
+        ou None se a frequência não for positiva.
+    """
+    if not frequency > 0:
+        return None
+    exact = CONCERT_MIDI + 12 * np.log2(frequency / CONCERT_PITCH)
+    midi = int(round(exact))
+    return NoteInfo(NOTE_NAMES[midi % 12], midi // 12 - 1, midi, float(100 * (exact - midi)))
+
+
+def note_names(pitch_classes):
+    """Converte um array de classes de altura nos nomes das notas (silêncio vira string vazia)."""
+    pitch_classes = np.asarray(pitch_classes)
+    return np.where(pitch_classes >= 0, _NOTE_NAME_ARRAY[pitch_classes % 12], "")
+
+
+def midi_to_frequency(midi):
+    """Frequência, em Hz, de um número MIDI (aceita arrays)."""
+    return CONCERT_PITCH * 2.0 ** ((np.asarray(midi) - CONCERT_MIDI) / 12)
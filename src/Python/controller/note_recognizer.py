@@ -1,109 +1,320 @@
-import pyaudio
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
 import time
+import threading
+from .audio_buffer import AudioRingBuffer
+from .audio_source import create_source
+from .pitch_estimators import create_estimator
+from .note_mapping import frequency_to_note
+from .pitch_history import PitchHistory
+from .voicing_gate import VoicingGate, PitchReading
+from .decimator import PolyphaseDecimator
+from .pitch_smoothing import create_smoother
 
 RATE = 44100          # Taxa de amostragem
 CHUNK = 2048          # Aumentado para melhor resolução de frequência
 MIN_FREQ = 80         # Frequência mínima para voz humana
 MAX_FREQ = 1100      # Frequência máxima para voz humana
-
-NOTE_FREQUENCIES = {
-    "dó": [261.63, 523.25, 1046.5], "dó#": [277.18, 554.37, 1108.73],
-    "ré": [293.66, 587.33, 1174.66], "ré#": [311.13, 622.25, 1244.51],
-    "mi": [329.63, 659.26, 1318.51], "fá": [349.23, 698.46, 1396.91],
-    "fá#": [369.99, 739.99, 1479.98], "sol": [392.00, 783.99, 1567.98],
-    "sol#": [415.30, 830.61, 1661.22], "lá": [440.00, 880.00, 1760.00],
-    "lá#": [466.16, 932.33, 1864.66], "si": [493.88, 987.77, 1975.53]
-}
+HOP_SIZE = 512        # Avanço entre janelas no modo streaming (~11.6 ms)
+BUFFER_SECONDS = 2    # Capacidade do buffer circular do modo streaming
+SMOOTHING = "median"  # Suavização aplicada a cada janela (ver pitch_smoothing.SMOOTHERS)
+REFINEMENT = "gaussian"  # Interpolação sub-bin do pico escolhido pelo motor
+HISTORY_CAPACITY = 1024  # Leituras mantidas no histórico de frequências
+AUDIO_BACKEND = "pyaudio"  # Fonte de áudio padrão (ver audio_source.SOURCES)
+DECIMATION = 1        # Fator de decimação antes da análise (4 leva 44.1 kHz a 11.025 kHz)
 
 class NoteRecognizer:
     """Captura e identifica notas musicais a partir de áudio.
 
-    Esta classe captura áudio usando PyAudio, aplica uma transformada rápida de Fourier (FFT) para determinar
-    a frequência dominante e identifica a nota musical correspondente.
+    Esta classe captura áudio de uma AudioSource (PyAudio por padrão), estima a frequência fundamental
+    com um motor selecionável (pico da FFT, YIN, MPM ou produto harmônico do espectro) e identifica a
+    nota musical correspondente.
+
+    No modo streaming, o callback da fonte preenche um buffer circular pré-alocado e a análise
+    percorre janelas sobrepostas com avanço de `hop_size` amostras, sem bloquear na leitura do dispositivo.
+    Com `channels` > 1, um único stream intercalado é capturado e as janelas de todos os canais
+    são analisadas no mesmo lote, cada canal com seu próprio histórico (um cantor por entrada).
+    Com `decimation` > 1, um filtro polifásico com estado reduz a taxa antes da análise; como a
+    faixa de voz cabe folgada na nova banda, todos os motores processam `decimation` vezes menos dados.
 
     Attributes:
-        p (pyaudio.PyAudio): Instância do PyAudio.
-        stream (pyaudio.Stream): Stream de entrada para captura de áudio.
-        input_device_info (dict): Informações sobre o dispositivo de entrada de áudio.
+        source (AudioSource): Fonte de áudio (microfone, arquivo WAV ou sinal sintético).
+        rate (int): Taxa de amostragem analisada em Hz (a da fonte dividida por `decimation`).
+        decimator (PolyphaseDecimator): Filtro de decimação aplicado à captura.
+        streaming (bool): Indica se a captura é feita por callback.
+        hop_size (int): Avanço, em amostras na taxa analisada, entre janelas do modo streaming.
+        window_size (int): Número de amostras por janela analisada, na taxa analisada.
+        channels (int): Canais analisados no modo streaming.
+        estimator (PitchEstimator): Motor de estimativa de frequência em uso.
+        latest_frequency (float): Última frequência estimada no modo streaming.
+        latest_reading (PitchReading): Última leitura, com a decisão de vozeamento e sua confiança.
+        latest_readings (list): Última leitura de cada canal.
+        data_ready (threading.Event): Sinalizado pelo callback a cada bloco recebido no modo streaming.
+        skipped_windows (int): Janelas descartadas porque a análise ficou atrasada em relação ao buffer.
+        analyzed (numpy.ndarray): Máscara das janelas do último lote que chegaram ao motor.
+        listeners (list): Funções chamadas a cada lote analisado no modo streaming (ver `add_listener`).
+        raw_listeners (list): Funções chamadas com cada bloco bruto capturado (ver `add_raw_listener`).
+        gate (VoicingGate): Portão de energia/vozeamento que evita FFT em silêncio (None desativa).
+        history (PitchHistory): Histórico das leituras com marca de tempo; no modo streaming
+            guarda cada janela analisada, com o tempo medido em amostras do stream.
+        histories (list): Histórico de cada canal; `history` é o do primeiro canal.
+        smoothers (list): Filtro de suavização de cada canal, atualizado a cada janela analisada.
     """
 
-    def __init__(self):
-        """Inicializa o reconhecedor de notas e configura o stream de áudio."""
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(format=pyaudio.paInt16, channels=1, rate=RATE, 
-                                  input=True, frames_per_buffer=CHUNK)
+    def __init__(self, streaming=False, hop_size=HOP_SIZE, engine="fft", window_size=CHUNK,
+                 refinement=REFINEMENT, source=None, voicing_gate=True, channels=1, decimation=DECIMATION,
+                 smoothing=SMOOTHING, **estimator_options):
+        """Inicializa o reconhecedor de notas e configura o stream de áudio.
+
+        Args:
+            streaming (bool): Se True, captura o áudio por callback em um buffer circular.
+            hop_size (int): Avanço entre janelas sobrepostas no modo streaming.
+            engine (str): Motor de estimativa ("fft", "yin", "mpm" ou "hps").
+            window_size (int): Número de amostras por janela; YIN e MPM funcionam com janelas curtas.
+            refinement (str): Interpolação sub-bin do pico (None, "parabolic" ou "gaussian").
+            source (AudioSource, optional): Fonte de áudio; por padrão abre o microfone com AUDIO_BACKEND.
+            voicing_gate (bool | VoicingGate): Portão de vozeamento; True usa os limiares padrão.
+            channels (int): Número de canais da fonte analisados em lote (só no modo streaming).
+            decimation (int): Fator de decimação da captura; janelas e hop são contados na taxa reduzida.
+            smoothing (str | list): Filtro de suavização por janela, no formato de `create_smoother`.
+            **estimator_options: Parâmetros do motor, como `zoom_points` para refinar o pico
+                da FFT com a transformada chirp-z.
+
+        Raises:
+            ValueError: Se pedir vários canais fora do modo streaming, mais canais que a fonte tem
+                ou um fator de decimação que não divide a taxa da fonte.
+        """
+        if channels > 1 and not streaming:
+            raise ValueError("A captura multicanal exige o modo streaming")
+        if source is None:
+            block_size = hop_size if streaming else window_size
+            source = create_source(AUDIO_BACKEND, rate=RATE, channels=channels, block_size=block_size * decimation)
+        if source.channels < channels:
+            raise ValueError(f"A fonte tem {source.channels} canal(is), mas {channels} foram pedidos")
+        if source.rate % decimation:
+            raise ValueError(f"O fator de decimação {decimation} não divide a taxa {source.rate} Hz")
+        self.source = source
+        self.channels = channels
+        self.decimator = PolyphaseDecimator(decimation, channels)
+        self.rate = source.rate // decimation
+        self.streaming = streaming
+        self.hop_size = hop_size
+        self.latest_frequency = 0.0
+        self.latest_reading = PitchReading(0.0, False, 0.0)
+        self.latest_readings = [self.latest_reading] * channels
+        self.data_ready = threading.Event()
+        self.skipped_windows = 0
+        self.listeners = []
+        self.raw_listeners = []
+        self.analyzed = np.zeros(0, dtype=bool)
+        if voicing_gate is True:
+            voicing_gate = VoicingGate()
+        self.gate = voicing_gate or None
+        self.window_size = window_size
+        self.estimator = create_estimator(engine, window_size, self.rate, MIN_FREQ, MAX_FREQ,
+                                          refinement=refinement, **estimator_options)
+        self.frames = np.zeros((1, window_size), dtype=np.float32)
+        self.smoothers = [create_smoother(smoothing) for _ in range(channels)]
+
+        if streaming:
+            self.audio_buffer = AudioRingBuffer(self.rate * BUFFER_SECONDS, channels=channels)
+            self.next_window_end = window_size
+            self.source.open(self._audio_callback)
+        else:
+            self.source.open()
         
-        # Obtém informações sobre o dispositivo de entrada atual
-        self.input_device_info = self.p.get_default_input_device_info()
-        print(f"Microfone em uso: {self.input_device_info['name']}")
+        print(f"Microfone em uso: {self.source.device_name}")
         
-        self.time_points = []
-        self.freq_history = []
+        self.histories = [PitchHistory(HISTORY_CAPACITY) for _ in range(channels)]
+        self.history = self.histories[0]
         self.start_time = time.time()
 
+    def set_smoothing(self, smoothing, channel=None):
+        """Troca o filtro de suavização de um canal (ou de todos), por exemplo ao mudar a dificuldade.
+
+        Args:
+            smoothing (str | list): Filtro no formato de `create_smoother`.
+            channel (int, optional): Canal afetado; None troca o de todos os canais.
+        """
+        channels = range(self.channels) if channel is None else [channel]
+        for c in channels:
+            self.smoothers[c] = create_smoother(smoothing)
+
+    def add_listener(self, listener):
+        """Registra uma função chamada após cada lote analisado em `analyze_pending`.
+
+        A função recebe (fins das janelas em amostras, janelas (n, canais, window_size), frequências
+        (n, canais), máscara de vozeamento (n, canais)) e roda na thread que faz a análise; as janelas
+        são um buffer reutilizado e não devem ser guardadas.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Remove uma função registrada com `add_listener`."""
+        self.listeners.remove(listener)
+
+    def add_raw_listener(self, listener):
+        """Registra uma função chamada com cada bloco int16 (quadros, canais) recebido da fonte.
+
+        O bloco chega na taxa da fonte, antes da decimação. A função roda no callback de áudio,
+        então deve só copiar ou enfileirar o bloco, sem bloquear.
+        """
+        self.raw_listeners.append(listener)
+
+    def remove_raw_listener(self, listener):
+        """Remove uma função registrada com `add_raw_listener`."""
+        self.raw_listeners.remove(listener)
+
+    def _audio_callback(self, block):
+        """Callback da fonte: copia os canais analisados do bloco recebido para o buffer circular."""
+        for listener in self.raw_listeners:
+            listener(block)
+        self.audio_buffer.write(self.decimator.process(block[:, :self.channels]))
+        self.data_ready.set()
+
+    def dominant_frequency(self, data):
+        """Calcula a frequência dominante de uma única janela de áudio.
+
+        Args:
+            data (numpy.ndarray): Amostras da janela (`window_size` amostras).
+
+        Returns:
+            float: A frequência dominante em Hertz, ou 0.0 se nenhuma for estimada.
+        """
+        return float(self.estimate_frames(data[np.newaxis, :])[0][0])
+
+    def estimate_frames(self, frames):
+        """Estima a frequência de um lote de janelas, pulando as que o portão marcar como sem voz.
+
+        Args:
+            frames (numpy.ndarray): Array (n, window_size) com as janelas.
+
+        Returns:
+            tuple: (frequências em Hz com 0.0 sem voz, máscara de vozeamento, confiança entre 0 e 1).
+        """
+        frequencies = np.zeros(len(frames))
+        if self.gate is None:
+            self.analyzed = np.ones(len(frames), dtype=bool)
+            frequencies[:] = self.estimator.estimate(frames)
+            voiced = frequencies > 0
+            return frequencies, voiced, voiced.astype(np.float64)
+
+        voiced, confidence = self.gate.evaluate(frames)
+        self.analyzed = voiced.copy()
+        if voiced.any():
+            frequencies[voiced] = self.estimator.estimate(frames[voiced])
+        voiced &= frequencies > 0
+        return frequencies, voiced, confidence
+
+    def _frame_buffer(self, count):
+        """Retorna as primeiras `count` linhas do buffer de janelas, crescendo-o se necessário."""
+        if count > len(self.frames):
+            self.frames = np.zeros((count, self.window_size), dtype=np.float32)
+        return self.frames[:count]
+
+    def reset_cursor(self):
+        """Descarta o áudio já capturado e ainda não analisado (modo streaming).
+
+        A próxima janela analisada passa a ser a primeira inteiramente capturada depois desta
+        chamada, para que uma gravação não segmente o que foi cantado antes de começar.
+        """
+        self.next_window_end = self.audio_buffer.total_written + self.window_size
+
+    def analyze_pending(self):
+        """Analisa as janelas sobrepostas que ficaram completas desde a última chamada.
+
+        Cada janela tem `window_size` amostras e começa `hop_size` amostras depois da anterior.
+        Todas as janelas pendentes, de todos os canais, são empilhadas e analisadas em um único lote.
+        Se a análise ficar atrasada mais que metade do buffer, pula para as janelas mais recentes,
+        deixando folga para o callback continuar escrevendo durante a leitura.
+
+        Returns:
+            list: Pares (fim da janela em amostras, tupla com a PitchReading de cada canal).
+        """
+        total = self.audio_buffer.total_written
+        oldest_end = total - self.audio_buffer.capacity // 2 + self.window_size
+        if self.next_window_end < oldest_end:
+            # Descarta janelas já sobrescritas mantendo o alinhamento com o hop
+            skipped = -(-(oldest_end - self.next_window_end) // self.hop_size)
+            self.next_window_end += skipped * self.hop_size
+            self.skipped_windows += skipped
+
+        if total < self.next_window_end:
+            return []
+
+        ends = range(self.next_window_end, total + 1, self.hop_size)
+        shape = (len(ends), self.channels)
+        frames = self._frame_buffer(len(ends) * self.channels)
+        windows = frames.reshape(shape + (self.window_size,))
+        for i, end in enumerate(ends):
+            self.audio_buffer.read(end, self.window_size, out=windows[i])
+        frequencies, voiced, confidence = (a.reshape(shape) for a in self.estimate_frames(frames))
+
+        times = np.asarray(ends) / self.rate
+        readings = [
+            tuple(map(PitchReading, f, v, c))
+            for f, v, c in zip(frequencies.tolist(), voiced.tolist(), confidence.tolist())
+        ]
+        for channel, history in enumerate(self.histories):
+            history.extend(times, frequencies[:, channel])
+            smoother = self.smoothers[channel]
+            for timestamp, frequency in zip(times.tolist(), frequencies[:, channel].tolist()):
+                smoother.update(timestamp, frequency)
+        self.latest_readings = list(readings[-1])
+        self.latest_reading = self.latest_readings[0]
+        self.latest_frequency = self.latest_reading.frequency
+        self.next_window_end = ends[-1] + self.hop_size
+        for listener in self.listeners:
+            listener(ends, windows, frequencies, voiced)
+        return list(zip(ends, readings))
+
+    def get_latest_frequency(self):
+        """Retorna a frequência da janela mais recente sem esperar pelo dispositivo.
+
+        Returns:
+            float: A última frequência estimada em Hertz.
+        """
+        self.analyze_pending()
+        return self.latest_frequency
+
+    def get_reading(self):
+        """Retorna a leitura mais recente com a decisão de vozeamento.
+
+        No modo streaming não espera pelo dispositivo; no modo bloqueante faz uma captura completa.
+
+        Returns:
+            PitchReading: Frequência (0.0 sem voz), se a janela tem voz e a confiança da decisão.
+        """
+        if self.streaming:
+            self.analyze_pending()
+        else:
+            self.capture_frequency()
+        return self.latest_reading
+
     def capture_frequency(self):
-        """Captura a frequência dominante do áudio.
+        """Captura a frequência dominante do áudio, suavizada.
 
-        Lê dados de áudio, aplica FFT e retorna a frequência dominante média.
+        A estabilidade vem do filtro de suavização, atualizado a cada janela, e não de um lote
+        de leituras: no modo streaming usa as janelas já presentes no buffer e no modo bloqueante
+        lê uma única janela do dispositivo.
 
         Returns:
-            float: A frequência dominante em Hertz (Hz).
+            float: A frequência dominante suavizada em Hertz (Hz), ou 0.0 sem voz.
         """
-        # Captura várias amostras para ter uma média mais estável
-        num_samples = 10
-        frequencies = []
-        
-        for _ in range(num_samples):
-            data = np.frombuffer(self.stream.read(CHUNK, exception_on_overflow=False), dtype=np.int16)
-            
-            # Aplicar janela Hanning para reduzir vazamento espectral
-            window = np.hanning(len(data))
-            data = data * window
-            
-            fft = np.fft.fft(data)
-            freqs = np.fft.fftfreq(len(fft)) * RATE
-            
-            positive_freqs_mask = freqs >= 0
-            magnitude = np.abs(fft)[positive_freqs_mask]
-            freqs = freqs[positive_freqs_mask]
-            
-            # Filtrar frequências fora da faixa de voz humana
-            voice_mask = (freqs >= MIN_FREQ) & (freqs <= MAX_FREQ)
-            magnitude = magnitude[voice_mask]
-            freqs = freqs[voice_mask]
-            
-            # Encontrar os N picos mais altos
-            num_peaks = 5
-            peak_indices = signal.find_peaks(magnitude)[0]
-            peak_frequencies = freqs[peak_indices]
-            peak_magnitudes = magnitude[peak_indices]
-            
-            # Ordenar por magnitude e pegar o pico mais significativo
-            if len(peak_frequencies) > 0:
-                sorted_indices = np.argsort(peak_magnitudes)[::-1]
-                peak_freq = peak_frequencies[sorted_indices[0]]
-                
-                if MIN_FREQ <= peak_freq <= MAX_FREQ:  # Dupla verificação da faixa de frequência
-                    frequencies.append(peak_freq)
-        
-        # Usar mediana em vez de média para maior estabilidade
-        current_freq = np.median(frequencies) if frequencies else 0.0
-        
-        # Adiciona o ponto temporal e a frequência aos históricos
-        current_time = time.time() - self.start_time
-        self.time_points.append(current_time)
-        self.freq_history.append(current_freq)
-        
-        # Mantém apenas os últimos 5 segundos de dados
-        cutoff_time = current_time - 5
-        while self.time_points and self.time_points[0] < cutoff_time:
-            self.time_points.pop(0)
-            self.freq_history.pop(0)
-            
-        return current_freq
+        if not self.streaming:
+            frames = self._frame_buffer(1)
+            block = self.source.read(self.window_size * self.decimator.factor)[:, :1]
+            frames[0] = self.decimator.process(block)[:, 0]
+            frequencies, voiced, confidence = self.estimate_frames(frames)
+
+            # No modo streaming cada janela já entra no histórico em analyze_pending
+            timestamp = time.time() - self.start_time
+            self.history.append(timestamp, frequencies[0])
+            self.smoothers[0].update(timestamp, float(frequencies[0]))
+            self.latest_frequency = float(frequencies[0])
+            self.latest_reading = PitchReading(self.latest_frequency, bool(voiced[0]), float(confidence[0]))
+        else:
+            self.analyze_pending()
+        return self.smoothers[0].value
 
     def closest_note(self, frequency):
         """Encontra a nota musical mais próxima para uma frequência dada.
@@ -112,74 +323,32 @@ class NoteRecognizer:
             frequency (float): A frequência em Hertz.
 
         Returns:
-            str: A nota musical mais próxima.
+            str: A nota musical mais próxima, ou None se a frequência não for positiva.
+        """
+        info = frequency_to_note(frequency)
+        return info.name if info else None
+
+    def note_info(self, frequency):
+        """Mapeia a frequência para nota, oitava, número MIDI e desvio em cents.
+
+        Args:
+            frequency (float): A frequência em Hertz.
+
+        Returns:
+            NoteInfo: A nota mais próxima no temperamento igual, ou None para frequências não positivas.
         """
-        closest_note, min_diff = None, float("inf")
-        for note, freqs in NOTE_FREQUENCIES.items():
-            for freq in freqs:
-                diff = abs(freq - frequency)
-                if diff < min_diff:
-                    min_diff, closest_note = diff, note
-        return closest_note
+        return frequency_to_note(frequency)
 
     def get_note_from_frequency(self):
-        """Obtém a nota musical a partir da frequência dominante e plota o espectrograma.
+        """Obtém a nota musical a partir da frequência dominante.
 
         Returns:
             tuple: Uma tupla contendo a frequência e a nota identificada.
         """
-        data = np.frombuffer(self.stream.read(CHUNK, exception_on_overflow=False), dtype=np.int16)
         frequency = self.capture_frequency()
         note = self.closest_note(frequency)
-        
-        # Passa a frequência detectada para o plot
-        #self.plot_spectrogram(data, frequency)
-        
         return frequency, note
 
-    def plot_spectrogram(self, data, detected_freq):
-        """Plota o espectro de frequências do sinal de áudio ao longo do tempo.
-        
-        Args:
-            data (numpy.ndarray): Dados do áudio capturado
-            detected_freq (float): Frequência dominante detectada
-        """
-        plt.figure(figsize=(12, 6))
-        
-        # Subplot superior para o espectro de frequências atual
-        plt.subplot(2, 1, 1)
-        fft_data = np.fft.fft(data)
-        freqs = np.fft.fftfreq(len(data)) * RATE
-        magnitude = np.abs(fft_data)
-        
-        positive_freqs_mask = freqs >= 0
-        plt.plot(freqs[positive_freqs_mask], magnitude[positive_freqs_mask])
-        plt.axvline(x=detected_freq, color='r', linestyle='--', 
-                   label=f'Frequência atual: {detected_freq:.2f} Hz')
-        plt.xlabel('Frequência [Hz]')
-        plt.ylabel('Magnitude')
-        plt.title('Espectro de Frequências (Atual)')
-        plt.grid(True)
-        plt.legend()
-        plt.xlim(0, 2000)
-        
-        # Subplot inferior para o histórico temporal
-        plt.subplot(2, 1, 2)
-        plt.plot(self.time_points, self.freq_history, '-b', label='Histórico de frequências')
-        plt.axhline(y=detected_freq, color='r', linestyle='--')
-        plt.xlabel('Tempo [s]')
-        plt.ylabel('Frequência [Hz]')
-        plt.title('Histórico de Frequências Detectadas')
-        plt.grid(True)
-        plt.ylim(0, 2000)
-        
-        plt.tight_layout()
-        plt.draw()
-        plt.pause(0.1)
-        plt.clf()
-
     def close(self):
         """Fecha o stream de áudio e libera os recursos."""
-        self.stream.stop_stream()
-        self.stream.close()
-        self.p.terminate()
\ No newline at end of file
+        self.source.close()
\ No newline at end of file
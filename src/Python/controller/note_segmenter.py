@@ -0,0 +1,164 @@
+import threading
+from collections import namedtuple, deque
+import numpy as np
+from .note_mapping import frequency_to_note
+from .pitch_smoothing import RunningMedian
+
+MIN_NOTE_DURATION = 0.1   # Notas mais curtas que isso (s) são descartadas como ruído
+RELEASE_FRAMES = 4        # Janelas sem voz seguidas que encerram a nota
+CHANGE_CENTS = 70         # Desvio em relação à nota atual que indica uma nova nota
+CHANGE_FRAMES = 4         # Janelas seguidas com o desvio para confirmar a troca
+ONSET_DB = 9.0            # Subida de energia, em dB, que marca um novo ataque na mesma altura
+ENERGY_FRAMES = 8         # Janelas usadas como referência de energia para detectar o ataque
+REFERENCE_FRAMES = 9      # Janelas da mediana que representa a altura da nota atual
+
+NoteSegment = namedtuple("NoteSegment", ["frequency", "note", "duration", "start", "end"])
+
+
+class NoteSegmenter:
+    """Segmenta o fluxo de janelas analisadas em notas, detectando ataques e finais.
+
+    Uma nota começa na primeira janela com voz e termina quando:
+    - a voz some por RELEASE_FRAMES janelas (final);
+    - a altura se afasta mais de CHANGE_CENTS da mediana da nota por CHANGE_FRAMES janelas (troca);
+    - a energia sobe ONSET_DB acima do mínimo recente com a voz mantida (novo ataque).
+
+    As fronteiras são contadas em amostras do stream (a meio caminho entre os centros de duas
+    janelas vizinhas), então as durações não dependem do relógio nem do atraso da interface.
+    A frequência da nota é a mediana das janelas que a compõem.
+
+    Attributes:
+        rate (int): Taxa de amostragem das posições recebidas.
+        hop_size (int): Avanço entre janelas em amostras.
+        window_size (int): Tamanho das janelas em amostras.
+    """
+
+    def __init__(self, rate, hop_size, window_size, on_note=None, min_duration=MIN_NOTE_DURATION):
+        """Inicializa o segmentador.
+
+        Args:
+            rate (int): Taxa de amostragem em Hz.
+            hop_size (int): Avanço entre janelas em amostras.
+            window_size (int): Tamanho das janelas em amostras.
+            on_note (callable, optional): Chamada com cada NoteSegment assim que ele termina.
+            min_duration (float): Duração mínima de uma nota em segundos.
+        """
+        self.rate = rate
+        self.hop_size = hop_size
+        self.window_size = window_size
+        self.on_note = on_note
+        self.min_duration = min_duration
+        self._notes = deque()
+        self._lock = threading.Lock()
+        self._energy = deque(maxlen=ENERGY_FRAMES)
+        self._reference = RunningMedian(REFERENCE_FRAMES)
+        self._reset_note()
+
+    def _reset_note(self):
+        self._start = None
+        self._frequencies = []
+        self._silent = 0
+        self._changed = []
+        self._reference.reset()
+
+    def _boundary(self, end):
+        """Fronteira, em amostras, entre a janela que termina em `end` e a anterior."""
+        return end - self.window_size // 2 - self.hop_size // 2
+
+    def update(self, end, frequency, rms):
+        """Processa uma janela.
+
+        Args:
+            end (int): Posição (exclusiva) do fim da janela em amostras do stream.
+            frequency (float): Frequência estimada em Hz (0.0 sem voz).
+            rms (float): Energia RMS da janela.
+        """
+        energy_db = 20 * np.log10(max(rms, 1e-9))
+        floor_db = min(self._energy) if self._energy else energy_db
+        self._energy.append(energy_db)
+
+        if frequency <= 0:
+            if self._start is not None:
+                self._silent += 1
+                if self._silent >= RELEASE_FRAMES:
+                    # A nota acaba onde começou o silêncio
+                    self._finish(self._boundary(end) - (RELEASE_FRAMES - 1) * self.hop_size)
+            return
+
+        if self._start is None:
+            self._begin(end, frequency)
+            return
+        self._silent = 0
+
+        reference = self._reference.value
+        deviation = abs(1200 * np.log2(frequency / reference))
+        if deviation > CHANGE_CENTS:
+            self._changed.append((end, frequency))
+            if len(self._changed) >= CHANGE_FRAMES:
+                # A nova nota começa na primeira janela que se afastou
+                changed = self._changed
+                self._finish(self._boundary(changed[0][0]))
+                self._begin(*changed[0])
+                for change_end, change_frequency in changed[1:]:
+                    self._add(change_end, change_frequency)
+            return
+        self._changed = []
+
+        elapsed = (self._boundary(end) - self._start) / self.rate
+        if energy_db - floor_db > ONSET_DB and elapsed >= self.min_duration:
+            self._finish(self._boundary(end))
+            self._begin(end, frequency)
+            return
+        self._add(end, frequency)
+
+    def _begin(self, end, frequency):
+        self._reset_note()
+        self._start = self._boundary(end)
+        self._add(end, frequency)
+
+    def _add(self, end, frequency):
+        self._frequencies.append(frequency)
+        self._reference.update(end / self.rate, frequency)
+
+    def _finish(self, stop):
+        """Encerra a nota atual na posição `stop` e a publica se for longa o bastante."""
+        start, frequencies = self._start, self._frequencies
+        self._reset_note()
+        duration = (stop - start) / self.rate
+        if duration < self.min_duration or not frequencies:
+            return
+
+        frequency = float(np.median(frequencies))
+        info = frequency_to_note(frequency)
+        segment = NoteSegment(frequency, info.name if info else None, duration,
+                              start / self.rate, stop / self.rate)
+        with self._lock:
+            self._notes.append(segment)
+        if self.on_note is not None:
+            self.on_note(segment)
+
+    def flush(self, end):
+        """Encerra a nota em andamento na posição `end` (por exemplo, ao parar a gravação)."""
+        if self._start is not None:
+            self._finish(self._boundary(end) + self.hop_size)
+
+    def pop_notes(self):
+        """Remove e retorna as notas concluídas desde a última chamada.
+
+        Returns:
+            list: NoteSegment em ordem cronológica.
+        """
+        with self._lock:
+            notes = list(self._notes)
+            self._notes.clear()
+        return notes
+
+    def listener(self, channel=0):
+        """Cria um ouvinte para `NoteRecognizer.add_listener` que segmenta o canal indicado."""
+        def on_frames(ends, frames, frequencies, voiced):
+            windows = frames[:, channel]
+            rms = np.sqrt(np.einsum("ij,ij->i", windows, windows) / windows.shape[1])
+            for end, frequency, is_voiced, energy in zip(ends, frequencies[:, channel].tolist(),
+                                                         voiced[:, channel].tolist(), rms.tolist()):
+                self.update(end, frequency if is_voiced else 0.0, energy)
+        return on_frames
@@ -0,0 +1,107 @@
+from functools import lru_cache
+import numpy as np
+
+REFINEMENTS = (None, "parabolic", "gaussian")
+
+
+def parabolic_offset(left, center, right):
+    """Deslocamento sub-bin do vértice da parábola que passa por três pontos vizinhos.
+
+    Args:
+        left (numpy.ndarray): Valores no bin anterior ao pico.
+        center (numpy.ndarray): Valores no bin do pico.
+        right (numpy.ndarray): Valores no bin seguinte ao pico.
+
+    Returns:
+        numpy.ndarray: Deslocamento, em bins, entre -0.5 e 0.5.
+    """
+    left, center, right = np.asarray(left), np.asarray(center), np.asarray(right)
+    denominator = left - 2 * center + right
+    offset = np.zeros(np.broadcast(left, center, right).shape)
+    np.divide(0.5 * (left - right), denominator, out=offset, where=denominator != 0)
+    return np.clip(offset, -0.5, 0.5)
+
+
+def gaussian_offset(left, center, right):
+    """Deslocamento sub-bin assumindo um pico gaussiano (parábola sobre o log da magnitude).
+
+    É menos enviesado que a interpolação parabólica para janelas como a Hanning.
+
+    Args:
+        left (numpy.ndarray): Magnitudes no bin anterior ao pico.
+        center (numpy.ndarray): Magnitudes no bin do pico.
+        right (numpy.ndarray): Magnitudes no bin seguinte ao pico.
+
+    Returns:
+        numpy.ndarray: Deslocamento, em bins, entre -0.5 e 0.5.
+    """
+    tiny = np.finfo(np.float32).tiny
+    return parabolic_offset(
+        np.log(np.maximum(left, tiny)),
+        np.log(np.maximum(center, tiny)),
+        np.log(np.maximum(right, tiny)),
+    )
+
+
+def refine_offset(method, left, center, right):
+    """Aplica o método de refinamento escolhido.
+
+    Args:
+        method (str): None, "parabolic" ou "gaussian".
+        left, center, right (numpy.ndarray): Valores em torno do pico.
+
+    Returns:
+        numpy.ndarray: Deslocamento em bins (zero quando `method` é None).
+
+    Raises:
+        ValueError: Se o método for desconhecido.
+    """
+    if method is None:
+        return np.zeros(np.shape(center))
+    if method == "parabolic":
+        return parabolic_offset(left, center, right)
+    if method == "gaussian":
+        return gaussian_offset(left, center, right)
+    raise ValueError(f"Refinamento desconhecido: {method} (opções: {REFINEMENTS})")
+
+
+@lru_cache(maxsize=8)
+def _zoom_basis(size, span, rate, points):
+    """Matriz (points, size) que avalia o espectro em `points` frequências de 0 a 2 * span.
+
+    Depende só do tamanho da janela e da faixa, então é calculada uma vez e reutilizada.
+    """
+    offsets = np.linspace(0.0, 2 * span, points)
+    basis = np.exp(-2j * np.pi * np.outer(offsets, np.arange(size)) / rate).astype(np.complex64)
+    basis.flags.writeable = False
+    return basis
+
+
+def zoom_peaks(frames, centers, span, rate, points=32):
+    """Refina picos avaliando o espectro (zoom-FFT) só em torno de cada um.
+
+    Em vez de aumentar a FFT inteira, cada janela é deslocada em frequência para que
+    `center - span` caia em 0 Hz, e o espectro é avaliado em `points` frequências até
+    `center + span` com uma única multiplicação de matrizes para o lote todo.
+
+    Args:
+        frames (numpy.ndarray): Array (n, tamanho) com as janelas já multiplicadas pelo janelamento.
+        centers (numpy.ndarray): Frequência aproximada do pico de cada janela, em Hz.
+        span (float): Meia largura, em Hz, da faixa avaliada.
+        rate (int): Taxa de amostragem em Hz.
+        points (int): Número de pontos avaliados na faixa.
+
+    Returns:
+        numpy.ndarray: As frequências refinadas em Hz.
+    """
+    frames = np.asarray(frames)
+    starts = np.asarray(centers, dtype=np.float64) - span
+    size = frames.shape[1]
+
+    shift = np.exp(-2j * np.pi * np.outer(starts, np.arange(size)) / rate).astype(np.complex64)
+    magnitude = np.abs((frames * shift) @ _zoom_basis(size, span, rate, points).T)
+
+    rows = np.arange(len(frames))
+    best = np.clip(magnitude.argmax(axis=1), 1, points - 2)
+    offset = gaussian_offset(magnitude[rows, best - 1], magnitude[rows, best], magnitude[rows, best + 1])
+    return starts + (best + offset) * (2 * span / (points - 1))
@@ -0,0 +1,305 @@
+import numpy as np
+import scipy.fft
+from .spectral_kernel import SpectralKernel
+from .peak_refinement import parabolic_offset, refine_offset
+
+
+class PitchEstimator:
+    """Interface comum dos motores de estimativa de frequência fundamental.
+
+    Cada motor recebe um lote de janelas de mesmo tamanho e devolve uma frequência por janela,
+    de forma vetorizada com NumPy.
+
+    Attributes:
+        name (str): Nome do motor, usado para selecioná-lo em `create_estimator`.
+        window_size (int): Número de amostras por janela.
+        rate (int): Taxa de amostragem em Hz.
+        min_freq (float): Menor frequência fundamental aceita.
+        max_freq (float): Maior frequência fundamental aceita.
+        refinement (str): Interpolação sub-bin do máximo escolhido (None, "parabolic" ou "gaussian").
+    """
+
+    name = None
+
+    def __init__(self, window_size, rate, min_freq, max_freq, refinement=None):
+        """Inicializa o motor.
+
+        Args:
+            window_size (int): Número de amostras por janela.
+            rate (int): Taxa de amostragem em Hz.
+            min_freq (float): Menor frequência fundamental aceita.
+            max_freq (float): Maior frequência fundamental aceita.
+            refinement (str, optional): Interpolação sub-bin do máximo escolhido.
+        """
+        self.window_size = window_size
+        self.rate = rate
+        self.min_freq = min_freq
+        self.max_freq = max_freq
+        self.refinement = refinement
+
+    def estimate(self, frames):
+        """Estima a frequência fundamental de cada janela.
+
+        Args:
+            frames (numpy.ndarray): Array (n, window_size) com as janelas.
+
+        Returns:
+            numpy.ndarray: Array (n,) com as frequências em Hz (0.0 quando não há estimativa).
+        """
+        raise NotImplementedError
+
+
+class FFTPeakEstimator(PitchEstimator):
+    """Pico mais forte do espectro dentro da faixa de voz (método original)."""
+
+    name = "fft"
+
+    def __init__(self, window_size, rate, min_freq, max_freq, refinement=None, workers=None, zoom_points=0):
+        super().__init__(window_size, rate, min_freq, max_freq, refinement)
+        self.kernel = SpectralKernel(window_size, rate, min_freq, max_freq, workers=workers,
+                                     refinement=refinement, zoom_points=zoom_points)
+
+    def estimate(self, frames):
+        return self.kernel.peak_frequencies(frames).copy()
+
+
+class LagEstimator(PitchEstimator):
+    """Base dos motores no domínio do atraso (YIN e MPM).
+
+    Calcula a autocorrelação de todas as janelas com uma única FFT real em lote.
+    Qualquer `refinement` diferente de None interpola o atraso com uma parábola.
+    """
+
+    def __init__(self, window_size, rate, min_freq, max_freq, refinement=None):
+        super().__init__(window_size, rate, min_freq, max_freq, refinement)
+        self.tau_min = max(2, int(np.floor(rate / max_freq)))
+        self.tau_max = int(np.ceil(rate / min_freq))
+        if self.tau_max >= window_size:
+            raise ValueError(
+                f"Janela de {window_size} amostras é curta demais para {min_freq} Hz "
+                f"(mínimo {self.tau_max + 1})"
+            )
+        self.taus = np.arange(self.tau_max + 1)
+
+    def _cross_correlation(self, head, frames):
+        """Correlação de `head` com `frames` para atrasos 0..tau_max, via FFT em lote."""
+        size = scipy.fft.next_fast_len(self.window_size + head.shape[1])
+        spec = np.conj(scipy.fft.rfft(head, size, axis=1)) * scipy.fft.rfft(frames, size, axis=1)
+        return scipy.fft.irfft(spec, size, axis=1)[:, :self.tau_max + 1]
+
+    def _refine_lags(self, curve, taus):
+        """Interpola o atraso fracionário do extremo de `curve` em cada atraso inteiro escolhido."""
+        taus = taus.astype(np.float64)
+        if self.refinement is None:
+            return taus
+        rows = np.arange(len(curve))
+        lags = taus.astype(np.intp)
+        return taus + parabolic_offset(curve[rows, lags - 1], curve[rows, lags], curve[rows, lags + 1])
+
+    def _lags_to_frequency(self, taus, found):
+        """Converte atrasos em frequência, zerando as janelas sem estimativa."""
+        frequencies = np.zeros(len(taus))
+        np.divide(self.rate, taus, out=frequencies, where=found)
+        return frequencies
+
+
+class YinEstimator(LagEstimator):
+    """Algoritmo YIN: diferença quadrática normalizada pela média cumulativa (CMNDF)."""
+
+    name = "yin"
+
+    def __init__(self, window_size, rate, min_freq, max_freq, refinement=None, threshold=0.15):
+        """Inicializa o motor.
+
+        Args:
+            threshold (float): Limiar da CMNDF abaixo do qual um atraso é aceito.
+        """
+        super().__init__(window_size, rate, min_freq, max_freq, refinement)
+        self.threshold = threshold
+        self.integration = window_size - self.tau_max
+
+    def cmndf(self, frames):
+        """Calcula a CMNDF de cada janela para atrasos 0..tau_max.
+
+        Args:
+            frames (numpy.ndarray): Array (n, window_size) com as janelas.
+
+        Returns:
+            numpy.ndarray: Array (n, tau_max + 1) com a CMNDF.
+        """
+        x = np.asarray(frames, dtype=np.float64)
+        length = self.integration
+
+        # d(tau) = E(0) + E(tau) - 2 r(tau), com as energias por soma acumulada
+        energy = np.zeros((len(x), self.window_size + 1))
+        np.cumsum(x * x, axis=1, out=energy[:, 1:])
+        energy_0 = energy[:, length:length + 1]
+        energy_tau = energy[:, length:length + self.tau_max + 1] - energy[:, :self.tau_max + 1]
+        correlation = self._cross_correlation(x[:, :length], x)
+        diff = np.maximum(energy_0 + energy_tau - 2 * correlation, 0)
+
+        cmndf = np.ones_like(diff)
+        running = np.cumsum(diff[:, 1:], axis=1)
+        np.divide(diff[:, 1:] * self.taus[1:], running, out=cmndf[:, 1:], where=running > 0)
+        return cmndf
+
+    def best_lags(self, cmndf):
+        """Escolhe, por janela, o primeiro mínimo local da CMNDF abaixo do limiar.
+
+        Returns:
+            tuple: (atrasos escolhidos, máscara das janelas com estimativa).
+        """
+        searchable = cmndf[:, self.tau_min:self.tau_max]
+        below = searchable < self.threshold
+        found = below.any(axis=1)
+        first = below.argmax(axis=1)
+
+        # Desce a partir do primeiro atraso abaixo do limiar até o mínimo local
+        offsets = np.arange(searchable.shape[1] - 1)
+        rising = (searchable[:, 1:] >= searchable[:, :-1]) & (offsets >= first[:, np.newaxis])
+        local = np.where(rising.any(axis=1), rising.argmax(axis=1), first)
+        return local + self.tau_min, found
+
+    def estimate(self, frames):
+        cmndf = self.cmndf(frames)
+        taus, found = self.best_lags(cmndf)
+        return self._lags_to_frequency(self._refine_lags(cmndf, taus), found)
+
+
+class MPMEstimator(LagEstimator):
+    """Método de McLeod (MPM): máximos-chave da função de diferença quadrada normalizada (NSDF)."""
+
+    name = "mpm"
+
+    def __init__(self, window_size, rate, min_freq, max_freq, refinement=None, cutoff=0.9,
+                 clarity_threshold=0.5):
+        """Inicializa o motor.
+
+        Args:
+            cutoff (float): Fração do maior máximo que um máximo precisa atingir para ser escolhido.
+            clarity_threshold (float): NSDF mínima para considerar a janela periódica.
+        """
+        super().__init__(window_size, rate, min_freq, max_freq, refinement)
+        self.cutoff = cutoff
+        self.clarity_threshold = clarity_threshold
+
+    def nsdf(self, frames):
+        """Calcula a NSDF de cada janela para atrasos 0..tau_max.
+
+        Args:
+            frames (numpy.ndarray): Array (n, window_size) com as janelas.
+
+        Returns:
+            numpy.ndarray: Array (n, tau_max + 1) com a NSDF, entre -1 e 1.
+        """
+        x = np.asarray(frames, dtype=np.float64)
+        correlation = self._cross_correlation(x, x)
+
+        # m(tau) = soma de x[j]^2 + x[j + tau]^2 sobre a sobreposição
+        energy = np.zeros((len(x), self.window_size + 1))
+        np.cumsum(x * x, axis=1, out=energy[:, 1:])
+        total = energy[:, -1:]
+        norm = energy[:, self.window_size - self.taus] + (total - energy[:, self.taus])
+
+        nsdf = np.zeros_like(correlation)
+        np.divide(2 * correlation, norm, out=nsdf, where=norm > 0)
+        return nsdf
+
+    def best_lags(self, nsdf):
+        """Escolhe, por janela, o primeiro máximo local acima de `cutoff` vezes o maior máximo.
+
+        Returns:
+            tuple: (atrasos escolhidos, máscara das janelas com estimativa).
+        """
+        core = nsdf[:, self.tau_min:self.tau_max]
+        left = nsdf[:, self.tau_min - 1:self.tau_max - 1]
+        right = nsdf[:, self.tau_min + 1:self.tau_max + 1]
+        maxima = np.where((core > left) & (core >= right) & (core > 0), core, 0.0)
+
+        highest = maxima.max(axis=1)
+        found = highest >= self.clarity_threshold
+        chosen = maxima >= (self.cutoff * highest)[:, np.newaxis]
+        chosen &= maxima > 0
+        return chosen.argmax(axis=1) + self.tau_min, found
+
+    def estimate(self, frames):
+        nsdf = self.nsdf(frames)
+        taus, found = self.best_lags(nsdf)
+        return self._lags_to_frequency(self._refine_lags(nsdf, taus), found)
+
+
+class HPSEstimator(PitchEstimator):
+    """Produto harmônico do espectro (HPS): reforça a fundamental multiplicando harmônicos."""
+
+    name = "hps"
+
+    def __init__(self, window_size, rate, min_freq, max_freq, refinement=None, harmonics=4, zero_padding=2,
+                 floor=0.05):
+        """Inicializa o motor.
+
+        Args:
+            harmonics (int): Número de versões subamostradas do espectro multiplicadas.
+            zero_padding (int): Fator de preenchimento com zeros da FFT.
+            floor (float): Magnitude relativa mínima do próprio bin candidato a fundamental.
+        """
+        super().__init__(window_size, rate, min_freq, max_freq, refinement)
+        self.harmonics = harmonics
+        self.floor = floor
+        self.fft_size = window_size * zero_padding
+        self.window = np.hanning(window_size).astype(np.float32)
+        self.bin_width = rate / self.fft_size
+        self.lo = max(1, int(np.ceil(min_freq / self.bin_width)))
+        self.hi = int(np.floor(max_freq / self.bin_width)) + 1
+
+    def estimate(self, frames):
+        spectrum = np.abs(scipy.fft.rfft(frames * self.window, self.fft_size, axis=1))
+        peak = spectrum.max(axis=1, keepdims=True)
+        np.divide(spectrum, peak, out=spectrum, where=peak > 0)
+
+        # Cada harmônico h contribui com o espectro subamostrado por h
+        size = spectrum.shape[1] // self.harmonics
+        product = spectrum[:, :size].copy()
+        for h in range(2, self.harmonics + 1):
+            product *= spectrum[:, ::h][:, :size]
+
+        # Sem energia na própria fundamental, o produto só reflete vazamento (ex.: tom puro)
+        product[spectrum[:, :size] < self.floor] = 0.0
+
+        band = product[:, self.lo:min(self.hi, size)]
+        rows = np.arange(len(band))
+        best = band.argmax(axis=1)
+        found = band[rows, best] > 0
+
+        # Interpola sobre o espectro da própria fundamental, não sobre o produto
+        bins = best + self.lo
+        offset = refine_offset(self.refinement, spectrum[rows, bins - 1], spectrum[rows, bins],
+                               spectrum[rows, bins + 1])
+        return np.where(found, (bins + offset) * self.bin_width, 0.0)
+
+
+ESTIMATORS = {
+    estimator.name: estimator
+    for estimator in (FFTPeakEstimator, YinEstimator, MPMEstimator, HPSEstimator)
+}
+
+
+def create_estimator(engine, window_size, rate, min_freq, max_freq, **options):
+    """Cria um motor de estimativa pelo nome.
+
+    Args:
+        engine (str): Um dos nomes em ESTIMATORS ("fft", "yin", "mpm", "hps").
+        window_size (int): Número de amostras por janela.
+        rate (int): Taxa de amostragem em Hz.
+        min_freq (float): Menor frequência fundamental aceita.
+        max_freq (float): Maior frequência fundamental aceita.
+        **options: Parâmetros específicos do motor.
+
+    Returns:
+        PitchEstimator: O motor configurado.
+
+    Raises:
+        ValueError: Se o nome do motor for desconhecido.
+    """
+    if engine not in ESTIMATORS:
+        raise ValueError(f"Motor de estimativa desconhecido: {engine} (opções: {', '.join(ESTIMATORS)})")
+    return ESTIMATORS[engine](window_size, rate, min_freq, max_freq, **options)
@@ -0,0 +1,132 @@
+import threading
+from collections import namedtuple
+import numpy as np
+
+PitchStats = namedtuple("PitchStats", ["median", "jitter", "voiced_fraction", "count"])
+
+
+class PitchHistory:
+    """Histórico de capacidade fixa de frequências com marca de tempo, apoiado em arrays NumPy.
+
+    Cada valor é escrito duas vezes (em `i` e em `i + capacity`), de modo que as últimas N
+    leituras sempre formam um trecho contíguo e podem ser devolvidas como views, sem cópia.
+    A inserção é O(1) e as marcas de tempo devem ser crescentes.
+
+    A thread de análise escreve enquanto outras (a serial do Arduino, a interface) leem: `stats`,
+    `median` e `latest` leem a janela com o lock do histórico. Views de `last` e `window`
+    podem ser sobrescritas por inserções de outra thread; fora da thread que escreve, use-as
+    dentro de `with history.lock:`.
+
+    Attributes:
+        capacity (int): Número máximo de leituras mantidas.
+        count (int): Número de leituras disponíveis (até `capacity`).
+        lock (threading.RLock): Protege as inserções e as leituras feitas de outras threads.
+    """
+
+    def __init__(self, capacity=1024):
+        """Inicializa o histórico.
+
+        Args:
+            capacity (int): Número máximo de leituras mantidas.
+        """
+        self.capacity = int(capacity)
+        self.count = 0
+        self._head = 0
+        self._times = np.zeros(2 * self.capacity)
+        self._freqs = np.zeros(2 * self.capacity)
+        self.lock = threading.RLock()
+
+    def append(self, timestamp, frequency):
+        """Adiciona uma leitura, descartando a mais antiga quando cheio.
+
+        Args:
+            timestamp (float): Instante da leitura em segundos.
+            frequency (float): Frequência em Hz (0.0 para leituras sem voz).
+        """
+        with self.lock:
+            self._append(timestamp, frequency)
+
+    def _append(self, timestamp, frequency):
+        i = self._head
+        self._times[i] = self._times[i + self.capacity] = timestamp
+        self._freqs[i] = self._freqs[i + self.capacity] = frequency
+        self._head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def extend(self, timestamps, frequencies):
+        """Adiciona várias leituras em ordem, com uma única aquisição do lock."""
+        with self.lock:
+            for timestamp, frequency in zip(timestamps, frequencies):
+                self._append(timestamp, frequency)
+
+    def last(self, n=None):
+        """Views das últimas `n` leituras (todas, por padrão), da mais antiga para a mais recente.
+
+        As views refletem o buffer interno e são válidas até as próximas `capacity - n` inserções.
+
+        Returns:
+            tuple: (marcas de tempo, frequências) como views somente leitura.
+        """
+        with self.lock:
+            n = self.count if n is None else min(n, self.count)
+            end = self._head + self.capacity
+            times = self._times[end - n:end]
+            freqs = self._freqs[end - n:end]
+        times.flags.writeable = False
+        freqs.flags.writeable = False
+        return times, freqs
+
+    def window(self, seconds):
+        """Views das leituras dos últimos `seconds` segundos, contados a partir da mais recente.
+
+        Returns:
+            tuple: (marcas de tempo, frequências) como views somente leitura.
+        """
+        with self.lock:
+            times, freqs = self.last()
+            if not len(times):
+                return times, freqs
+            start = int(np.searchsorted(times, times[-1] - seconds, side="left"))
+            return times[start:], freqs[start:]
+
+    @property
+    def latest(self):
+        """A frequência mais recente, ou 0.0 se o histórico estiver vazio."""
+        with self.lock:
+            return float(self._freqs[self._head + self.capacity - 1]) if self.count else 0.0
+
+    def median(self, seconds):
+        """Mediana das leituras com voz na janela, ou 0.0 se não houver nenhuma."""
+        with self.lock:
+            _, freqs = self.window(seconds)
+            voiced = freqs[freqs > 0]
+        return float(np.median(voiced)) if len(voiced) else 0.0
+
+    def stats(self, seconds):
+        """Estatísticas da janela dos últimos `seconds` segundos.
+
+        Returns:
+            PitchStats: Mediana das leituras com voz (Hz), jitter (desvio padrão em cents em
+            torno da mediana; menor é mais estável), fração de leituras com voz e número de leituras.
+        """
+        with self.lock:
+            # Cópia feita com o lock: inserções de outra thread não alteram a janela no meio do cálculo
+            _, freqs = self.window(seconds)
+            freqs = freqs.copy()
+        if not len(freqs):
+            return PitchStats(0.0, 0.0, 0.0, 0)
+
+        voiced = freqs[freqs > 0]
+        if not len(voiced):
+            return PitchStats(0.0, 0.0, 0.0, len(freqs))
+
+        median = float(np.median(voiced))
+        jitter = float(np.std(1200 * np.log2(voiced / median)))
+        return PitchStats(median, jitter, len(voiced) / len(freqs), len(freqs))
+
+    def clear(self):
+        """Remove todas as leituras."""
+        with self.lock:
+            self.count = 0
+            self._head = 0
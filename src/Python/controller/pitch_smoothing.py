@@ -0,0 +1,244 @@
+import math
+from bisect import bisect_left, insort
+from collections import deque
+
+MEDIAN_SIZE = 10        # Janelas da mediana móvel (o mesmo número de leituras da mediana antiga)
+HOLD_FRAMES = 3         # Janelas fora da nota atual necessárias para trocar de nota
+HYSTERESIS_CENTS = 20   # Margem, além da fronteira de meio semitom, para trocar de nota
+
+# Cadeia de suavização de cada nível de dificuldade: mais estável no fácil, mais ágil no difícil
+DIFFICULTY_SMOOTHING = {
+    1: [("median", {"size": 15}), ("hysteresis", {"margin": 30, "hold": 5})],
+    2: [("hysteresis", {"margin": 20, "hold": 3}), ("one_euro", {"min_cutoff": 1.0, "beta": 0.02})],
+    3: [("hysteresis", {"margin": 10, "hold": 2}), ("one_euro", {"min_cutoff": 2.0, "beta": 0.05})],
+}
+
+
+class PitchSmoother:
+    """Interface dos filtros de suavização de frequência aplicados janela a janela.
+
+    Cada chamada de `update` custa O(1) ou O(log n) e devolve a frequência suavizada
+    (0.0 quando não há voz), sem esperar por um lote de leituras.
+
+    Attributes:
+        name (str): Nome do filtro, usado em `create_smoother`.
+        value (float): Última frequência suavizada.
+    """
+
+    name = None
+
+    def __init__(self):
+        self.value = 0.0
+
+    def update(self, timestamp, frequency):
+        """Processa uma leitura.
+
+        Args:
+            timestamp (float): Instante da leitura em segundos.
+            frequency (float): Frequência em Hz (0.0 para janelas sem voz).
+
+        Returns:
+            float: A frequência suavizada em Hz.
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """Descarta o estado acumulado."""
+        self.value = 0.0
+
+
+class RunningMedian(PitchSmoother):
+    """Mediana das leituras com voz nas últimas `size` janelas.
+
+    Mantém as leituras com voz ordenadas; inserção e remoção usam busca binária.
+    """
+
+    name = "median"
+
+    def __init__(self, size=MEDIAN_SIZE):
+        super().__init__()
+        self.size = size
+        self._window = deque()
+        self._sorted = []
+
+    def update(self, timestamp, frequency):
+        self._window.append(frequency)
+        if frequency > 0:
+            insort(self._sorted, frequency)
+        if len(self._window) > self.size:
+            oldest = self._window.popleft()
+            if oldest > 0:
+                del self._sorted[bisect_left(self._sorted, oldest)]
+
+        n = len(self._sorted)
+        if not n:
+            self.value = 0.0
+        elif n % 2:
+            self.value = self._sorted[n // 2]
+        else:
+            self.value = (self._sorted[n // 2 - 1] + self._sorted[n // 2]) / 2
+        return self.value
+
+    def reset(self):
+        super().reset()
+        self._window.clear()
+        self._sorted.clear()
+
+
+class OneEuroFilter(PitchSmoother):
+    """Filtro One-Euro (Casiez et al., 2012) sobre a frequência em escala logarítmica.
+
+    A frequência de corte cresce com a velocidade da variação: notas sustentadas são bem
+    suavizadas e mudanças de nota passam com pouco atraso. O filtro reinicia a cada trecho sem voz.
+    """
+
+    name = "one_euro"
+
+    def __init__(self, min_cutoff=1.0, beta=0.02, d_cutoff=1.0):
+        """Inicializa o filtro.
+
+        Args:
+            min_cutoff (float): Frequência de corte mínima em Hz (menor suaviza mais).
+            beta (float): Ganho da velocidade sobre o corte (maior reage mais rápido).
+            d_cutoff (float): Frequência de corte do filtro da derivada em Hz.
+        """
+        super().__init__()
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, timestamp, frequency):
+        if frequency <= 0:
+            self.reset()
+            return self.value
+
+        # Em semitons, a mesma velocidade vale para notas graves e agudas
+        x = 12 * math.log2(frequency)
+        if self._last_time is None or timestamp <= self._last_time:
+            self._x, self._dx = x, 0.0
+        else:
+            dt = timestamp - self._last_time
+            dx = (x - self._x) / dt
+            self._dx += self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+            cutoff = self.min_cutoff + self.beta * abs(self._dx)
+            self._x += self._alpha(cutoff, dt) * (x - self._x)
+        self._last_time = timestamp
+        self.value = 2 ** (self._x / 12)
+        return self.value
+
+    def reset(self):
+        super().reset()
+        self._last_time = None
+        self._x = 0.0
+        self._dx = 0.0
+
+
+class NoteHysteresis(PitchSmoother):
+    """Histerese na troca de nota.
+
+    Enquanto a leitura fica dentro da nota atual (meio semitom mais `margin` cents), ela passa
+    direto. Uma leitura além dessa fronteira só troca a nota depois de `hold` janelas seguidas;
+    até lá a saída mantém o último valor da nota atual, o que elimina saltos breves de oitava.
+    """
+
+    name = "hysteresis"
+
+    def __init__(self, margin=HYSTERESIS_CENTS, hold=HOLD_FRAMES):
+        """Inicializa o filtro.
+
+        Args:
+            margin (float): Cents além de ±50 necessários para sair da nota atual.
+            hold (int): Janelas seguidas fora da nota para confirmar a troca.
+        """
+        super().__init__()
+        self.margin = margin
+        self.hold = hold
+        self.reset()
+
+    def update(self, timestamp, frequency):
+        if frequency <= 0:
+            self._pending += 1
+            if self._pending >= self.hold:
+                self.reset()
+            return self.value
+
+        midi = 69 + 12 * math.log2(frequency / 440.0)
+        if self._note is None or abs(midi - self._note) * 100 <= 50 + self.margin:
+            if self._note is None:
+                self._note = round(midi)
+            self._pending = 0
+            self.value = frequency
+            return self.value
+
+        self._pending += 1
+        if self._pending >= self.hold:
+            self._note = round(midi)
+            self._pending = 0
+            self.value = frequency
+        return self.value
+
+    def reset(self):
+        super().reset()
+        self._note = None
+        self._pending = 0
+
+
+class SmootherChain(PitchSmoother):
+    """Aplica vários filtros em sequência, a saída de um alimentando o próximo."""
+
+    name = "chain"
+
+    def __init__(self, smoothers):
+        super().__init__()
+        self.smoothers = list(smoothers)
+
+    def update(self, timestamp, frequency):
+        for smoother in self.smoothers:
+            frequency = smoother.update(timestamp, frequency)
+        self.value = frequency
+        return self.value
+
+    def reset(self):
+        super().reset()
+        for smoother in self.smoothers:
+            smoother.reset()
+
+
+SMOOTHERS = {
+    smoother.name: smoother
+    for smoother in (RunningMedian, OneEuroFilter, NoteHysteresis)
+}
+
+
+def create_smoother(spec):
+    """Cria um filtro de suavização.
+
+    Args:
+        spec (str | list): Nome em SMOOTHERS ("median", "one_euro", "hysteresis"), ou lista de
+            pares (nome, opções) aplicados em sequência, como em DIFFICULTY_SMOOTHING.
+
+    Returns:
+        PitchSmoother: O filtro configurado.
+
+    Raises:
+        ValueError: Se algum nome de filtro for desconhecido.
+    """
+    if isinstance(spec, str):
+        spec = [(spec, {})]
+    smoothers = []
+    for name, options in spec:
+        if name not in SMOOTHERS:
+            raise ValueError(f"Filtro de suavização desconhecido: {name} (opções: {', '.join(SMOOTHERS)})")
+        smoothers.append(SMOOTHERS[name](**options))
+    return smoothers[0] if len(smoothers) == 1 else SmootherChain(smoothers)
+
+
+def difficulty_smoothing(difficulty):
+    """Especificação da cadeia de suavização do nível de dificuldade (fora de 1 a 3, usa o mais próximo)."""
+    return DIFFICULTY_SMOOTHING[min(max(int(difficulty), 1), 3)]
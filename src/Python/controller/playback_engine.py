@@ -0,0 +1,219 @@
+import threading
+from bisect import bisect_right
+from collections import namedtuple, deque
+import numpy as np
+import sounddevice as sd
+from .synthesizer import default_synthesizer
+
+BLOCK_SIZE = 512   # Quadros por chamada do callback de saída (~12 ms a 44,1 kHz)
+FADE_SAMPLES = 128  # Rampa de saída aplicada ao som interrompido por stop, pause ou seek
+
+# Estados do motor
+STOPPED = "stopped"
+PLAYING = "playing"
+PAUSED = "paused"
+
+# Posição da reprodução: estado, melodia tocada, índice da nota (None antes da primeira) e segundos
+PlaybackPosition = namedtuple("PlaybackPosition", ["state", "melody", "note", "seconds"])
+
+
+class PlaybackEngine:
+    """Reprodução de melodias sem bloquear quem a pede.
+
+    Um único `sounddevice.OutputStream` fica aberto depois da primeira reprodução e o seu
+    callback puxa as amostras da melodia atual e, quando ela termina, da próxima da fila de
+    renderizações. As melodias são renderizadas pelo Synthesizer na thread que chama `play`;
+    o callback só copia trechos dos buffers prontos. Os comandos (`play`, `stop`, `pause`,
+    `resume`, `seek`) podem vir de qualquer thread e valem a partir do próximo bloco entregue
+    ao dispositivo. O som interrompido sai com uma rampa curta, para não estalar.
+
+    Attributes:
+        synthesizer (Synthesizer): Sintetizador que renderiza as melodias.
+        rate (int): Taxa de amostragem em Hz.
+        block_size (int): Quadros por bloco do dispositivo.
+    """
+
+    def __init__(self, synthesizer=None, block_size=BLOCK_SIZE, device=None):
+        """Prepara o motor; o dispositivo só é aberto na primeira reprodução.
+
+        Args:
+            synthesizer (Synthesizer, optional): Por padrão, o sintetizador compartilhado.
+            block_size (int): Quadros por bloco do dispositivo.
+            device (int | str, optional): Dispositivo de saída do sounddevice.
+        """
+        self.synthesizer = synthesizer if synthesizer is not None else default_synthesizer()
+        self.rate = self.synthesizer.rate
+        self.block_size = block_size
+        self.device = device
+        self._stream = None
+        self._stream_lock = threading.Lock()  # Abertura e fechamento do dispositivo
+        self._lock = threading.Lock()         # Estado da reprodução, compartilhado com o callback
+        self._idle = threading.Event()
+        self._idle.set()
+        self._queue = deque()  # Pares (melodia, MelodyRender) aguardando a atual terminar
+        self._melody = None
+        self._render = None
+        self._position = 0
+        self._state = STOPPED
+        self._tail = None  # Fim do som interrompido, já com a rampa, somado ao próximo bloco
+
+    def _open(self):
+        # Um lock próprio, e não o do estado: o callback usa aquele, e alguns dispositivos o
+        # chamam dentro de start() para preencher os primeiros buffers
+        with self._stream_lock:
+            if self._stream is None:
+                stream = sd.OutputStream(samplerate=self.rate, channels=1, dtype="float32",
+                                         blocksize=self.block_size, device=self.device,
+                                         callback=self._callback)
+                stream.start()
+                self._stream = stream
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        out.fill(0)
+        with self._lock:
+            if self._tail is not None:
+                count = min(len(self._tail), frames)
+                out[:count] = self._tail[:count]
+                self._tail = None
+
+            filled = 0
+            while self._state == PLAYING and filled < frames:
+                chunk = self._render.samples[self._position:self._position + frames - filled]
+                out[filled:filled + len(chunk)] += chunk
+                filled += len(chunk)
+                self._position += len(chunk)
+                if self._position >= len(self._render.samples):
+                    self._advance()
+
+    def _advance(self):
+        """Passa para a próxima melodia da fila, ou para o estado parado (com o lock)."""
+        if self._queue:
+            self._melody, self._render = self._queue.popleft()
+            self._position = 0
+        else:
+            self._melody = self._render = None
+            self._position = 0
+            self._state = STOPPED
+            self._idle.set()
+
+    def _interrupt(self):
+        """Guarda o trecho que estava tocando, com a rampa de saída (com o lock).
+
+        A posição avança o tamanho da rampa, para que uma pausa não repita essas amostras ao continuar.
+        """
+        if self._state != PLAYING:
+            return
+        tail = self._render.samples[self._position:self._position + FADE_SAMPLES]
+        self._tail = tail * np.linspace(1, 0, len(tail), dtype=np.float32)
+        self._position += len(tail)
+
+    def play(self, notes, enqueue=False):
+        """Começa a tocar uma melodia e retorna imediatamente.
+
+        Args:
+            notes (iterable): Melody, ou Note/tuplas (frequência, nota, duração).
+            enqueue (bool): Se True e algo já estiver tocando (ou pausado), a melodia entra na
+                fila e toca em seguida; senão, substitui a atual e esvazia a fila.
+        """
+        render = self.synthesizer.render_melody(notes)
+        if not len(render.samples):
+            return
+        self._open()
+        with self._lock:
+            if enqueue and self._state != STOPPED:
+                self._queue.append((notes, render))
+                return
+            self._interrupt()
+            self._queue.clear()
+            self._melody, self._render = notes, render
+            self._position = 0
+            self._state = PLAYING
+            self._idle.clear()
+
+    def stop(self):
+        """Interrompe a reprodução e descarta a fila."""
+        with self._lock:
+            self._interrupt()
+            self._queue.clear()
+            self._melody = self._render = None
+            self._position = 0
+            self._state = STOPPED
+            self._idle.set()
+
+    def pause(self):
+        """Pausa a reprodução, mantendo a posição."""
+        with self._lock:
+            if self._state == PLAYING:
+                self._interrupt()
+                self._state = PAUSED
+
+    def resume(self):
+        """Continua uma reprodução pausada."""
+        with self._lock:
+            if self._state == PAUSED:
+                self._state = PLAYING
+
+    def seek(self, seconds=None, note=None):
+        """Muda a posição da melodia atual, em segundos ou para o início de uma nota.
+
+        Raises:
+            ValueError: Se nenhuma melodia estiver tocando ou pausada.
+        """
+        with self._lock:
+            if self._render is None:
+                raise ValueError("Nenhuma melodia tocando")
+            if note is not None:
+                starts = self._render.starts
+                position = starts[min(max(int(note), 0), len(starts) - 1)]
+            else:
+                position = int(round((seconds or 0.0) * self.rate))
+            self._interrupt()
+            self._position = min(max(position, 0), len(self._render.samples) - 1)
+
+    def position(self):
+        """Posição atual da reprodução, para a interface destacar a nota tocada.
+
+        Returns:
+            PlaybackPosition: Estado, melodia, índice da nota atual e segundos desde o início.
+        """
+        with self._lock:
+            if self._render is None:
+                return PlaybackPosition(self._state, None, None, 0.0)
+            note = bisect_right(self._render.starts, self._position) - 1
+            return PlaybackPosition(self._state, self._melody, note if note >= 0 else None,
+                                    self._position / self.rate)
+
+    @property
+    def state(self):
+        return self._state
+
+    def wait(self, timeout=None):
+        """Espera a reprodução (e a fila) terminar ou ser interrompida.
+
+        Returns:
+            bool: False se o tempo limite acabou antes.
+        """
+        return self._idle.wait(timeout)
+
+    def close(self):
+        """Interrompe a reprodução e fecha o dispositivo de saída."""
+        self.stop()
+        with self._stream_lock:
+            if self._stream is not None:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_engine():
+    """Motor de reprodução compartilhado do processo (um único dispositivo de saída aberto)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = PlaybackEngine()
+        return _default
@@ -0,0 +1,166 @@
+from functools import lru_cache
+import numpy as np
+import scipy.fft
+from .peak_refinement import refine_offset, zoom_peaks
+
+
+@lru_cache(maxsize=None)
+def spectral_layout(chunk_size, rate, min_freq, max_freq):
+    """Calcula, uma única vez por tamanho de janela, a janela Hanning e a faixa de bins de voz.
+
+    Args:
+        chunk_size (int): Número de amostras por janela.
+        rate (int): Taxa de amostragem em Hz.
+        min_freq (float): Menor frequência analisada.
+        max_freq (float): Maior frequência analisada.
+
+    Returns:
+        tuple: (janela float32, slice dos bins da faixa de voz, frequências dos bins da faixa).
+    """
+    window = np.hanning(chunk_size).astype(np.float32)
+    window.flags.writeable = False
+
+    freqs = np.fft.rfftfreq(chunk_size, 1 / rate)
+    lo = int(np.searchsorted(freqs, min_freq, side="left"))
+    hi = int(np.searchsorted(freqs, max_freq, side="right"))
+    band_freqs = freqs[lo:hi]
+    band_freqs.flags.writeable = False
+    return window, slice(lo, hi), band_freqs
+
+
+class SpectralKernel:
+    """Estimador de pico espectral em lote, em float32 e sem alocações por leitura.
+
+    As janelas são empilhadas em um array 2-D e analisadas com uma única FFT real
+    em lote. A janela, a faixa de bins e os buffers de saída são reutilizados entre chamadas.
+
+    Attributes:
+        chunk_size (int): Número de amostras por janela.
+        rate (int): Taxa de amostragem em Hz.
+        frames (numpy.ndarray): Buffer (max_frames, chunk_size) onde as janelas podem ser escritas.
+        band_freqs (numpy.ndarray): Frequências dos bins dentro da faixa de voz.
+        workers (int): Threads usadas por `scipy.fft`; None usa `numpy.fft` com saída pré-alocada.
+        refinement (str): Interpolação sub-bin do pico (None, "parabolic" ou "gaussian").
+        zoom_points (int): Se maior que zero, refina cada pico com a transformada chirp-z.
+        magnitude (numpy.ndarray): Magnitudes da faixa de voz do último lote, reaproveitáveis
+            por visualizações sem refazer a FFT.
+    """
+
+    def __init__(self, chunk_size, rate, min_freq, max_freq, max_frames=1, workers=None,
+                 refinement=None, zoom_points=0):
+        """Inicializa o kernel e aloca os buffers.
+
+        Args:
+            chunk_size (int): Número de amostras por janela.
+            rate (int): Taxa de amostragem em Hz.
+            min_freq (float): Menor frequência analisada.
+            max_freq (float): Maior frequência analisada.
+            max_frames (int): Número inicial de janelas por lote.
+            workers (int, optional): Número de threads para `scipy.fft.rfft`.
+            refinement (str, optional): Interpolação sub-bin do pico.
+            zoom_points (int): Pontos da transformada chirp-z em torno do pico (0 desativa).
+        """
+        self.chunk_size = chunk_size
+        self.rate = rate
+        self.workers = workers
+        self.refinement = refinement
+        self.zoom_points = zoom_points
+        self.bin_width = rate / chunk_size
+        self.window, self.band, self.band_freqs = spectral_layout(chunk_size, rate, min_freq, max_freq)
+        self.max_frames = 0
+        self._allocate(max_frames)
+
+    def _allocate(self, max_frames):
+        """(Re)aloca os buffers para comportar `max_frames` janelas por lote."""
+        num_bins = len(self.band_freqs)
+        self.max_frames = max_frames
+        self.frames = np.zeros((max_frames, self.chunk_size), dtype=np.float32)
+        self._windowed = np.empty((max_frames, self.chunk_size), dtype=np.float32)
+        self._spectrum = np.empty((max_frames, self.chunk_size // 2 + 1), dtype=np.complex64)
+        self._magnitude = np.empty((max_frames, num_bins), dtype=np.float32)
+        self._is_peak = np.empty((max_frames, max(num_bins - 2, 0)), dtype=bool)
+        self._falling = np.empty_like(self._is_peak)
+        self._candidates = np.empty((max_frames, max(num_bins - 2, 0)), dtype=np.float32)
+        self._frequencies = np.empty(max_frames, dtype=np.float64)
+        self.magnitude = self._magnitude[:0]
+
+    def ensure_capacity(self, num_frames):
+        """Garante espaço para `num_frames` janelas, crescendo os buffers só quando necessário."""
+        if num_frames > self.max_frames:
+            self._allocate(num_frames)
+
+    def spectrum(self, frames):
+        """Calcula a magnitude da faixa de voz de um lote de janelas.
+
+        Args:
+            frames (numpy.ndarray): Array (n, chunk_size) com as janelas.
+
+        Returns:
+            numpy.ndarray: View (n, bins da faixa) com as magnitudes, válida até a próxima chamada.
+        """
+        n = len(frames)
+        self.ensure_capacity(n)
+        windowed = self._windowed[:n]
+        np.multiply(frames, self.window, out=windowed, casting="unsafe")
+
+        if self.workers is None:
+            np.fft.rfft(windowed, axis=1, out=self._spectrum[:n])
+            spectrum = self._spectrum[:n]
+        else:
+            spectrum = scipy.fft.rfft(windowed, axis=1, workers=self.workers)
+
+        magnitude = self._magnitude[:n]
+        np.abs(spectrum[:, self.band], out=magnitude)
+        self.magnitude = magnitude
+        return magnitude
+
+    def peak_frequencies(self, frames=None, count=None):
+        """Retorna a frequência do pico mais forte de cada janela do lote.
+
+        Com `refinement`, a frequência é interpolada entre bins; com `zoom_points`, é refinada
+        pela transformada chirp-z avaliada só em torno do pico vencedor.
+
+        Args:
+            frames (numpy.ndarray, optional): Array (n, chunk_size); por padrão usa `self.frames`.
+            count (int, optional): Quantas linhas de `self.frames` analisar.
+
+        Returns:
+            numpy.ndarray: View (n,) com as frequências em Hz (0.0 quando não há pico),
+            válida até a próxima chamada.
+        """
+        if frames is None:
+            frames = self.frames[:count if count is not None else self.max_frames]
+        n = len(frames)
+        magnitude = self.spectrum(frames)
+
+        # Um pico é um bin interno maior que os dois vizinhos, como em signal.find_peaks
+        core = magnitude[:, 1:-1]
+        is_peak = self._is_peak[:n]
+        falling = self._falling[:n]
+        np.greater(core, magnitude[:, :-2], out=is_peak)
+        np.greater(core, magnitude[:, 2:], out=falling)
+        np.logical_and(is_peak, falling, out=is_peak)
+
+        candidates = self._candidates[:n]
+        np.multiply(core, is_peak, out=candidates)
+
+        frequencies = self._frequencies[:n]
+        if candidates.shape[1] == 0:
+            frequencies.fill(0.0)
+            return frequencies
+
+        rows = np.arange(n)
+        best = candidates.argmax(axis=1)
+        found = candidates[rows, best] > 0
+
+        # `best` indexa o miolo da faixa; na magnitude completa o pico está em best + 1
+        offset = refine_offset(self.refinement, magnitude[rows, best], magnitude[rows, best + 1],
+                               magnitude[rows, best + 2])
+        np.multiply(offset, self.bin_width, out=frequencies)
+        frequencies += self.band_freqs[1:-1][best]
+
+        if self.zoom_points and found.any():
+            frequencies[found] = zoom_peaks(self._windowed[:n][found], frequencies[found], self.bin_width,
+                                            self.rate, self.zoom_points)
+        frequencies[~found] = 0.0
+        return frequencies
@@ -0,0 +1,101 @@
+import threading
+import numpy as np
+from .note_recognizer import MIN_FREQ, MAX_FREQ
+from .spectral_kernel import SpectralKernel
+
+FEED_SECONDS = 5.0     # Duração exibida pelo espectrograma rolante
+FLOOR_DB = 40.0        # Nível atribuído às janelas descartadas pelo portão de vozeamento
+CEILING_DB = 140.0     # Nível máximo esperado (seno de fundo de escala na janela de 2048 amostras)
+
+
+class SpectrogramFeed:
+    """Espectrograma rolante alimentado pelo próprio pipeline de análise.
+
+    Registra-se como ouvinte do reconhecedor e grava, na thread de análise, uma coluna em dB
+    por janela analisada. Com o motor FFT reaproveita as magnitudes que o motor já calculou;
+    os outros motores usam um SpectralKernel próprio, também fora da thread da interface.
+    Janelas que o portão rejeita entram como colunas no piso (`FLOOR_DB`).
+
+    Como o PitchHistory, cada coluna é escrita duas vezes para que a imagem ordenada no tempo
+    seja sempre um trecho contíguo do buffer.
+
+    Attributes:
+        channel (int): Canal do reconhecedor exibido.
+        columns (int): Número de janelas exibidas.
+        band_freqs (numpy.ndarray): Frequência de cada linha da imagem em Hz.
+        seconds (float): Duração coberta pela imagem.
+    """
+
+    def __init__(self, recognizer, seconds=FEED_SECONDS, channel=0):
+        """Inicializa o buffer e registra o ouvinte no reconhecedor.
+
+        Args:
+            recognizer (NoteRecognizer): Reconhecedor em modo streaming.
+            seconds (float): Duração exibida.
+            channel (int): Canal exibido.
+        """
+        self.recognizer = recognizer
+        self.channel = channel
+        self.columns = max(1, int(seconds * recognizer.rate / recognizer.hop_size))
+        self.seconds = self.columns * recognizer.hop_size / recognizer.rate
+
+        kernel = getattr(recognizer.estimator, "kernel", None)
+        self._shared = isinstance(kernel, SpectralKernel)
+        if not self._shared:
+            kernel = SpectralKernel(recognizer.window_size, recognizer.rate, MIN_FREQ, MAX_FREQ)
+        self.kernel = kernel
+        self.band_freqs = kernel.band_freqs
+
+        self._image = np.full((len(self.band_freqs), 2 * self.columns), FLOOR_DB, dtype=np.float32)
+        self._pitch = np.full(2 * self.columns, np.nan)
+        self._head = 0
+        self._lock = threading.Lock()
+        recognizer.add_listener(self._on_frames)
+
+    def _on_frames(self, ends, frames, frequencies, voiced):
+        """Ouvinte do reconhecedor: converte o lote em colunas do espectrograma."""
+        c = self.channel
+        analyzed = self.recognizer.analyzed.reshape(voiced.shape)
+        columns = np.zeros((len(frames), len(self.band_freqs)), dtype=np.float32)
+        if analyzed[:, c].any():
+            if self._shared:
+                # As magnitudes do motor seguem a ordem das janelas (de todos os canais) que passaram pelo portão
+                rows = np.cumsum(analyzed.ravel()).reshape(analyzed.shape)[:, c] - 1
+                columns[analyzed[:, c]] = self.kernel.magnitude[rows[analyzed[:, c]]]
+            else:
+                columns[analyzed[:, c]] = self.kernel.spectrum(frames[:, c][analyzed[:, c]])
+        np.log10(columns, out=columns, where=columns > 0)
+        columns *= 20
+        np.clip(columns, FLOOR_DB, CEILING_DB, out=columns)
+        pitch = np.where(voiced[:, c], frequencies[:, c], np.nan)
+
+        with self._lock:
+            for column, value in zip(columns[-self.columns:], pitch[-self.columns:]):
+                i = self._head
+                self._image[:, i] = self._image[:, i + self.columns] = column
+                self._pitch[i] = self._pitch[i + self.columns] = value
+                self._head = (i + 1) % self.columns
+
+    def snapshot(self, image=None, pitch=None):
+        """Copia o espectrograma ordenado no tempo, da coluna mais antiga para a mais recente.
+
+        Args:
+            image (numpy.ndarray, optional): Destino (linhas, colunas) reaproveitado entre chamadas.
+            pitch (numpy.ndarray, optional): Destino (colunas,) da frequência detectada (NaN sem voz).
+
+        Returns:
+            tuple: (imagem em dB, frequência detectada por coluna).
+        """
+        if image is None:
+            image = np.empty((len(self.band_freqs), self.columns), dtype=np.float32)
+        if pitch is None:
+            pitch = np.empty(self.columns)
+        with self._lock:
+            start = self._head
+            np.copyto(image, self._image[:, start:start + self.columns])
+            np.copyto(pitch, self._pitch[start:start + self.columns])
+        return image, pitch
+
+    def close(self):
+        """Remove o ouvinte do reconhecedor."""
+        self.recognizer.remove_listener(self._on_frames)
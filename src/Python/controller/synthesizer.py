@@ -0,0 +1,130 @@
+import threading
+from collections import namedtuple, OrderedDict
+import numpy as np
+import sounddevice as sd
+
+SAMPLE_RATE = 44100     # Taxa de reprodução em Hz
+TABLE_SIZE = 4096       # Pontos de um período da senoide na tabela de onda
+CACHE_NOTES = 256       # Notas renderizadas mantidas no cache LRU
+NOTE_GAP = 0.1          # Silêncio entre notas seguidas de uma melodia (s)
+DEFAULT_DURATION = 0.5  # Duração usada para notas gravadas sem duração (s)
+
+# Envelope: frações da nota em rampa de subida e de descida, e amplitude de pico
+Envelope = namedtuple("Envelope", ["attack", "release", "amplitude"])
+DEFAULT_ENVELOPE = Envelope(0.1, 0.1, 0.5)
+
+# Melodia renderizada: amostras float32 e a amostra em que cada nota começa
+MelodyRender = namedtuple("MelodyRender", ["samples", "starts", "rate"])
+
+
+class Synthesizer:
+    """Sintetizador por tabela de onda compartilhado pelos reprodutores de melodia.
+
+    Um período da senoide é calculado uma vez; cada nota é lida da tabela com passo
+    proporcional à frequência e interpolação linear. Os buffers das notas ficam em um cache LRU
+    indexado por (frequência, duração em amostras, envelope), então melodias com notas repetidas
+    ou tocadas de novo não refazem a síntese. Uma melodia inteira vira um único buffer contínuo,
+    com as pausas entre notas contadas em amostras, tocado com uma só chamada ao dispositivo.
+
+    Attributes:
+        rate (int): Taxa de amostragem em Hz.
+    """
+
+    def __init__(self, rate=SAMPLE_RATE, table_size=TABLE_SIZE, cache_notes=CACHE_NOTES):
+        self.rate = rate
+        self.cache_notes = cache_notes
+        # Um ponto extra repete o primeiro, para a interpolação não precisar dar a volta
+        phases = np.arange(table_size + 1) * (2 * np.pi / table_size)
+        self._table = np.sin(phases).astype(np.float32)
+        self._table_size = table_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def note_samples(self, duration):
+        """Número de amostras de uma nota (notas sem duração usam DEFAULT_DURATION)."""
+        if duration is None:
+            duration = DEFAULT_DURATION
+        return max(0, int(round(duration * self.rate)))
+
+    def render_note(self, frequency, duration, envelope=DEFAULT_ENVELOPE):
+        """Buffer float32 somente leitura de uma nota, vindo do cache quando possível."""
+        key = (round(float(frequency), 3), self.note_samples(duration), envelope)
+        with self._lock:
+            samples = self._cache.get(key)
+            if samples is not None:
+                self._cache.move_to_end(key)
+                return samples
+
+        samples = self._synthesize(*key)
+        with self._lock:
+            self._cache[key] = samples
+            if len(self._cache) > self.cache_notes:
+                self._cache.popitem(last=False)
+        return samples
+
+    def _synthesize(self, frequency, count, envelope):
+        step = frequency * self._table_size / self.rate
+        phase = np.arange(count, dtype=np.float64) * step
+        phase %= self._table_size
+        index = phase.astype(np.intp)
+        fraction = (phase - index).astype(np.float32)
+        samples = self._table[index]
+        samples += fraction * (self._table[index + 1] - samples)
+
+        attack, release = int(envelope.attack * count), int(envelope.release * count)
+        samples[:attack] *= np.linspace(0, 1, attack, dtype=np.float32)
+        if release:
+            samples[-release:] *= np.linspace(1, 0, release, dtype=np.float32)
+        samples *= envelope.amplitude
+        samples.flags.writeable = False
+        return samples
+
+    def render_melody(self, notes, gap=NOTE_GAP, envelope=DEFAULT_ENVELOPE):
+        """Renderiza uma melodia inteira em um único buffer contínuo.
+
+        Args:
+            notes (iterable): Note ou tuplas (frequência, nota, duração).
+            gap (float): Silêncio entre notas em segundos.
+            envelope (Envelope): Envelope aplicado a cada nota.
+
+        Returns:
+            MelodyRender: Amostras float32, início (em amostras) de cada nota e a taxa.
+        """
+        buffers = [self.render_note(frequency, duration, envelope) for frequency, _, duration in notes]
+        gap_samples = int(round(gap * self.rate))
+        starts = []
+        position = 0
+        for buffer in buffers:
+            starts.append(position)
+            position += len(buffer) + gap_samples
+        total = max(0, position - gap_samples)
+
+        samples = np.zeros(total, dtype=np.float32)
+        for start, buffer in zip(starts, buffers):
+            samples[start:start + len(buffer)] = buffer
+        return MelodyRender(samples, starts, self.rate)
+
+    def play_note(self, frequency, duration, envelope=DEFAULT_ENVELOPE):
+        """Toca uma nota e espera ela terminar."""
+        sd.play(self.render_note(frequency, duration, envelope), self.rate)
+        sd.wait()
+
+    def play_melody(self, notes, gap=NOTE_GAP, envelope=DEFAULT_ENVELOPE):
+        """Toca uma melodia inteira com uma única abertura do dispositivo e espera ela terminar."""
+        render = self.render_melody(notes, gap, envelope)
+        if len(render.samples):
+            sd.play(render.samples, self.rate)
+            sd.wait()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_synthesizer():
+    """Sintetizador compartilhado do processo (e o seu cache de notas)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Synthesizer()
+        return _default
@@ -0,0 +1,52 @@
+from collections import namedtuple
+import numpy as np
+
+RMS_THRESHOLD = 200.0   # Energia mínima (RMS na escala int16, ~-44 dBFS) para haver voz
+ZCR_THRESHOLD = 0.25    # Taxa máxima de cruzamentos por zero de um som vozeado
+MARGIN_DB = 12.0        # Margem de energia, em dB, para confiança máxima
+
+PitchReading = namedtuple("PitchReading", ["frequency", "voiced", "confidence"])
+
+
+class VoicingGate:
+    """Portão de energia e vozeamento aplicado antes do estágio espectral.
+
+    Janelas silenciosas (RMS baixo) ou não vozeadas (muitos cruzamentos por zero, como ruído
+    e fricativas) são descartadas sem FFT, e o resultado é marcado explicitamente como sem voz.
+
+    Attributes:
+        rms_threshold (float): RMS mínimo, na escala int16, para considerar a janela vozeada.
+        zcr_threshold (float): Fração máxima de cruzamentos por zero de uma janela vozeada.
+    """
+
+    def __init__(self, rms_threshold=RMS_THRESHOLD, zcr_threshold=ZCR_THRESHOLD):
+        """Inicializa o portão.
+
+        Args:
+            rms_threshold (float): RMS mínimo na escala int16.
+            zcr_threshold (float): Fração máxima de cruzamentos por zero.
+        """
+        self.rms_threshold = rms_threshold
+        self.zcr_threshold = zcr_threshold
+
+    def evaluate(self, frames):
+        """Classifica cada janela como vozeada ou não.
+
+        Args:
+            frames (numpy.ndarray): Array (n, tamanho) com as janelas.
+
+        Returns:
+            tuple: (máscara de janelas vozeadas, confiança da decisão entre 0 e 1).
+        """
+        frames = np.asarray(frames, dtype=np.float32)
+        rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frames.shape[1])
+        crossings = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1)
+        zcr = crossings / (frames.shape[1] - 1)
+
+        # Margem de cada critério, normalizada em [-1, 1]; a decisão segue o critério mais fraco
+        with np.errstate(divide="ignore"):
+            energy_db = 20 * np.log10(rms / self.rms_threshold)
+        energy_margin = np.clip(energy_db / MARGIN_DB, -1.0, 1.0)
+        zcr_margin = np.clip((self.zcr_threshold - zcr) / self.zcr_threshold, -1.0, 1.0)
+        margin = np.minimum(energy_margin, zcr_margin)
+        return margin >= 0, np.abs(margin)
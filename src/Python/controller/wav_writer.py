@@ -0,0 +1,98 @@
+import os
+import queue
+import struct
+import threading
+import numpy as np
+
+QUEUE_BLOCKS = 256        # Blocos aguardando gravação (~3 s com blocos de 512 quadros a 44.1 kHz)
+FLUSH_FRAMES = 1 << 16    # Quadros escritos entre descargas do arquivo em disco
+_UNKNOWN_SIZE = 0xFFFFFFFF  # Tamanho provisório: leitores usam o tamanho real do arquivo
+
+
+class WavStreamWriter:
+    """Grava áudio PCM de 16 bits em um arquivo WAV, aos poucos, a partir de uma thread própria.
+
+    `write` só copia o bloco para uma fila limitada e volta imediatamente, então pode ser
+    chamado do callback de áudio. A thread de gravação esvazia a fila em disco e descarrega o
+    arquivo a cada FLUSH_FRAMES quadros; até o `close`, o tamanho do chunk 'data' fica como
+    desconhecido e `open_wav` usa o tamanho do arquivo, de modo que mesmo uma gravação
+    interrompida pode ser mapeada em memória e reanalisada.
+
+    Attributes:
+        path (str): Caminho do arquivo WAV.
+        rate (int): Taxa de amostragem em Hz.
+        channels (int): Número de canais.
+        frames_written (int): Quadros já gravados em disco.
+        dropped_blocks (int): Blocos descartados porque a fila estava cheia.
+    """
+
+    def __init__(self, path, rate, channels=1, queue_blocks=QUEUE_BLOCKS):
+        """Cria o arquivo, escreve o cabeçalho e inicia a thread de gravação.
+
+        Args:
+            path (str): Caminho do arquivo WAV (os diretórios são criados se preciso).
+            rate (int): Taxa de amostragem em Hz.
+            channels (int): Número de canais.
+            queue_blocks (int): Capacidade da fila de blocos; limita a memória usada.
+        """
+        self.path = path
+        self.rate = rate
+        self.channels = channels
+        self.frames_written = 0
+        self.dropped_blocks = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "wb")
+        self._write_header(_UNKNOWN_SIZE)
+        self._queue = queue.Queue(maxsize=queue_blocks)
+        self._thread = threading.Thread(target=self._run, name="wav-writer", daemon=True)
+        self._thread.start()
+
+    def _write_header(self, data_size):
+        """Escreve o cabeçalho RIFF/WAVE com o tamanho do chunk 'data' indicado."""
+        block_align = 2 * self.channels
+        riff_size = _UNKNOWN_SIZE if data_size == _UNKNOWN_SIZE else 36 + data_size
+        self._file.seek(0)
+        self._file.write(struct.pack("<4sI4s", b"RIFF", riff_size, b"WAVE"))
+        self._file.write(struct.pack("<4sIHHIIHH", b"fmt ", 16, 1, self.channels, self.rate,
+                                     self.rate * block_align, block_align, 16))
+        self._file.write(struct.pack("<4sI", b"data", data_size))
+
+    def write(self, block):
+        """Enfileira um bloco int16 (quadros, canais) sem bloquear.
+
+        Returns:
+            bool: False se o bloco foi descartado porque a fila estava cheia.
+        """
+        try:
+            self._queue.put_nowait(np.array(block, dtype="<i2", copy=True))
+            return True
+        except queue.Full:
+            self.dropped_blocks += 1
+            return False
+
+    def _run(self):
+        """Laço da thread: grava os blocos na ordem em que chegaram até receber o sinal de fim."""
+        since_flush = 0
+        while True:
+            block = self._queue.get()
+            if block is None:
+                break
+            self._file.write(block.tobytes())
+            self.frames_written += len(block)
+            since_flush += len(block)
+            if since_flush >= FLUSH_FRAMES:
+                self._file.flush()
+                since_flush = 0
+
+    def close(self):
+        """Grava o que falta na fila, fecha o arquivo e corrige os tamanhos no cabeçalho."""
+        if self._file.closed:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        data_size = self.frames_written * 2 * self.channels
+        if data_size + 36 < _UNKNOWN_SIZE:
+            self._write_header(data_size)
+        self._file.close()
@@ -2,39 +2,28 @@
 import sys
 sys.stdout.reconfigure(encoding='utf-8')
 
-import numpy as np
-import sounddevice as sd
-import json
-import time
+from controller.synthesizer import default_synthesizer, DEFAULT_DURATION
+from controller.playback_engine import default_engine
 
 class MelodyPreview:
     def __init__(self):
-        self.sample_rate = 44100
+        self.synthesizer = default_synthesizer()
+        self.engine = default_engine()
+        self.sample_rate = self.synthesizer.rate
     
     def preview_melody(self, dados_melodia):
-        """Reproduz uma sequência de notas."""
+        """Começa a reproduzir uma sequência de notas (uma Melody ou uma sequência de Note) sem esperar o fim."""
         
         for nota in dados_melodia:
-            frequencia, nome_nota, duracao = nota
-            print(f"Tocando nota {nome_nota} (freq: {frequencia:.2f}Hz) por {duracao:.2f}s")
-            self.preview_note(frequencia, duracao)
-            time.sleep(0.1)  # Pequena pausa entre notas
+            duracao = nota.duration if nota.duration is not None else DEFAULT_DURATION
+            print(f"Nota {nota.name} (freq: {nota.frequency:.2f}Hz) por {duracao:.2f}s")
+        # Todas as notas, com as pausas entre elas, são tocadas a partir de um único buffer
+        self.engine.play(dados_melodia)
+
+    def stop(self):
+        """Interrompe a prévia em reprodução."""
+        self.engine.stop()
 
     def preview_note(self, frequency, duration):
         """Reproduz uma nota com a frequência e duração especificadas."""
-        t = np.linspace(0, duration, int(self.sample_rate * duration), False)
-        note = np.sin(2 * np.pi * frequency * t)
-        
-        # Aplica um envelope ADSR simples para suavizar o som
-        envelope = np.ones_like(note)
-        attack = int(0.1 * len(note))
-        decay = int(0.1 * len(note))
-        envelope[:attack] = np.linspace(0, 1, attack)
-        envelope[-decay:] = np.linspace(1, 0, decay)
-        
-        # Aplica o envelope e normaliza
-        note = note * envelope * 0.5
-        
-        # Reproduz a nota
-        sd.play(note, self.sample_rate)
-        sd.wait()  # Espera a nota terminar de tocar
\ No newline at end of file
+        self.synthesizer.play_note(frequency, duration)
@@ -0,0 +1,312 @@
+import os
+import sys
+import time
+import argparse
+from bisect import bisect_right
+from collections import namedtuple
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(base_dir)
+
+from controller.note_mapping import NOTE_NAMES, midi_to_frequency
+from controller.melody_repository import MelodyRepository, default_repository, DATABASE_FILE
+
+READ_BLOCK = 1 << 14      # Bytes lidos do arquivo por vez ao percorrer uma trilha
+DEFAULT_TEMPO = 500000    # Microssegundos por semínima quando o arquivo não define o andamento
+MIN_NOTE_DURATION = 0.05  # Notas mais curtas que isso (s), como ornamentos, são descartadas
+DRUM_CHANNEL = 9          # Canal 10 do General MIDI, de percussão, nunca é usado como melodia
+MIDI_EXTENSIONS = (".mid", ".midi", ".smf")
+SMPTE_FRAME_RATES = (24, 25, 29, 30)  # Quadros por segundo aceitos na divisão SMPTE (29 = 29,97 drop-frame)
+
+ImportResult = namedtuple("ImportResult", ["path", "melody_id", "notes", "error"])
+
+
+class MidiFormatError(ValueError):
+    """Arquivo que não é um Standard MIDI File válido."""
+
+
+class _ChunkReader:
+    """Lê um chunk do arquivo aos poucos, em blocos de READ_BLOCK bytes, sem carregá-lo inteiro."""
+
+    def __init__(self, file, length):
+        self._file = file
+        self._remaining = length
+        self._buffer = b""
+        self._position = 0
+
+    def _fill(self):
+        if not self._remaining:
+            raise MidiFormatError("Trilha MIDI termina no meio de um evento")
+        self._buffer = self._file.read(min(READ_BLOCK, self._remaining))
+        if not self._buffer:
+            raise MidiFormatError("Arquivo MIDI truncado")
+        self._remaining -= len(self._buffer)
+        self._position = 0
+
+    @property
+    def exhausted(self):
+        return self._position >= len(self._buffer) and not self._remaining
+
+    def byte(self):
+        if self._position >= len(self._buffer):
+            self._fill()
+        value = self._buffer[self._position]
+        self._position += 1
+        return value
+
+    def read(self, size):
+        parts = []
+        while size:
+            if self._position >= len(self._buffer):
+                self._fill()
+            part = self._buffer[self._position:self._position + size]
+            self._position += len(part)
+            size -= len(part)
+            parts.append(part)
+        return b"".join(parts)
+
+    def skip(self):
+        """Descarta o resto do chunk."""
+        self._file.seek(self._remaining, os.SEEK_CUR)
+        self._remaining = 0
+        self._buffer = b""
+        self._position = 0
+
+    def varlen(self):
+        value = 0
+        for _ in range(4):
+            byte = self.byte()
+            value = (value << 7) | (byte & 0x7F)
+            if not byte & 0x80:
+                return value
+        raise MidiFormatError("Quantidade de tamanho variável inválida no arquivo MIDI")
+
+
+def _read_chunk_header(file):
+    header = file.read(8)
+    if not header:
+        return None, 0
+    if len(header) < 8:
+        raise MidiFormatError("Arquivo MIDI truncado")
+    return header[:4], int.from_bytes(header[4:], "big")
+
+
+def _parse_track(reader, track, voices, tempos):
+    """Percorre os eventos de uma trilha, guardando as notas por canal e as mudanças de andamento.
+
+    Args:
+        reader (_ChunkReader): Leitor posicionado no início dos eventos da trilha.
+        track (int): Número da trilha no arquivo.
+        voices (dict): (trilha, canal) -> lista de (início, fim, nota MIDI) em ticks; atualizado.
+        tempos (list): Pares (tick, microssegundos por semínima); atualizado.
+    """
+    tick = 0
+    status = None
+    sounding = {}  # (canal, nota) -> tick do início
+    while not reader.exhausted:
+        tick += reader.varlen()
+        byte = reader.byte()
+        if byte == 0xFF:
+            kind, length = reader.byte(), reader.varlen()
+            data = reader.read(length)
+            if kind == 0x51 and length == 3:
+                tempos.append((tick, int.from_bytes(data, "big")))
+            elif kind == 0x2F:
+                reader.skip()
+                break
+            continue
+        if byte in (0xF0, 0xF7):
+            reader.read(reader.varlen())
+            continue
+
+        if byte & 0x80:
+            status = byte
+            first = reader.byte()
+        elif status is None:
+            raise MidiFormatError("Evento MIDI sem status")
+        else:
+            first = byte  # Status corrente: o byte já é o primeiro dado
+
+        kind, channel = status & 0xF0, status & 0x0F
+        if kind in (0xC0, 0xD0):
+            continue
+        velocity = reader.byte()
+        if kind == 0x90 and velocity:
+            # Um novo ataque na mesma nota encerra o anterior
+            start = sounding.pop((channel, first), None)
+            if start is not None:
+                voices.setdefault((track, channel), []).append((start, tick, first))
+            sounding[channel, first] = tick
+        elif kind in (0x80, 0x90):
+            start = sounding.pop((channel, first), None)
+            if start is not None:
+                voices.setdefault((track, channel), []).append((start, tick, first))
+    for (channel, pitch), start in sounding.items():
+        voices.setdefault((track, channel), []).append((start, tick, pitch))
+
+
+def read_midi_voices(path):
+    """Lê um Standard MIDI File trilha a trilha, em blocos, e separa as notas por trilha e canal.
+
+    Returns:
+        tuple: (vozes {(trilha, canal): [(início, fim, nota MIDI)]} em ticks, função que converte
+        ticks em segundos pelo mapa de andamentos do arquivo).
+
+    Raises:
+        MidiFormatError: Se o arquivo não for um MIDI válido.
+    """
+    voices, tempos = {}, []
+    with open(path, "rb") as file:
+        kind, length = _read_chunk_header(file)
+        if kind != b"MThd" or length < 6:
+            raise MidiFormatError("Não é um arquivo MIDI (cabeçalho MThd ausente)")
+        header = file.read(length)
+        if len(header) < 6:
+            raise MidiFormatError("Arquivo MIDI truncado")
+        division = int.from_bytes(header[4:6], "big")
+
+        track = 0
+        while True:
+            kind, length = _read_chunk_header(file)
+            if kind is None:
+                break
+            reader = _ChunkReader(file, length)
+            if kind == b"MTrk":
+                _parse_track(reader, track, voices, tempos)
+                track += 1
+            else:
+                reader.skip()  # Chunks desconhecidos são ignorados, como manda o padrão
+    return voices, _tick_clock(division, tempos)
+
+
+def _tick_clock(division, tempos):
+    """Função que converte ticks em segundos, respeitando as mudanças de andamento."""
+    if division & 0x8000:
+        # SMPTE: quadros por segundo (em complemento de dois) vezes ticks por quadro
+        frames, ticks_per_frame = 256 - (division >> 8), division & 0xFF
+        if frames not in SMPTE_FRAME_RATES or not ticks_per_frame:
+            raise MidiFormatError("Divisão de tempo SMPTE inválida no arquivo MIDI")
+        seconds_per_tick = 1.0 / (frames * ticks_per_frame)
+        return lambda tick: tick * seconds_per_tick
+    if not division:
+        raise MidiFormatError("Divisão de tempo inválida no arquivo MIDI")
+
+    # Trechos de andamento constante: tick inicial, segundos até ele e segundos por tick
+    starts, offsets, rates = [0], [0.0], [DEFAULT_TEMPO / 1e6 / division]
+    for tick, tempo in sorted(tempos):
+        offsets.append(offsets[-1] + (tick - starts[-1]) * rates[-1])
+        starts.append(tick)
+        rates.append(tempo / 1e6 / division)
+
+    def to_seconds(tick):
+        segment = bisect_right(starts, tick) - 1
+        return offsets[segment] + (tick - starts[segment]) * rates[segment]
+    return to_seconds
+
+
+def monophonic_line(voices, to_seconds, min_duration=MIN_NOTE_DURATION):
+    """Extrai uma linha melódica monofônica no formato das melodias.
+
+    Escolhe a voz (trilha e canal) com mais notas, fora a percussão, e aplica a regra do
+    "horizonte": entre notas simultâneas fica a mais aguda, e cada nota termina quando a seguinte
+    começa. Pausas não entram (o formato não as representa) e notas curtas demais são descartadas.
+
+    Returns:
+        list: Tuplas (frequência, nota, duração em segundos).
+    """
+    candidates = [(len(notes), key) for key, notes in voices.items()
+                  if notes and key[1] != DRUM_CHANNEL]
+    if not candidates:
+        return []
+    _, key = max(candidates)
+    notes = sorted(voices[key], key=lambda note: (note[0], -note[2]))
+
+    line = []
+    for start, end, pitch in notes:
+        if line and line[-1][0] == start:
+            continue  # Nota mais grave começando junto com outra
+        if line:
+            line[-1][1] = min(line[-1][1], start)
+        line.append([start, end, pitch])
+
+    melody = []
+    for start, end, pitch in line:
+        duration = to_seconds(end) - to_seconds(start)
+        if duration >= min_duration:
+            melody.append((float(midi_to_frequency(pitch)), NOTE_NAMES[pitch % 12], duration))
+    return melody
+
+
+def read_midi_melody(path, min_duration=MIN_NOTE_DURATION):
+    """Lê um arquivo MIDI e retorna a sua linha melódica (frequência, nota, duração)."""
+    voices, to_seconds = read_midi_voices(path)
+    return monophonic_line(voices, to_seconds, min_duration)
+
+
+def find_midi_files(paths):
+    """Expande diretórios (recursivamente) nos arquivos MIDI que eles contêm, em ordem alfabética."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names
+                             if name.lower().endswith(MIDI_EXTENSIONS))
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def import_midi(paths, repository=None, min_duration=MIN_NOTE_DURATION):
+    """Importa arquivos MIDI (ou diretórios deles) para o repositório de melodias.
+
+    Cada arquivo é lido e convertido separadamente; os que falham entram no relatório com o
+    erro e não interrompem os demais. As melodias válidas são inseridas juntas em uma única
+    transação, com o nome do arquivo.
+
+    Args:
+        paths (iterable): Arquivos ou diretórios.
+        repository (MelodyRepository, optional): Destino; por padrão, o repositório compartilhado.
+        min_duration (float): Duração mínima das notas mantidas, em segundos.
+
+    Returns:
+        list: Um ImportResult por arquivo (id da melodia e número de notas, ou a mensagem de erro).
+    """
+    if repository is None:
+        repository = default_repository()
+    results, melodies = [], []
+    for path in find_midi_files(paths):
+        try:
+            notes = read_midi_melody(path, min_duration)
+            if not notes:
+                raise MidiFormatError("Nenhuma nota melódica encontrada")
+        except (OSError, MidiFormatError) as e:
+            results.append(ImportResult(path, None, 0, str(e)))
+            continue
+        results.append(ImportResult(path, None, len(notes), None))
+        melodies.append((os.path.splitext(os.path.basename(path))[0], notes))
+
+    ids = iter(repository.add_many(melodies))
+    return [result if result.error else result._replace(melody_id=next(ids)) for result in results]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa arquivos MIDI para o banco de melodias.")
+    parser.add_argument("paths", nargs="+", help="Arquivos .mid ou diretórios com eles")
+    parser.add_argument("--database", default=DATABASE_FILE, help="Banco SQLite de destino")
+    parser.add_argument("--min-duration", type=float, default=MIN_NOTE_DURATION,
+                        help="Duração mínima das notas mantidas (s)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with MelodyRepository(args.database) as repository:
+        results = import_midi(args.paths, repository, args.min_duration)
+    elapsed = time.perf_counter() - start
+
+    failed = [result for result in results if result.error]
+    for result in failed:
+        print(f"ERRO {result.path}: {result.error}")
+    print(f"{len(results) - len(failed)} de {len(results)} arquivo(s) importado(s) em {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
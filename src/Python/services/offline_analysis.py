@@ -0,0 +1,231 @@
+import os
+import sys
+import json
+import time
+import argparse
+from collections import namedtuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(base_dir)
+
+from controller.note_recognizer import CHUNK, HOP_SIZE, MIN_FREQ, MAX_FREQ, REFINEMENT
+from controller.audio_source import open_wav
+from controller.pitch_estimators import create_estimator
+from controller.voicing_gate import VoicingGate
+from controller.decimator import PolyphaseDecimator
+from controller.note_mapping import frequencies_to_notes, note_names
+from controller.note_segmenter import NoteSegmenter
+
+BATCH_SIZE = 256  # Janelas analisadas por chamada do motor
+DECIMATION_BLOCK = 1 << 16  # Amostras lidas do arquivo por bloco da decimação
+_MICROSECONDS = 1_000_000  # Base de tempo usada para segmentar um contorno em notas
+
+# Fator que leva cada formato de amostra à escala int16 (tipo + bytes por amostra)
+_INT16_SCALE = {"u1": 256.0, "f4": 32767.0, "f8": 32767.0, "i4": 1 / 65536}
+
+PitchContour = namedtuple("PitchContour", ["times", "frequencies", "midi", "cents", "notes", "confidence"])
+
+CONTOUR_DTYPE = np.dtype([
+    ("time", np.float64),
+    ("frequency", np.float32),
+    ("midi", np.int16),
+    ("cents", np.float32),
+])
+
+
+def open_raw(path, rate, dtype="<i2", channels=1):
+    """Mapeia em memória um arquivo de PCM cru (sem cabeçalho).
+
+    Returns:
+        tuple: (numpy.memmap de forma (quadros, canais), taxa de amostragem).
+    """
+    dtype = np.dtype(dtype)
+    num_frames = os.path.getsize(path) // (dtype.itemsize * channels)
+    samples = np.memmap(path, dtype=dtype, mode="r", shape=(num_frames, channels))
+    return samples, rate
+
+
+def frame_signal(samples, window_size, hop_size):
+    """Divide o sinal em janelas sobrepostas sem copiar, com stride tricks.
+
+    Args:
+        samples (numpy.ndarray): Sinal 1-D (pode ser um memmap ou uma view com stride).
+        window_size (int): Número de amostras por janela.
+        hop_size (int): Avanço entre janelas.
+
+    Returns:
+        numpy.ndarray: View (janelas, window_size) sobre `samples`.
+    """
+    if len(samples) < window_size:
+        return np.empty((0, window_size), dtype=samples.dtype)
+    return sliding_window_view(samples, window_size)[::hop_size]
+
+
+def decimate(samples, factor, block_size=DECIMATION_BLOCK):
+    """Reduz a taxa de um sinal 1-D com o mesmo filtro polifásico da captura ao vivo, em blocos."""
+    decimator = PolyphaseDecimator(factor)
+    blocks = [decimator.process(samples[i:i + block_size]) for i in range(0, len(samples), block_size)]
+    return np.concatenate(blocks) if blocks else np.empty(0, dtype=np.float32)
+
+
+def analyze_samples(samples, rate, engine="fft", window_size=CHUNK, hop_size=HOP_SIZE,
+                    batch_size=BATCH_SIZE, refinement=REFINEMENT, voicing_gate=True, scale=1.0,
+                    decimation=1, **estimator_options):
+    """Roda o mesmo pipeline de estimativa do NoteRecognizer sobre um sinal inteiro.
+
+    As janelas são views do sinal e só cada lote é convertido para float32 antes de ir ao motor.
+    Janelas que o portão de vozeamento rejeita não passam pelo motor.
+
+    Args:
+        samples (numpy.ndarray): Sinal 1-D.
+        rate (int): Taxa de amostragem em Hz.
+        engine (str): Motor de estimativa ("fft", "yin", "mpm" ou "hps").
+        window_size (int): Número de amostras por janela.
+        hop_size (int): Avanço entre janelas.
+        batch_size (int): Janelas por chamada do motor.
+        refinement (str): Interpolação sub-bin do pico.
+        voicing_gate (bool | VoicingGate): Portão de vozeamento; True usa os limiares padrão.
+        scale (float): Fator que leva as amostras à escala int16 esperada pelo portão.
+        decimation (int): Fator de decimação antes da análise; janela e hop contam na taxa reduzida.
+        **estimator_options: Parâmetros específicos do motor.
+
+    Returns:
+        PitchContour: Tempo do centro de cada janela (s), frequência (Hz, 0.0 sem voz), MIDI, cents,
+        nome da nota e confiança da decisão de vozeamento.
+    """
+    if decimation > 1:
+        samples = decimate(samples, decimation)
+        rate //= decimation
+    estimator = create_estimator(engine, window_size, rate, MIN_FREQ, MAX_FREQ,
+                                 refinement=refinement, **estimator_options)
+    if voicing_gate is True:
+        voicing_gate = VoicingGate()
+    windows = frame_signal(samples, window_size, hop_size)
+    frequencies = np.zeros(len(windows))
+    confidence = np.ones(len(windows))
+    batch = np.empty((min(batch_size, len(windows)), window_size), dtype=np.float32)
+
+    for start in range(0, len(windows), batch_size):
+        chunk = windows[start:start + batch_size]
+        frames = batch[:len(chunk)]
+        np.copyto(frames, chunk, casting="unsafe")
+        if scale != 1.0:
+            frames *= scale
+
+        batch_slice = slice(start, start + len(chunk))
+        if voicing_gate:
+            voiced, confidence[batch_slice] = voicing_gate.evaluate(frames)
+            if voiced.any():
+                frequencies[batch_slice][voiced] = estimator.estimate(frames[voiced])
+        else:
+            frequencies[batch_slice] = estimator.estimate(frames)
+
+    times = (np.arange(len(windows)) * hop_size + window_size / 2) / rate
+    notes = frequencies_to_notes(frequencies)
+    return PitchContour(times, frequencies, notes.midi, notes.cents, note_names(notes.pitch_class), confidence)
+
+
+def analyze_file(path, channel=0, raw=False, rate=None, dtype="<i2", channels=1, **options):
+    """Analisa um arquivo WAV ou PCM cru, mapeado em memória.
+
+    Args:
+        path (str): Caminho do arquivo.
+        channel (int): Canal analisado em arquivos com mais de um canal.
+        raw (bool): Se True, trata o arquivo como PCM cru com `rate`, `dtype` e `channels`.
+        **options: Repassados para `analyze_samples`.
+
+    Returns:
+        tuple: (PitchContour, taxa de amostragem, duração em segundos).
+    """
+    if raw:
+        if rate is None:
+            raise ValueError("Arquivos PCM crus precisam da taxa de amostragem")
+        samples, rate = open_raw(path, rate, dtype, channels)
+    else:
+        samples, rate = open_wav(path)
+
+    signal = samples[:, channel]
+    options.setdefault("scale", _INT16_SCALE.get(signal.dtype.kind + str(signal.dtype.itemsize), 1.0))
+    if signal.dtype == np.uint8:
+        # PCM de 8 bits é sem sinal; centraliza em zero
+        signal = signal.astype(np.int16) - 128
+    return analyze_samples(signal, rate, **options), rate, len(signal) / rate
+
+
+def contour_notes(contour):
+    """Segmenta um contorno em notas com o mesmo NoteSegmenter da gravação contínua.
+
+    Sem a energia das janelas, um novo ataque na mesma altura não separa duas notas; trocas de
+    altura e silêncios sim.
+
+    Returns:
+        list: Tuplas (frequência, nota, duração), como na melodia do MelodyRecorder.
+    """
+    if len(contour.times) < 2:
+        return []
+    hop = int(round((contour.times[1] - contour.times[0]) * _MICROSECONDS))
+    # Com janela 0, a posição de cada janela é o seu centro, em microssegundos
+    segmenter = NoteSegmenter(_MICROSECONDS, hop, 0)
+    centers = np.round(contour.times * _MICROSECONDS).astype(np.int64).tolist()
+    for center, frequency in zip(centers, contour.frequencies.tolist()):
+        segmenter.update(center, frequency, 1.0)
+    segmenter.flush(centers[-1])
+    return [(segment.frequency, segment.note, segment.duration) for segment in segmenter.pop_notes()]
+
+
+def save_contour(contour, path):
+    """Salva o contorno como JSON (colunas) ou `.npy` (array estruturado), conforme a extensão."""
+    if path.endswith(".npy"):
+        records = np.empty(len(contour.times), dtype=CONTOUR_DTYPE)
+        records["time"] = contour.times
+        records["frequency"] = contour.frequencies
+        records["midi"] = contour.midi
+        records["cents"] = contour.cents
+        np.save(path, records)
+        return
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "time": np.round(contour.times, 6).tolist(),
+            "frequency": np.round(contour.frequencies, 3).tolist(),
+            "note": contour.notes.tolist(),
+            "midi": contour.midi.tolist(),
+            "cents": np.round(contour.cents, 2).tolist(),
+        }, f, ensure_ascii=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisa a altura de arquivos WAV/PCM offline.")
+    parser.add_argument("input", help="Arquivo WAV ou PCM cru")
+    parser.add_argument("-o", "--output", help="Arquivo de saída (.json ou .npy)")
+    parser.add_argument("--engine", default="fft", help="Motor de estimativa (fft, yin, mpm, hps)")
+    parser.add_argument("--window", type=int, default=CHUNK, help="Amostras por janela")
+    parser.add_argument("--hop", type=int, default=HOP_SIZE, help="Avanço entre janelas")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Janelas por lote")
+    parser.add_argument("--decimation", type=int, default=1, help="Fator de decimação antes da análise")
+    parser.add_argument("--channel", type=int, default=0, help="Canal analisado")
+    parser.add_argument("--raw", action="store_true", help="Trata a entrada como PCM cru")
+    parser.add_argument("--rate", type=int, help="Taxa de amostragem do PCM cru")
+    parser.add_argument("--dtype", default="<i2", help="Tipo das amostras do PCM cru")
+    parser.add_argument("--channels", type=int, default=1, help="Canais do PCM cru")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    contour, rate, duration = analyze_file(
+        args.input, channel=args.channel, raw=args.raw, rate=args.rate, dtype=args.dtype,
+        channels=args.channels, engine=args.engine, window_size=args.window,
+        hop_size=args.hop, batch_size=args.batch, decimation=args.decimation,
+    )
+    elapsed = time.perf_counter() - start
+
+    output = args.output or os.path.splitext(args.input)[0] + "_pitch.json"
+    save_contour(contour, output)
+    speed = duration / elapsed if elapsed > 0 else float("inf")
+    print(f"{len(contour.times)} janelas de {duration:.1f}s analisadas em {elapsed:.2f}s "
+          f"({speed:.0f}x tempo real) -> {output}")
+
+
+if __name__ == "__main__":
+    main()
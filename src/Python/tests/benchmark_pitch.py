@@ -0,0 +1,195 @@
+# Benchmark reprodutível dos motores de altura sobre um corpus sintético de notas cantadas
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import numpy as np
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(base_dir)
+
+from controller.note_recognizer import RATE, HOP_SIZE, MIN_FREQ, MAX_FREQ, REFINEMENT
+from controller.pitch_estimators import ESTIMATORS, create_estimator
+from services.offline_analysis import analyze_samples, frame_signal
+
+MELODIES_FILE = os.path.join(os.path.dirname(os.path.dirname(base_dir)), "melodies.json")
+
+NOTE_DURATION = 0.6     # Duração de cada nota do corpus (s)
+GAP_DURATION = 0.15     # Silêncio entre notas (s)
+VIBRATO_RATE = 5.5      # Frequência do vibrato (Hz)
+VIBRATO_DEPTH = 30      # Profundidade do vibrato (cents)
+GROSS_ERROR = 50        # Erro a partir do qual a leitura conta como errada (cents)
+LATENCY_READINGS = 200  # Leituras individuais cronometradas por configuração
+
+
+def corpus_frequencies(melodies_file=MELODIES_FILE, grid_size=24):
+    """Frequências do corpus: as de melodies.json mais uma grade logarítmica na faixa de voz."""
+    frequencies = []
+    if os.path.exists(melodies_file):
+        with open(melodies_file, 'r', encoding='utf-8') as f:
+            for melody in json.load(f).values():
+                frequencies.extend(note[0] for note in melody)
+    frequencies.extend(np.geomspace(MIN_FREQ * 1.1, MAX_FREQ * 0.9, grid_size))
+    return np.array(frequencies)
+
+
+def generate_corpus(frequencies, rate=RATE, snr_db=(30, 20, 10), seed=0):
+    """Gera notas cantadas sintéticas com harmônicos, vibrato, ruído e silêncio entre elas.
+
+    Cada frequência é sintetizada uma vez por nível de ruído, com timbre (decaimento dos
+    harmônicos) e fase de vibrato sorteados.
+
+    Args:
+        frequencies (numpy.ndarray): Frequências centrais das notas em Hz.
+        rate (int): Taxa de amostragem em Hz.
+        snr_db (tuple): Relações sinal-ruído, em dB, usadas para cada nota.
+        seed (int): Semente do gerador aleatório.
+
+    Returns:
+        tuple: (sinal int16, frequência verdadeira por amostra com 0 no silêncio).
+    """
+    rng = np.random.default_rng(seed)
+    note_len = int(NOTE_DURATION * rate)
+    gap_len = int(GAP_DURATION * rate)
+    t = np.arange(note_len) / rate
+
+    # Envelope com ataque e relaxamento curtos, como uma nota cantada
+    envelope = np.minimum(1.0, np.minimum(t, t[::-1]) / 0.03)
+
+    signals, truths = [], []
+    for snr in snr_db:
+        for f0 in frequencies:
+            vibrato = VIBRATO_DEPTH / 1200 * np.sin(2 * np.pi * VIBRATO_RATE * t + rng.uniform(0, 2 * np.pi))
+            inst_freq = f0 * 2 ** vibrato
+            phase = 2 * np.pi * np.cumsum(inst_freq) / rate
+
+            decay = rng.uniform(0.4, 0.9)
+            harmonics = np.arange(1, 9)
+            amplitudes = decay ** (harmonics - 1)
+            amplitudes[harmonics * f0 > rate / 2] = 0
+            note = np.sin(phase[:, np.newaxis] * harmonics + rng.uniform(0, 2 * np.pi, 8)) @ amplitudes
+            note *= envelope
+
+            power = np.mean(note ** 2)
+            note += rng.normal(0, np.sqrt(power / 10 ** (snr / 10)), note_len)
+
+            signals.extend([note, rng.normal(0, 0.002, gap_len)])
+            truths.extend([inst_freq, np.zeros(gap_len)])
+
+    signal = np.concatenate(signals)
+    signal = (signal / np.abs(signal).max() * 20000).astype(np.int16)
+    return signal, np.concatenate(truths)
+
+
+def window_truth(truth, window_size, hop_size):
+    """Frequência verdadeira no centro de cada janela, ou 0 se a janela tocar silêncio."""
+    windows = frame_signal(truth, window_size, hop_size)
+    center = windows[:, window_size // 2]
+    fully_voiced = windows.min(axis=1) > 0
+    return np.where(fully_voiced, center, 0.0), windows.max(axis=1) == 0
+
+
+def accuracy(estimates, truth, silent):
+    """Métricas de acerto em cents contra a frequência verdadeira."""
+    voiced = truth > 0
+    detected = voiced & (estimates > 0)
+    errors = np.abs(1200 * np.log2(estimates[detected] / truth[detected]))
+    return {
+        "median_cents": float(np.median(errors)) if len(errors) else None,
+        "p95_cents": float(np.percentile(errors, 95)) if len(errors) else None,
+        "gross_error_rate": float(np.mean(errors > GROSS_ERROR)) if len(errors) else None,
+        "detection_rate": float(detected.sum() / max(voiced.sum(), 1)),
+        "false_positive_rate": float(np.mean(estimates[silent] > 0)) if silent.any() else 0.0,
+    }
+
+
+def benchmark(signal, truth, engine, window_size, hop_size, rate=RATE, refinement=REFINEMENT):
+    """Mede latência, vazão, memória e acerto de uma configuração de motor.
+
+    Returns:
+        dict: Resultado da configuração, pronto para serializar em JSON.
+    """
+    # Vazão e memória do caminho em lote (o mesmo da análise offline)
+    tracemalloc.start()
+    start = time.perf_counter()
+    contour = analyze_samples(signal, rate, engine=engine, window_size=window_size,
+                              hop_size=hop_size, refinement=refinement)
+    elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Latência por leitura: uma janela por chamada, como no laço do jogo
+    estimator = create_estimator(engine, window_size, rate, MIN_FREQ, MAX_FREQ, refinement=refinement)
+    frames = frame_signal(signal, window_size, hop_size)
+    picks = np.linspace(0, len(frames) - 1, min(LATENCY_READINGS, len(frames))).astype(int)
+    frame = np.empty((1, window_size), dtype=np.float32)
+    latencies = []
+    for i in picks:
+        frame[0] = frames[i]
+        start = time.perf_counter()
+        estimator.estimate(frame)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1e3
+
+    expected, silent = window_truth(truth, window_size, hop_size)
+    result = {
+        "engine": engine,
+        "window_size": window_size,
+        "hop_size": hop_size,
+        "window_ms": 1e3 * window_size / rate,
+        "frames": len(contour.times),
+        "throughput_fps": len(contour.times) / elapsed,
+        "realtime_factor": len(signal) / rate / elapsed,
+        "latency_ms_median": float(np.median(latencies)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+        "peak_memory_mb": peak_memory / 2 ** 20,
+    }
+    result.update(accuracy(contour.frequencies, expected, silent))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de altura com corpus sintético.")
+    parser.add_argument("--engines", nargs="+", default=list(ESTIMATORS), help="Motores avaliados")
+    parser.add_argument("--windows", nargs="+", type=int, default=[1024, 2048], help="Tamanhos de janela")
+    parser.add_argument("--hop", type=int, default=HOP_SIZE, help="Avanço entre janelas")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do corpus")
+    parser.add_argument("-o", "--output", default="benchmark_report.json", help="Relatório JSON")
+    args = parser.parse_args(argv)
+
+    signal, truth = generate_corpus(corpus_frequencies(), seed=args.seed)
+    print(f"Corpus: {len(signal) / RATE:.1f}s de áudio sintético")
+
+    results = []
+    for window_size in args.windows:
+        for engine in args.engines:
+            try:
+                result = benchmark(signal, truth, engine, window_size, args.hop)
+            except ValueError as e:
+                print(f"{engine:>4} janela {window_size:>5}: ignorado ({e})")
+                continue
+            results.append(result)
+            print(f"{engine:>4} janela {window_size:>5}: "
+                  f"{result['latency_ms_median']:6.2f} ms/leitura, "
+                  f"{result['throughput_fps']:8.0f} janelas/s, "
+                  f"{result['peak_memory_mb']:6.1f} MB, "
+                  f"mediana {result['median_cents']:6.2f} cents, "
+                  f"erros grosseiros {100 * result['gross_error_rate']:5.1f}%")
+
+    report = {
+        "rate": RATE,
+        "seed": args.seed,
+        "corpus_seconds": len(signal) / RATE,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "numpy": np.__version__,
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"Relatório salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
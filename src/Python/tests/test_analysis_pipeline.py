@@ -0,0 +1,33 @@
+import time
+import pytest
+from controller.audio_source import SyntheticSource
+from controller.note_recognizer import NoteRecognizer
+from controller.analysis_pipeline import AnalysisPipeline
+
+
+@pytest.fixture
+def pipeline():
+    recognizer = NoteRecognizer(streaming=True, source=SyntheticSource(440.0))
+    pipeline = AnalysisPipeline(recognizer, maxsize=4)
+    pipeline.start()
+    yield pipeline
+    pipeline.stop()
+    recognizer.close()
+
+
+def test_latest_only_consumers_drop_nothing(pipeline):
+    time.sleep(0.5)
+    stats = pipeline.stats()
+    assert stats["produced"] > 4
+    assert stats["dropped"] == 0
+    assert pipeline.latest().voiced
+    with pytest.raises(ValueError):
+        pipeline.drain()
+
+
+def test_drain_mode_queues_and_counts_drops(pipeline):
+    pipeline.enable_drain()
+    time.sleep(0.5)
+    readings = pipeline.drain()
+    assert 0 < len(readings) <= 4
+    assert pipeline.stats()["dropped"] > 0
@@ -0,0 +1,23 @@
+import time
+import pytest
+
+pytest.importorskip("sounddevice")
+
+from controller.audio_source import SyntheticSource
+from controller.note_recognizer import NoteRecognizer
+from controller.audio_recorder import MelodyRecorder
+
+
+def test_audio_before_record_press_is_not_segmented():
+    # Lá por 0,5 s e depois silêncio; a gravação só começa no silêncio
+    source = SyntheticSource([(440.0, 0.5), (0.0, 60.0)])
+    recognizer = NoteRecognizer(streaming=True, source=source)
+    try:
+        recorder = MelodyRecorder(recognizer)
+        time.sleep(0.7)
+        recorder.start_continuous()
+        time.sleep(0.4)
+        recorder.stop_continuous()
+        assert recorder.melody == []
+    finally:
+        recognizer.close()
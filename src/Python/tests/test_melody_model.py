@@ -0,0 +1,12 @@
+from controller.melody_model import Note
+
+
+def test_fan_height_from_recorded_name():
+    assert Note(440.0, "lá", 0.5).fan_height == 8
+    assert Note(466.16, "lá#", 0.5).fan_height == 8
+
+
+def test_fan_height_falls_back_to_frequency():
+    assert Note(261.63).fan_height == 3          # Sem nome: dó pela frequência
+    assert Note(329.63, "E4").fan_height == 5    # Nome fora do padrão: mi pela frequência
+    assert Note(0.0).fan_height is None          # Sem frequência não há altura
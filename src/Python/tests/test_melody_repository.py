@@ -0,0 +1,18 @@
+import json
+from controller.melody_repository import MelodyRepository
+
+
+def test_deleting_every_melody_does_not_reimport_json(tmp_path):
+    json_path = tmp_path / "melodies.json"
+    json_path.write_text(json.dumps({"A": [[440.0, "lá", 0.5]], "B": [[494.0, "si", 0.5]]}),
+                         encoding="utf-8")
+    database = str(tmp_path / "melodies.db")
+
+    with MelodyRepository(database, json_path=str(json_path)) as repository:
+        assert [name for _, name, _ in repository.list()] == ["A", "B"]
+        for melody_id, _, _ in repository.list():
+            repository.delete(melody_id)
+        assert len(repository) == 0
+
+    with MelodyRepository(database, json_path=str(json_path)) as repository:
+        assert repository.list() == []
@@ -0,0 +1,45 @@
+from controller.melody_repository import MelodyRepository
+from controller.melody_catalog import MelodyCatalog
+from controller.melody_search import MelodyIndex, CANDIDATES, melody_features
+
+
+def _notes(semitones, duration=0.5):
+    return [(220.0 * 2 ** (s / 12), None, duration) for s in semitones]
+
+
+def test_common_ngram_does_not_outrank_rare_exact_match():
+    index = MelodyIndex()
+    # Muitas melodias de notas repetidas: o n-grama (0, 0, 0) aparece em todas, em várias posições
+    for melody_id in range(1, 61):
+        index.add(melody_id, _notes([melody_id % 5] * 40))
+    # Só a melodia-alvo tem o salto de quarta seguido de notas repetidas
+    target = 100
+    index.add(target, _notes([0, 5, 5, 5, 5, 5, 5, 5, 5, 5]))
+
+    # Com votos iguais, as diagonais das notas repetidas somariam mais que a do salto raro
+    query = _notes([3, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8])  # Transposto 3 semitons
+    results = index.search(query, limit=3)
+    assert results[0].melody_id == target
+
+
+def test_common_ngram_is_skipped_for_repeated_notes():
+    index = MelodyIndex()
+    for melody_id in range(1, 2001):
+        index.add(melody_id, _notes([0] * 20 + [melody_id % 7, melody_id % 11]))
+    # (0, 0, 0) aparece em todas as melodias: não vota, e a busca não percorre as suas ocorrências
+    intervals, _ = melody_features(_notes([0] * 10))
+    assert index._candidates(intervals) == {}
+
+    # Com um n-grama raro no fim, só entram as melodias que o têm, até CANDIDATES
+    intervals, _ = melody_features(_notes([0] * 10 + [3, 7]))
+    candidates = index._candidates(intervals)
+    assert 0 < len(candidates) <= CANDIDATES
+    assert all(melody_id % 7 == 3 and melody_id % 11 == 7 for melody_id in candidates)
+
+
+def test_prepare_builds_index_in_background():
+    repository = MelodyRepository(":memory:")
+    repository.add_many((f"melodia {i}", _notes([0, i % 7, 2, i % 5, 4])) for i in range(100))
+    index = MelodyIndex(MelodyCatalog(repository))
+    index.prepare().join(timeout=5)
+    assert len(index) == 100
@@ -0,0 +1,37 @@
+import pytest
+from controller.melody_repository import MelodyRepository
+from services.midi_import import MidiFormatError, import_midi, read_midi_melody
+
+
+def _midi_file(path, division):
+    """Escreve um MIDI formato 0 com três notas (dó, mi, sol) e a divisão de tempo dada."""
+    events = b""
+    for pitch in (60, 64, 67):
+        events += b"\x00\x90" + bytes([pitch]) + b"\x40" + b"\x60\x80" + bytes([pitch]) + b"\x00"
+    events += b"\x00\xff\x2f\x00"
+    header = b"MThd" + (6).to_bytes(4, "big") + (0).to_bytes(2, "big") + (1).to_bytes(2, "big") \
+        + division.to_bytes(2, "big")
+    path.write_bytes(header + b"MTrk" + len(events).to_bytes(4, "big") + events)
+    return str(path)
+
+
+def test_reads_smpte_division(tmp_path):
+    # 25 quadros por segundo (0xE7 = -25) e 40 ticks por quadro: 96 ticks = 0,096 s
+    notes = read_midi_melody(_midi_file(tmp_path / "smpte.mid", 0xE728))
+    assert [name for _, name, _ in notes] == ["dó", "mi", "sol"]
+    assert notes[0][2] == pytest.approx(0.096)
+
+
+@pytest.mark.parametrize("division", [0x8000, 0xE700, 0x0000])
+def test_invalid_division_is_a_format_error(tmp_path, division):
+    with pytest.raises(MidiFormatError):
+        read_midi_melody(_midi_file(tmp_path / "bad.mid", division))
+
+
+def test_bad_division_does_not_abort_bulk_import(tmp_path):
+    _midi_file(tmp_path / "a_bad.mid", 0xE700)
+    _midi_file(tmp_path / "b_good.mid", 96)
+    with MelodyRepository(":memory:") as repository:
+        results = import_midi([str(tmp_path)], repository)
+        assert [result.error is None for result in results] == [False, True]
+        assert len(repository) == 1
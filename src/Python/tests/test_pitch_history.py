@@ -0,0 +1,33 @@
+import threading
+import numpy as np
+from controller.pitch_history import PitchHistory
+
+RATE = 128  # Leituras por segundo simuladas (potência de 2: tempos exatos em ponto flutuante)
+
+
+def test_stats_are_consistent_while_another_thread_appends():
+    history = PitchHistory(capacity=64)
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            # Lotes como os da thread de análise; a frequência codifica a posição da leitura
+            history.extend(np.arange(i, i + 8) / RATE, 100.0 + np.arange(i, i + 8))
+            i += 8
+
+    thread = threading.Thread(target=writer, daemon=True)
+    history.extend(np.arange(64) / RATE, 100.0 + np.arange(64))
+    thread.start()
+    try:
+        for _ in range(2000):
+            stats = history.stats(0.25)
+            # Janela de 0,25 s a 128 leituras/s: 33 leituras consecutivas, sem lacunas nem mistura
+            assert stats.count == 33
+            with history.lock:
+                times, freqs = history.window(0.25)
+                assert np.all(np.diff(freqs) == 1.0)
+                assert np.allclose(np.diff(times), 1 / RATE)
+    finally:
+        stop.set()
+        thread.join()
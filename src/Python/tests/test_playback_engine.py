@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sounddevice")
+
+from controller import playback_engine
+from controller.playback_engine import PlaybackEngine, FADE_SAMPLES, STOPPED, PAUSED
+from controller.synthesizer import MelodyRender
+
+BLOCK = 256
+
+
+class _FakeStream:
+    """Dispositivo de saída que não toca nada; o teste chama o callback do motor diretamente."""
+
+    def __init__(self, **options):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(playback_engine.sd, "OutputStream", _FakeStream)
+    engine = PlaybackEngine(block_size=BLOCK)
+    yield engine
+    engine.close()
+
+
+def _pull(engine):
+    out = np.zeros((BLOCK, 1), dtype=np.float32)
+    engine._callback(out, BLOCK, None, None)
+    return out[:, 0]
+
+
+def test_pause_and_resume_play_every_sample_once(engine, monkeypatch):
+    length = 10 * BLOCK + 37
+    # Amostras constantes: cada amostra tocada da melodia sai como 1.0, fora a rampa da pausa
+    monkeypatch.setattr(engine.synthesizer, "render_melody",
+                        lambda notes: MelodyRender(np.ones(length, dtype=np.float32), [0], engine.rate))
+    engine.play([(440.0, "lá", 1.0)])
+
+    played = sum(np.count_nonzero(_pull(engine)) for _ in range(3))
+    engine.pause()
+    assert engine.state == PAUSED
+    fade = _pull(engine)
+    assert np.count_nonzero(fade[FADE_SAMPLES:]) == 0
+    played += FADE_SAMPLES
+    assert np.count_nonzero(_pull(engine)) == 0
+
+    engine.resume()
+    while engine.state != STOPPED:
+        played += np.count_nonzero(_pull(engine))
+    assert played == length
@@ -1,18 +1,23 @@
-import json
 import time
 import customtkinter as ctk
 import controller.frequency_state
 from controller.note_recognizer import NoteRecognizer
 from controller.audio_recorder import MelodyRecorder
-from controller.frequency_state import set_current_frequency
+from controller.melody_repository import default_repository
+from controller.melody_catalog import catalog_for
+from controller.melody_model import DIFFICULTY_TOLERANCE
+from controller.analysis_pipeline import AnalysisPipeline
+from controller.pitch_smoothing import difficulty_smoothing
+from controller.frequency_state import set_current_frequency, set_pitch_history
 
 class GameInterface:
-    def __init__(self, selected_melody, difficulty, melodies_file):
+    def __init__(self, selected_melody, difficulty, repository=None, pipeline=None, channel=0):
         self.selected_melody = selected_melody
         self.difficulty = difficulty
-        self.melodies_file = melodies_file
+        self.repository = repository if repository is not None else default_repository()
         self.current_note_index = 0
         self.melody_data = None
+        self.current_note = None
         
         # Definir as cores antes de setup_window
         self.colors = {
@@ -23,9 +28,18 @@ class GameInterface:
             "background": "#1a1a1a"
         }
         
-        # Inicializa o reconhecedor de notas e o gravador
-        self.note_recognizer = NoteRecognizer()
-        self.melody_recorder = MelodyRecorder(self.note_recognizer)
+        # Inicializa o reconhecedor de notas e o gravador. Sessões que dividem uma captura
+        # multicanal (modo versus) recebem o pipeline compartilhado e o canal do jogador
+        self.owns_pipeline = pipeline is None
+        if pipeline is None:
+            pipeline = AnalysisPipeline(NoteRecognizer(streaming=True))
+        self.channel = channel
+        self.note_recognizer = pipeline.recognizer
+        self.melody_recorder = MelodyRecorder(self.note_recognizer, pipeline, self.repository)
+        set_pitch_history(self.note_recognizer.histories[channel])
+        # A análise roda em uma thread própria; a interface só lê a última leitura publicada
+        self.pipeline = pipeline
+        self.pipeline.start()
         
         self.load_melody()
         self.setup_window()
@@ -36,24 +50,28 @@ class GameInterface:
 
         # Ajustar tolerância e tempo baseado na dificuldade
         if difficulty == 1:
-            self.frequency_tolerance = 130
+            self.frequency_tolerance = DIFFICULTY_TOLERANCE[1]
             self.time_required = 0.8
         elif difficulty == 2:
-            self.frequency_tolerance = 80
+            self.frequency_tolerance = DIFFICULTY_TOLERANCE[2]
             self.time_required = 1.0
         else: 
-            self.frequency_tolerance = 60
+            self.frequency_tolerance = DIFFICULTY_TOLERANCE[3]
             self.time_required = 1.2
+        # Faixa aceita da nota atual, já calculada na carga da melodia
+        self.target_band = self.current_note.band(difficulty)
+        self.note_recognizer.set_smoothing(difficulty_smoothing(difficulty), self.channel)
 
         # Adicione isso junto com os outros labels na inicialização da interface
         self.note_label = ctk.CTkLabel(self.window, text="♪", font=("Arial", 24))
         self.note_label.pack(pady=10)
 
     def load_melody(self):
-        with open(self.melodies_file, 'r', encoding='utf-8') as f:
-            melodies = json.load(f)
-            self.melody_name = list(melodies.keys())[self.selected_melody]
-            self.melody_data = melodies[self.melody_name]
+        # selected_melody é a posição na lista de melodias, da mais antiga para a mais nova
+        melody = catalog_for(self.repository).at(self.selected_melody)
+        self.melody_name = melody.name
+        self.melody_data = melody
+        self.current_note = melody[0]
 
     def setup_window(self):
         self.window = ctk.CTk()
@@ -208,9 +226,9 @@ class GameInterface:
 
         # Após criar todos os widgets, adicione:
         # Inicializa a primeira nota e frequência
-        first_note = self.melody_data[0]
+        first_note = self.current_note
         self.expected_freq_label.configure(
-            text=f"♪ {first_note[1]} | Frequência esperada: {first_note[0]:.2f} Hz"
+            text=f"♪ {first_note.name} | Frequência esperada: {first_note.frequency:.2f} Hz"
         )
 
     def start_recording(self):
@@ -230,18 +248,18 @@ class GameInterface:
 
     def update_frequency(self):
         if self.is_recording:
-            frequency, note = self.melody_recorder.recognizer.get_note_from_frequency()
+            frequency = self.pipeline.latest(self.channel).frequency
             # Atualizar o estado da frequência atual
             set_current_frequency(frequency)
             self.current_freq_label.configure(text=f"Sua frequência: {frequency:.2f} Hz")
 
-            current_note = self.melody_data[self.current_note_index]
-            expected_freq = current_note[0]
+            expected_freq = self.current_note.frequency
+            low, high = self.target_band
 
             # Atualizar a barra de frequência
             self.update_frequency_bar(frequency, expected_freq)
             
-            if abs(frequency - expected_freq) <= self.frequency_tolerance:
+            if low <= frequency <= high:
                 if not self.is_note_correct:
                     self.is_note_correct = True
                     self.correct_note_time = time.time()
@@ -269,7 +287,7 @@ class GameInterface:
                     text=f"Tente chegar mais perto da frequência esperada (±{self.frequency_tolerance}Hz)"
                 )
             
-            self.window.after(100, self.update_frequency)
+            self.window.after(20, self.update_frequency)
 
     def update_frequency_bar(self, current_freq, target_freq):
         # Limpar o canvas
@@ -386,7 +404,6 @@ class GameInterface:
 
     def process_recording(self):
         if self.is_note_correct:
-            current_note = self.melody_data[self.current_note_index]
             self.status_label.configure(
                 fg_color=self.colors["success"],
                 text_color="white",
@@ -398,10 +415,11 @@ class GameInterface:
                 self.finish_game()
             else:
                 # Prepara para a próxima nota
-                next_note = self.melody_data[self.current_note_index]
-                self.note_label.configure(text=f"♪ {next_note[1]}")
+                next_note = self.current_note = self.melody_data[self.current_note_index]
+                self.target_band = next_note.band(self.difficulty)
+                self.note_label.configure(text=f"♪ {next_note.name}")
                 self.expected_freq_label.configure(
-                    text=f"♪ {next_note[1]} | Frequência esperada: {next_note[0]:.2f} Hz"
+                    text=f"♪ {next_note.name} | Frequência esperada: {next_note.frequency:.2f} Hz"
                 )
                 self.current_freq_label.configure(text="Sua frequência: -")
                 
@@ -409,6 +427,8 @@ class GameInterface:
                 self.record_button.configure(text="Próxima Nota")
 
     def finish_game(self):
+        if self.owns_pipeline:
+            self.pipeline.stop()
         self.status_label.configure(text="Jogo concluído!")
         self.record_button.configure(state="disabled")
         self.note_label.configure(text="Fim do jogo!")
@@ -2,15 +2,20 @@ import customtkinter as ctk
 from tkinter import messagebox
 from controller.audio_recorder import MelodyRecorder, MelodyPlayer
 from controller.note_recognizer import NoteRecognizer
+from controller.melody_catalog import catalog_for
+from controller.playback_engine import STOPPED
+import os
+import time
 import threading
-import json
 
+NOTE_POLL_MS = 50  # Intervalo de consulta das notas segmentadas durante a gravação
+RECORDINGS_DIR = "recordings"  # Áudio bruto das gravações (se a opção estiver marcada), para reanálise offline
 
 class AudioApp(ctk.CTk):
     def __init__(self):
         super().__init__()
         self.title("Gravador de Melodias")
-        self.geometry("600x450")
+        self.geometry("600x480")
         
         # Configuração do tema
         ctk.set_appearance_mode("dark")  # Tema escuro
@@ -20,7 +25,7 @@ class AudioApp(ctk.CTk):
         self._after_ids = []
 
         # Inicializa componentes
-        self.recognizer = NoteRecognizer()
+        self.recognizer = NoteRecognizer(streaming=True)
         self.recorder = MelodyRecorder(self.recognizer)
         self.player = MelodyPlayer()
         
@@ -53,6 +58,17 @@ class AudioApp(ctk.CTk):
             text_color="#ffffff"
         )
         self.record_button.pack(pady=15, padx=10)
+
+        # Opção de guardar o áudio bruto de cada gravação em RECORDINGS_DIR
+        self.save_wav_var = ctk.BooleanVar(value=False)
+        self.save_wav_checkbox = ctk.CTkCheckBox(
+            self.main_buttons_frame,
+            text="Salvar áudio bruto (WAV) para reanálise",
+            font=("Arial", 12),
+            variable=self.save_wav_var,
+            text_color="#ffffff"
+        )
+        self.save_wav_checkbox.pack(pady=(0, 5), padx=10)
         
         # Label para mostrar a nota
         self.note_label = ctk.CTkLabel(
@@ -169,7 +185,8 @@ class AudioApp(ctk.CTk):
                 except Exception as e:
                     print(f"Erro ao fechar recognizer: {e}")
             
-            # Encerra threads relacionadas à interface
+            # Interrompe a reprodução e encerra threads relacionadas à interface
+            self.player.stop_melody()
             self._stop_threads()
 
             # Remove todos os widgets filhos primeiro
@@ -199,50 +216,89 @@ class AudioApp(ctk.CTk):
                     pass
 
     def handle_recording(self):
-        """Gerencia o início e fim da gravação."""
-        frequency, note, duration, is_starting = self.recorder.start_stop_recording()
-        
-        if is_starting:
-            # Começou a gravar
+        """Gerencia o início e fim da gravação contínua; as notas são separadas automaticamente."""
+        if not self.recorder.is_recording:
+            # Começou a gravar (sem a reprodução vazando para o microfone)
+            self.player.stop_melody()
+            wav_path = None
+            if self.save_wav_var.get():
+                wav_path = os.path.join(RECORDINGS_DIR, time.strftime("gravacao_%Y%m%d_%H%M%S.wav"))
+            self.recorder.start_continuous(wav_path)
             self.record_button.configure(text="⏹ Parar Gravação", fg_color="#cc0000", hover_color="#990000")
-            self.note_label.configure(text="🎤 Gravando...")
+            self.note_label.configure(text="🎤 Gravando... cante as notas da melodia")
             self.play_button.configure(state="disabled")
             self.save_button.configure(state="disabled")
             self.new_recording_button.configure(state="disabled")
+            self._after_ids.append(self.after(NOTE_POLL_MS, self.poll_notes))
         else:
             # Parou de gravar
+            self.recorder.stop_continuous()
             self.record_button.configure(text="🎤 Iniciar Gravação", fg_color="#00cc66", hover_color="#00994d")
+            melody = self.recorder.melody
+            if melody:
+                frequency, note, duration = melody[-1]
+                text = f"{len(melody)} nota(s) gravada(s) - última: {note} ({frequency:.2f} Hz, {duration:.2f}s)"
+            else:
+                text = "Nenhuma nota detectada"
+            self.note_label.configure(text=text)
+            self.play_button.configure(state="normal")
+            self.save_button.configure(state="normal")
+
+    def poll_notes(self):
+        """Mostra as notas detectadas desde a última consulta, sem bloquear a interface."""
+        if not self.recorder.is_recording:
+            return
+        self.show_notes(self.recorder.poll_notes())
+        self._after_ids.append(self.after(NOTE_POLL_MS, self.poll_notes))
+
+    def show_notes(self, notes):
+        """Exibe a última nota de `notes`, se houver."""
+        if notes:
+            frequency, note, duration = notes[-1]
             self.note_label.configure(
                 text=f"Frequência: {frequency:.2f} Hz - Nota: {note} - Duração: {duration:.2f}s"
             )
-            self.play_button.configure(state="normal")
-            self.save_button.configure(state="normal")
 
     def start_playing_thread(self):
-        """Inicia uma nova thread para reproduzir a melodia sem travar a interface."""
-        threading.Thread(target=self.play_melody, daemon=True).start()
+        """Inicia a reprodução no motor de áudio (ou a interrompe, se já estiver tocando)."""
+        if self.player.engine.state != STOPPED:
+            self.player.stop_melody()
+            return
+        self.play_melody()
 
     def play_melody(self):
-        """Reproduz a sequência de notas gravadas."""
-        try:
-            with open("melodies.json", 'r', encoding='utf-8') as file:
-                melodies = json.load(file)
-            last_melody_id = f"melodia {len(melodies)}"
-            self.player.play_melody(last_melody_id)
-        except FileNotFoundError:
-            messagebox.showerror("Erro", "Arquivo de melodias não encontrado.")
-        except KeyError:
+        """Começa a reproduzir a melodia salva mais recentemente, sem travar a interface."""
+        melody = catalog_for().get(self.recorder.melody_id) or catalog_for().last()
+        if melody is None:
             messagebox.showerror("Erro", "Nenhuma melodia encontrada para reprodução.")
+            return
+        if self.player.play_melody(melody.id) is not None:
+            self.play_button.configure(text="⏹ Parar")
+            self._after_ids.append(self.after(NOTE_POLL_MS, self.poll_playback))
+
+    def poll_playback(self):
+        """Destaca a nota em reprodução e restaura o botão quando a melodia termina."""
+        position = self.player.engine.position()
+        if position.state == STOPPED:
+            self.play_button.configure(text="▶ Reproduzir")
+            return
+        if position.note is not None:
+            note = position.melody[position.note]
+            self.note_label.configure(
+                text=f"▶ Nota {position.note + 1}/{len(position.melody)}: {note.name} ({note.frequency:.2f} Hz)"
+            )
+        self._after_ids.append(self.after(NOTE_POLL_MS, self.poll_playback))
 
     def save_melody(self):
-        """Salva a sequência de notas em um arquivo e exibe uma mensagem de confirmação."""
-        filename = self.recorder.save_melody_to_file()
-        messagebox.showinfo("Melodia Salva", f"Melodia salva em {filename}")
+        """Salva a sequência de notas no repositório e exibe uma mensagem de confirmação."""
+        melody_id = self.recorder.save_melody()
+        messagebox.showinfo("Melodia Salva", f"Melodia salva como melodia {melody_id}")
         self.new_recording_button.configure(state="normal")
         self.record_button.configure(state="disabled")
 
     def clear_melody(self):
         """Limpa a sequência de notas gravadas e atualiza a interface."""
+        self.player.stop_melody()
         self.recorder.clear_melody()
         self.note_label.configure(text="Frequência e Nota Capturada:")
         self.play_button.configure(state="disabled")
@@ -251,25 +307,8 @@ class AudioApp(ctk.CTk):
 
     def start_new_recording(self):
         """Prepara a interface para iniciar uma nova gravação, sem apagar melodias anteriores."""
-        try:
-            # Lê o arquivo existente
-            with open("melodies.json", 'r', encoding='utf-8') as file:
-                melodies = json.load(file)
-        except FileNotFoundError:
-            # Se o arquivo não existir, cria um dicionário vazio
-            melodies = {}
-        
-        # Define o próximo ID da melodia
-        next_melody_number = len(melodies) + 1
-        next_melody_id = f"melodia {next_melody_number}"
-        
-        # Adiciona apenas a nova entrada no JSON, mantendo as existentes
-        with open("melodies.json", 'w', encoding='utf-8') as file:
-            melodies[next_melody_id] = []  # Inicializa a nova melodia como uma lista vazia
-            json.dump(melodies, file, ensure_ascii=False, indent=4)
-
         # Prepara a interface para a nova gravação
-        self.recorder.clear_melody()  # Limpa apenas a gravação atual em memória
+        self.recorder.clear_melody(delete_saved=False)  # Limpa apenas a gravação atual em memória
         self.note_label.configure(text="Frequência e Nota Capturada:")
         self.play_button.configure(state="disabled")
         self.save_button.configure(state="disabled")
@@ -278,4 +317,4 @@ class AudioApp(ctk.CTk):
         self.record_button.configure(
             text="🎤 Iniciar Gravação", fg_color="#00cc66", hover_color="#00994d"
         )
-        messagebox.showinfo("Nova Gravação", f"Pronto para gravar {next_melody_id}.")
+        messagebox.showinfo("Nova Gravação", "Pronto para gravar uma nova melodia.")
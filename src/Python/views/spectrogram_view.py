@@ -0,0 +1,130 @@
+import os
+import sys
+import argparse
+import numpy as np
+import matplotlib.pyplot as plt
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(base_dir)
+
+from controller.note_recognizer import NoteRecognizer, HOP_SIZE
+from controller.audio_source import create_source, SOURCES
+from controller.analysis_pipeline import AnalysisPipeline
+from controller.spectrogram_feed import SpectrogramFeed, FLOOR_DB, CEILING_DB
+from controller.note_mapping import frequency_to_note
+
+REFRESH_MS = 40  # Intervalo entre quadros da visualização (~25 fps)
+
+
+class SpectrogramView:
+    """Janela de diagnóstico com o espectrograma e a frequência detectada em tempo real.
+
+    Os artistas do matplotlib são criados uma única vez; a cada quadro só os dados da imagem,
+    da curva de frequência e do texto mudam, e apenas eles são redesenhados sobre o fundo
+    guardado (blitting). Os dados vêm do SpectrogramFeed, preenchido pela thread de análise,
+    então a janela não refaz nenhuma FFT nem atrasa a detecção.
+    """
+
+    def __init__(self, pipeline, feed, refresh_ms=REFRESH_MS):
+        """Cria a figura e os artistas persistentes.
+
+        Args:
+            pipeline (AnalysisPipeline): Pipeline em execução (usado para os contadores).
+            feed (SpectrogramFeed): Espectrograma rolante alimentado pelo pipeline.
+            refresh_ms (int): Intervalo entre quadros em milissegundos.
+        """
+        self.pipeline = pipeline
+        self.feed = feed
+        self._image, self._pitch = feed.snapshot()
+        times = np.linspace(-feed.seconds, 0, feed.columns)
+        freqs = feed.band_freqs
+
+        self.figure, self.axes = plt.subplots(figsize=(12, 6))
+        self.figure.canvas.manager.set_window_title("Diagnóstico de Altura")
+        self.image = self.axes.imshow(
+            self._image, origin="lower", aspect="auto", cmap="magma", animated=True,
+            extent=(times[0], times[-1], freqs[0], freqs[-1]), vmin=FLOOR_DB, vmax=CEILING_DB,
+        )
+        (self.trace,) = self.axes.plot(times, self._pitch, color="cyan", linewidth=1.5, animated=True)
+        self.status = self.axes.text(0.01, 0.97, "", transform=self.axes.transAxes, va="top",
+                                     color="white", family="monospace", animated=True)
+        self.axes.set_xlabel("Tempo [s]")
+        self.axes.set_ylabel("Frequência [Hz]")
+        self.axes.set_title("Espectrograma e Frequência Detectada")
+        self.figure.colorbar(self.image, ax=self.axes, label="Magnitude [dB]")
+
+        self._background = None
+        self.figure.canvas.mpl_connect("draw_event", self._on_draw)
+        self.timer = self.figure.canvas.new_timer(interval=refresh_ms)
+        self.timer.add_callback(self.refresh)
+
+    def _on_draw(self, event):
+        """Guarda o fundo estático (eixos, rótulos, barra de cores) a cada redesenho completo."""
+        self._background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in (self.image, self.trace, self.status):
+            self.axes.draw_artist(artist)
+
+    def refresh(self):
+        """Atualiza os artistas com os dados mais recentes e redesenha só eles."""
+        if self._background is None:
+            return
+        self.feed.snapshot(self._image, self._pitch)
+        self.image.set_data(self._image)
+        self.trace.set_ydata(self._pitch)
+
+        reading = self.pipeline.latest()
+        note = frequency_to_note(reading.frequency)
+        label = f"{note.name}{note.octave} {note.cents:+5.1f} cents" if note else "-"
+        stats = self.pipeline.stats()
+        self.status.set_text(
+            f"{reading.frequency:7.2f} Hz  {label}\n"
+            f"janelas {stats['produced']}  atrasadas {stats['late']}  puladas {stats['skipped']}"
+        )
+
+        canvas = self.figure.canvas
+        canvas.restore_region(self._background)
+        self._draw_artists()
+        canvas.blit(self.axes.bbox)
+        canvas.flush_events()
+
+    def show(self):
+        """Inicia a atualização periódica e abre a janela (bloqueia até ela ser fechada)."""
+        self.timer.start()
+        plt.show()
+        self.timer.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Espectrograma ao vivo do detector de altura.")
+    parser.add_argument("--source", default="pyaudio", choices=list(SOURCES), help="Fonte de áudio")
+    parser.add_argument("--file", help="Arquivo WAV (fonte 'wav')")
+    parser.add_argument("--frequency", type=float, default=220.0, help="Frequência da fonte 'synthetic'")
+    parser.add_argument("--engine", default="fft", help="Motor de estimativa (fft, yin, mpm, hps)")
+    parser.add_argument("--hop", type=int, default=HOP_SIZE, help="Avanço entre janelas")
+    args = parser.parse_args(argv)
+    if args.source == "wav" and not args.file:
+        parser.error("a fonte 'wav' exige --file")
+
+    options = {"block_size": args.hop}
+    if args.source == "wav":
+        options.update(path=args.file, loop=True)
+    elif args.source == "synthetic":
+        options.update(frequency=args.frequency)
+    source = create_source(args.source, **options)
+
+    recognizer = NoteRecognizer(streaming=True, hop_size=args.hop, engine=args.engine, source=source)
+    pipeline = AnalysisPipeline(recognizer)
+    feed = SpectrogramFeed(recognizer)
+    pipeline.start()
+    try:
+        SpectrogramView(pipeline, feed).show()
+    finally:
+        pipeline.stop()
+        recognizer.close()
+
+
+if __name__ == "__main__":
+    main()